@@ -4,10 +4,7 @@ Uses KeyBERT for keywords and transformers for sentiment.
 """
 
 import logging
-from typing import Dict, List, Optional, Tuple
-import torch
-from keybert import KeyBERT
-from transformers import pipeline
+from typing import Callable, Dict, List, Optional, Tuple
 from tqdm import tqdm
 
 import config
@@ -17,6 +14,8 @@ logger = logging.getLogger(__name__)
 
 class ArticleAnalyzer:
     """Extract keywords and sentiment from articles."""
+
+    INPUT_FIELDS = ['title', 'description', 'content', 'url']
     
     def __init__(
         self,
@@ -30,6 +29,9 @@ class ArticleAnalyzer:
             embedding_model: Model for KeyBERT (uses config if None)
             sentiment_model: Sentiment analysis model (uses config if None)
         """
+        import torch
+        from transformers import pipeline
+
         self.embedding_model = embedding_model or config.EMBEDDING_MODEL
         self.sentiment_model = sentiment_model or config.SENTIMENT_MODEL
         self.device = 0 if torch.cuda.is_available() else -1
@@ -39,6 +41,7 @@ class ArticleAnalyzer:
         # Initialize KeyBERT
         try:
             logger.info(f"Loading KeyBERT with model: {self.embedding_model}")
+            from keybert import KeyBERT
             self.kw_model = KeyBERT(model=self.embedding_model)
             logger.info("✓ KeyBERT loaded successfully")
         except Exception as e:
@@ -216,7 +219,9 @@ class ArticleAnalyzer:
         extract_kw: bool = True,
         analyze_sent: bool = True,
         top_keywords: int = 10,
-        batch_size: int = 1  # Process one at a time for KeyBERT
+        batch_size: int = 1,  # Process one at a time for KeyBERT
+        batch_callback: Optional[Callable[[List[Dict]], None]] = None,
+        callback_every: Optional[int] = None
     ) -> List[Dict]:
         """
         Analyze multiple articles with progress tracking.
@@ -227,6 +232,8 @@ class ArticleAnalyzer:
             analyze_sent: Analyze sentiment
             top_keywords: Number of keywords
             batch_size: Not used (kept for API consistency)
+            batch_callback: Optional callable invoked with each group of analyzed articles
+            callback_every: Articles per callback group (uses config if None)
             
         Returns:
             List of analyzed articles
@@ -237,6 +244,21 @@ class ArticleAnalyzer:
         logger.info(f"Analyzing {len(articles)} articles")
         
         analyzed_articles = []
+        callback_every = callback_every or config.ANALYSIS_CALLBACK_EVERY
+        emitted = 0
+        
+        def emit():
+            nonlocal emitted
+            if batch_callback and emitted < len(analyzed_articles):
+                try:
+                    batch_callback(analyzed_articles[emitted:])
+                except Exception as callback_error:
+                    # The articles stay unpersisted; their leases are released when the chunk ends
+                    logger.warning(
+                        f"⚠️  Batch callback failed for {len(analyzed_articles) - emitted} articles: {callback_error}",
+                        exc_info=True
+                    )
+            emitted = len(analyzed_articles)
         
         for article in tqdm(articles, desc="Analyzing articles"):
             analyzed = self.analyze_article(
@@ -246,6 +268,9 @@ class ArticleAnalyzer:
                 top_keywords=top_keywords
             )
             analyzed_articles.append(analyzed)
+            if len(analyzed_articles) - emitted >= callback_every:
+                emit()
+        emit()
         
         # Count successes
         keyword_count = sum(1 for a in analyzed_articles if a.get('keywords'))
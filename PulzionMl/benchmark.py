@@ -0,0 +1,665 @@
+"""
+Benchmark suite for the news pipeline.
+Generates a deterministic synthetic corpus (NewsAPI-shaped articles) and
+measures throughput and memory of each stage:
+
+    fetch    ArticleFetcher.fetch_all_articles against fake_newsapi.py (offline)
+    clean    ArticleFetcher._clean_article
+    save     ArticleStorage.save_articles (fresh inserts, then an unchanged re-save)
+    label    ArticleLabeler.label_articles_batch
+    embed    EmbeddingGenerator.generate_embeddings_batch
+    analyze  ArticleAnalyzer.analyze_articles_batch
+    stats    statsLoader calculations (generate_all_stats and each calculate_*)
+    search   LocalVectorStore similarity search (unfiltered and filtered, recall@k vs exact)
+    scaling  one model stage on 1..N inference worker processes (inference_pool.py)
+
+Model stages use small models and run on at most --model-articles articles
+(their per-article cost does not depend on corpus size). `save` needs a
+local mongod and writes to a separate database that is dropped afterwards.
+
+Results are printed (or written with --output) as JSON; logs go to stderr.
+
+Usage:
+    python benchmark.py --scale 1k
+    python benchmark.py --scale 100k --only clean,save,stats,search --output bench_100k.json
+    python benchmark.py --scale 1m --skip-models
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger("benchmark")
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+BENCHMARKS = ("fetch", "clean", "save", "label", "embed", "analyze", "stats", "search", "scaling")
+MODEL_BENCHMARKS = ("label", "embed", "analyze", "scaling")
+
+DEFAULT_SEED = 42
+BENCH_DATABASE = "news_pipeline_benchmark"
+CHUNK_SIZE = 10_000          # articles generated / saved / indexed at a time
+MODEL_ARTICLES = 1_000       # cap for the model stages
+SEARCH_QUERIES = 200
+SEARCH_DIM = 384             # all-MiniLM-L6-v2 dimension
+SEARCH_K = 10
+RECALL_QUERIES = 20          # search queries checked against exact neighbours
+RECALL_CATEGORY = "Technology"
+FETCH_LATENCY = 0.05         # simulated NewsAPI latency per request (seconds)
+FETCH_DUPLICATE_RATIO = 0.1  # share of served articles repeated across topics
+SCALING_STAGE = "embed"
+SCALING_WORKERS = (1, 2, 4, 8)
+
+# Small models keep the model benchmarks runnable on a laptop CPU
+SMALL_ZERO_SHOT_MODEL = "valhalla/distilbart-mnli-12-1"
+SMALL_EMBEDDING_MODEL = "sentence-transformers/paraphrase-MiniLM-L3-v2"
+SMALL_SENTIMENT_MODEL = "lxyuan/distilbert-base-multilingual-cased-sentiments-student"
+
+VOCABULARY = (
+    "market growth model data network security research launch report company government policy "
+    "energy climate health patient study team players season election vote court ruling investors "
+    "shares quarter revenue startup funding platform users privacy breach attack software hardware "
+    "chip cloud service robot satellite mission planet scientists discovery vaccine hospital trial "
+    "global local city country region economy inflation rates bank crypto token blockchain wallet "
+    "device battery vehicle electric solar wind carbon emissions summit leaders agreement talks "
+    "product release update feature analysis forecast record increase decline risk warning impact "
+    "students school university training language system algorithm open source community developer"
+).split()
+SOURCES = (
+    "Reuters", "BBC News", "The Verge", "TechCrunch", "Wired", "Ars Technica", "CNN", "Bloomberg",
+    "The Guardian", "Associated Press", "Al Jazeera English", "Financial Times", "Engadget", "NPR",
+)
+SENTIMENTS = ("positive", "negative", "neutral")
+SENTIMENT_WEIGHTS = (0.35, 0.25, 0.40)
+
+BenchResult = Dict[str, object]
+
+
+# ============ Synthetic Corpus ============
+def _sentence(rng: random.Random, words: int, topic: str) -> str:
+    text = " ".join(rng.choices(VOCABULARY, k=words))
+    return f"{topic.capitalize()} {text}."
+
+
+def generate_corpus(n: int, seed: int = DEFAULT_SEED) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield `n` synthetic NewsAPI articles as (search_topic, raw_article).
+
+    The same seed always yields the same articles; publish dates are
+    spread over the 60 days before today (UTC midnight) so the date-based
+    statsLoader calculations see a realistic mix of recent and old items.
+    """
+    rng = random.Random(seed)
+    topics = [t for t in config.TOPICS if t != "*"]
+    anchor = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    for i in range(n):
+        topic = rng.choice(topics)
+        published = anchor - timedelta(minutes=rng.randrange(60 * 24 * 60))
+        yield topic, {
+            "source": {"id": None, "name": rng.choice(SOURCES)},
+            "author": f"Author {rng.randrange(500)}",
+            "title": _sentence(rng, rng.randint(6, 12), topic),
+            "description": _sentence(rng, rng.randint(20, 40), topic),
+            "url": f"https://bench.example.com/{topic.replace(' ', '-')}/{i}",
+            "urlToImage": f"https://bench.example.com/img/{i}.jpg" if rng.random() < 0.8 else None,
+            "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "content": " ".join(_sentence(rng, rng.randint(15, 30), topic) for _ in range(rng.randint(4, 10))),
+        }
+
+
+def clean_corpus(n: int, seed: int = DEFAULT_SEED) -> Iterator[List[Dict]]:
+    """Yield the corpus as cleaned articles, in chunks of CHUNK_SIZE."""
+    from fetcher import ArticleFetcher
+
+    fetcher = ArticleFetcher()
+    chunk = []
+    for topic, raw in generate_corpus(n, seed):
+        cleaned = fetcher._clean_article(raw, search_topic=topic)
+        if cleaned:
+            chunk.append(cleaned)
+        if len(chunk) >= CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate_processed(n: int, seed: int = DEFAULT_SEED) -> Iterator[Dict]:
+    """Yield cleaned articles enriched with deterministic model outputs (for stats/search)."""
+    rng = random.Random(seed + 1)
+    for chunk in clean_corpus(n, seed):
+        for article in chunk:
+            article["categories"] = rng.sample(config.CATEGORIES, rng.randint(1, 3))
+            article["keywords"] = rng.sample(VOCABULARY, 10)
+            article["sentiment"] = rng.choices(SENTIMENTS, SENTIMENT_WEIGHTS)[0]
+            article["sentiment_confidence"] = round(rng.uniform(0.4, 0.99), 3)
+            yield article
+
+
+# ============ Measurement ============
+def _max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_benchmark(name: str, func: Callable[[], BenchResult], trace_memory: bool = False) -> BenchResult:
+    """
+    Run one benchmark function and attach memory figures.
+
+    `func` returns at least {'items', 'seconds'} (timing excludes setup
+    such as model loading). Peak RSS growth is always reported; Python
+    heap peaks via tracemalloc only with trace_memory, since tracing
+    slows pure-Python code noticeably.
+    """
+    logger.info(f"▶ {name}")
+    gc.collect()
+    rss_before = _max_rss_mb()
+    if trace_memory:
+        tracemalloc.start()
+
+    try:
+        result = func()
+    except Exception as e:
+        logger.error(f"✗ {name} failed: {e}")
+        result = {"items": 0, "seconds": 0.0, "error": str(e)}
+
+    if trace_memory:
+        result["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+    result["rss_growth_mb"] = round(_max_rss_mb() - rss_before, 2)
+
+    seconds = result["seconds"]
+    result["items_per_second"] = round(result["items"] / seconds, 2) if seconds else None
+    result["seconds"] = round(seconds, 4)
+    logger.info(f"  {result['items']:,} items in {result['seconds']:.2f}s ({result['items_per_second']} items/s)")
+    return {"benchmark": name, **result}
+
+
+# ============ Benchmarks ============
+def bench_fetch(
+    n: int,
+    seed: int,
+    latency: float = FETCH_LATENCY,
+    duplicate_ratio: float = FETCH_DUPLICATE_RATIO
+) -> BenchResult:
+    """Fetch ~n articles (one page per synthetic topic) from a local fake NewsAPI."""
+    from fake_newsapi import FakeNewsAPI, serve
+    from fetcher import ArticleFetcher
+
+    per_topic = config.MAX_ARTICLES_PER_TOPIC
+    topics = [f"synthetic topic {i}" for i in range(max(1, n // per_topic))]
+    api = FakeNewsAPI(latency=latency, total_results=per_topic, duplicate_ratio=duplicate_ratio, seed=seed)
+
+    async def run():
+        saved = config.NEWS_API_BASE_URL, config.NEWS_API_TOP_HEADLINES_URL
+        async with serve(api) as root:
+            config.NEWS_API_BASE_URL = f"{root}/everything"
+            config.NEWS_API_TOP_HEADLINES_URL = f"{root}/top-headlines"
+            try:
+                started = time.perf_counter()
+                articles = await ArticleFetcher().fetch_all_articles(topics)
+                return articles, time.perf_counter() - started
+            finally:
+                config.NEWS_API_BASE_URL, config.NEWS_API_TOP_HEADLINES_URL = saved
+
+    articles, seconds = asyncio.run(run())
+    return {
+        "items": len(articles),
+        "seconds": seconds,
+        "topics": len(topics),
+        "concurrency": config.MAX_CONCURRENT_REQUESTS,
+        "latency": latency,
+        "server": api.stats(),
+    }
+
+
+def bench_clean(n: int, seed: int) -> BenchResult:
+    from fetcher import ArticleFetcher
+
+    fetcher = ArticleFetcher()
+    items = kept = 0
+    seconds = 0.0
+    batch = []
+
+    def clean(batch):
+        nonlocal kept
+        started = time.perf_counter()
+        for topic, raw in batch:
+            if fetcher._clean_article(raw, search_topic=topic):
+                kept += 1
+        return time.perf_counter() - started
+
+    # Generation is excluded from the timing: articles are materialized in chunks first
+    for pair in generate_corpus(n, seed):
+        batch.append(pair)
+        if len(batch) >= CHUNK_SIZE:
+            seconds += clean(batch)
+            items += len(batch)
+            batch = []
+    if batch:
+        seconds += clean(batch)
+        items += len(batch)
+    return {"items": items, "seconds": seconds, "kept": kept}
+
+
+def bench_save(n: int, seed: int, mongo_uri: str, keep_db: bool = False) -> BenchResult:
+    from pymongo import MongoClient
+    from storage import ArticleStorage
+
+    client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+    client.drop_database(BENCH_DATABASE)
+    storage = ArticleStorage(mongo_uri, BENCH_DATABASE)
+    phases = {}
+    try:
+        for phase in ("insert", "unchanged"):
+            totals = {"inserted": 0, "updated": 0, "unchanged": 0, "errors": 0}
+            seconds = 0.0
+            for chunk in clean_corpus(n, seed):
+                started = time.perf_counter()
+                result = storage.save_articles(chunk)
+                seconds += time.perf_counter() - started
+                for key in totals:
+                    totals[key] += result.get(key, 0)
+            phases[phase] = {
+                "seconds": round(seconds, 4),
+                "items_per_second": round(n / seconds, 2) if seconds else None,
+                **totals,
+            }
+    finally:
+        storage.close()
+        if not keep_db:
+            client.drop_database(BENCH_DATABASE)
+        client.close()
+
+    return {"items": n, "seconds": phases["insert"]["seconds"], "phases": phases}
+
+
+def _model_articles(n: int, seed: int, limit: int) -> List[Dict]:
+    articles = []
+    for chunk in clean_corpus(min(n, limit), seed):
+        articles.extend(chunk)
+    return articles
+
+
+def bench_label(articles: List[Dict], model_name: str) -> BenchResult:
+    from labeling import ArticleLabeler
+
+    started = time.perf_counter()
+    labeler = ArticleLabeler(model_name=model_name)
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    labeler.label_articles_batch([dict(a) for a in articles], multi_label=True, threshold=0.4)
+    return {"items": len(articles), "seconds": time.perf_counter() - started,
+            "load_seconds": round(load_seconds, 2), "model": model_name}
+
+
+def bench_embed(articles: List[Dict], model_name: str) -> BenchResult:
+    from embeddings import EmbeddingGenerator
+
+    started = time.perf_counter()
+    generator = EmbeddingGenerator(model_name=model_name)
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    generator.generate_embeddings_batch([dict(a) for a in articles], show_progress=False)
+    return {"items": len(articles), "seconds": time.perf_counter() - started,
+            "load_seconds": round(load_seconds, 2), "model": model_name}
+
+
+def bench_analyze(articles: List[Dict], embedding_model: str, sentiment_model: str) -> BenchResult:
+    from analyzer import ArticleAnalyzer
+
+    started = time.perf_counter()
+    analyzer = ArticleAnalyzer(embedding_model=embedding_model, sentiment_model=sentiment_model)
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    analyzer.analyze_articles_batch(
+        [dict(a) for a in articles],
+        extract_kw=config.ENABLE_KEYWORD_EXTRACTION,
+        analyze_sent=config.ENABLE_SENTIMENT_ANALYSIS
+    )
+    return {"items": len(articles), "seconds": time.perf_counter() - started,
+            "load_seconds": round(load_seconds, 2), "model": sentiment_model}
+
+
+def bench_scaling(
+    articles: List[Dict],
+    stage: str,
+    worker_counts: List[int],
+    model_kwargs: Dict
+) -> BenchResult:
+    """
+    Throughput of one stage in-process and on each number of worker
+    processes. Worker start-up and model loading are excluded.
+    """
+    import inference_pool
+
+    runs = []
+    model = inference_pool.default_factory(stage, **model_kwargs)
+    method = inference_pool.STAGE_METHODS[stage]
+    started = time.perf_counter()
+    getattr(model, method)([dict(a) for a in articles])
+    baseline = time.perf_counter() - started
+    runs.append({"workers": 0, "threads_per_worker": None, "seconds": round(baseline, 4),
+                 "items_per_second": round(len(articles) / baseline, 2)})
+    del model
+
+    single = None
+    for workers in worker_counts:
+        with inference_pool.SHARDED_CLASSES[stage](workers, **model_kwargs) as executor:
+            executor.warm_up()
+            started = time.perf_counter()
+            getattr(executor, method)(articles)
+            seconds = time.perf_counter() - started
+        single = single or seconds
+        runs.append({
+            "workers": workers,
+            "threads_per_worker": executor.threads_per_worker,
+            "seconds": round(seconds, 4),
+            "items_per_second": round(len(articles) / seconds, 2),
+            "speedup": round(single / seconds, 2),
+            "efficiency": round(single / seconds / workers, 2),
+        })
+        logger.info(f"  {workers} workers: {len(articles) / seconds:.1f} items/s")
+
+    best = max(runs, key=lambda run: run["items_per_second"])
+    # Headline figures are for the fastest configuration; workers=0 is in-process
+    return {"items": len(articles), "seconds": best["seconds"], "stage": stage, "runs": runs}
+
+
+def bench_stats(n: int, seed: int) -> BenchResult:
+    # statsLoader prints as it goes; keep stdout clean for the JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        import statsLoader
+
+        articles = list(generate_processed(n, seed))
+        functions = [
+            statsLoader.calculate_sentiment_stats,
+            statsLoader.calculate_keyword_stats,
+            statsLoader.calculate_category_stats,
+            statsLoader.calculate_source_stats,
+            statsLoader.calculate_trending_topics,
+            statsLoader.calculate_daily_trends,
+        ]
+        breakdown = {}
+        for func in functions:
+            started = time.perf_counter()
+            func(articles)
+            breakdown[func.__name__] = round(time.perf_counter() - started, 4)
+
+        started = time.perf_counter()
+        statsLoader.generate_all_stats(articles)
+        seconds = time.perf_counter() - started
+    return {"items": len(articles), "seconds": seconds, "breakdown": breakdown}
+
+
+def _exact_neighbours(
+    n: int,
+    seed: int,
+    dim: int,
+    queries: np.ndarray,
+    k: int,
+    category: Optional[str] = None
+) -> List[set]:
+    """
+    Exact top-k ids per query, recomputed from the regenerated corpus
+    (same seed as bench_search), independently of the store's search.
+    """
+    rng = np.random.default_rng(seed)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    best_scores = np.empty((len(queries), 0), dtype=np.float32)
+    best_ids = np.empty((len(queries), 0), dtype=object)
+
+    def merge(ids: List[str], vectors: List[np.ndarray]):
+        nonlocal best_scores, best_ids
+        if not ids:
+            return
+        matrix = np.asarray(vectors)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        scores = np.hstack([best_scores, queries @ matrix.T])
+        row_ids = np.broadcast_to(np.asarray(ids, dtype=object), (len(queries), len(ids)))
+        candidates = np.hstack([best_ids, row_ids])
+        if scores.shape[1] > k:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            scores = np.take_along_axis(scores, top, axis=1)
+            candidates = np.take_along_axis(candidates, top, axis=1)
+        best_scores, best_ids = scores, candidates
+
+    ids, vectors = [], []
+    for article in generate_processed(n, seed):
+        vector = rng.standard_normal(dim, dtype=np.float32)
+        if category is None or category in article["categories"]:
+            ids.append(article["_id"])
+            vectors.append(vector)
+        if len(ids) >= CHUNK_SIZE:
+            merge(ids, vectors)
+            ids, vectors = [], []
+    merge(ids, vectors)
+    return [set(row) for row in best_ids]
+
+
+def _recall(results: List[List[Dict]], exact: List[set]) -> float:
+    """Mean share of the exact neighbours found per query (recall@k)."""
+    found = [
+        len({hit["id"] for hit in hits} & truth) / len(truth)
+        for hits, truth in zip(results, exact) if truth
+    ]
+    return round(sum(found) / len(found), 4) if found else None
+
+
+def bench_search(n: int, seed: int, queries: int = SEARCH_QUERIES, dim: int = SEARCH_DIM) -> BenchResult:
+    """
+    Time unfiltered and filtered searches, and check recall@k of the first
+    RECALL_QUERIES queries against exact neighbours computed outside the store.
+    """
+    from vector_store import LocalVectorStore
+
+    rng = np.random.default_rng(seed)
+    path = tempfile.mkdtemp(prefix="pulzion-bench-")
+    try:
+        store = LocalVectorStore(path, "benchmark")
+        store.recreate_collection(dim)
+
+        started = time.perf_counter()
+        points = []
+        for i, article in enumerate(generate_processed(n, seed)):
+            points.append({
+                "id": article["_id"],
+                "vector": rng.standard_normal(dim, dtype=np.float32),
+                "payload": {
+                    "categories": article["categories"],
+                    "source": article["source"],
+                    "sentiment": article["sentiment"],
+                    "published_at": article["published_at"],
+                },
+            })
+            if len(points) >= CHUNK_SIZE:
+                store.upsert(points, wait=False)
+                points = []
+        store.upsert(points)
+        index_seconds = time.perf_counter() - started
+
+        query_vectors = rng.standard_normal((queries, dim), dtype=np.float32)
+        store.search(query_vectors[0], limit=SEARCH_K)  # map the vectors file before timing
+
+        started = time.perf_counter()
+        results = [store.search(vector, limit=SEARCH_K) for vector in query_vectors]
+        seconds = time.perf_counter() - started
+
+        filters = {"categories": RECALL_CATEGORY}
+        started = time.perf_counter()
+        filtered_results = [store.search(vector, limit=SEARCH_K, filters=filters) for vector in query_vectors]
+        filtered_seconds = time.perf_counter() - started
+        store.close()
+
+        sample = query_vectors[:RECALL_QUERIES]
+        recall = _recall(results, _exact_neighbours(n, seed, dim, sample, SEARCH_K))
+        filtered_recall = _recall(
+            filtered_results,
+            _exact_neighbours(n, seed, dim, sample, SEARCH_K, category=RECALL_CATEGORY)
+        )
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+    return {
+        "items": queries,
+        "seconds": seconds,
+        "corpus_size": n,
+        "dim": dim,
+        "index_seconds": round(index_seconds, 4),  # includes corpus generation
+        "filtered_queries_per_second": round(queries / filtered_seconds, 2) if filtered_seconds else None,
+        f"recall_at_{SEARCH_K}": recall,
+        f"filtered_recall_at_{SEARCH_K}": filtered_recall,
+    }
+
+
+# ============ Runner ============
+def parse_scale(value: str) -> int:
+    """'1k', '100k', '1m' or a plain number of articles."""
+    value = value.lower()
+    if value in SCALES:
+        return SCALES[value]
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Unknown scale: {value} (use {', '.join(SCALES)} or a number)")
+
+
+def run_suite(
+    n: int,
+    seed: int = DEFAULT_SEED,
+    only: Optional[List[str]] = None,
+    model_articles: int = MODEL_ARTICLES,
+    queries: int = SEARCH_QUERIES,
+    mongo_uri: Optional[str] = None,
+    trace_memory: bool = False,
+    keep_db: bool = False,
+    zero_shot_model: str = SMALL_ZERO_SHOT_MODEL,
+    embedding_model: str = SMALL_EMBEDDING_MODEL,
+    sentiment_model: str = SMALL_SENTIMENT_MODEL,
+    scaling_stage: str = SCALING_STAGE,
+    scaling_workers: Optional[List[int]] = None
+) -> Dict:
+    """
+    Run the selected benchmarks over a corpus of `n` articles.
+
+    Returns:
+        Report dict (environment, parameters and one result per benchmark)
+    """
+    selected = [name for name in BENCHMARKS if not only or name in only]
+    mongo_uri = mongo_uri or config.MONGODB_URI
+    model_input = None
+    if any(name in MODEL_BENCHMARKS for name in selected):
+        model_input = _model_articles(n, seed, model_articles)
+
+    benchmarks = {
+        "fetch": lambda: bench_fetch(n, seed),
+        "clean": lambda: bench_clean(n, seed),
+        "save": lambda: bench_save(n, seed, mongo_uri, keep_db),
+        "label": lambda: bench_label(model_input, zero_shot_model),
+        "embed": lambda: bench_embed(model_input, embedding_model),
+        "analyze": lambda: bench_analyze(model_input, embedding_model, sentiment_model),
+        "stats": lambda: bench_stats(n, seed),
+        "search": lambda: bench_search(n, seed, queries),
+        "scaling": lambda: bench_scaling(model_input, scaling_stage, scaling_workers or list(SCALING_WORKERS), {
+            "label": {"model_name": zero_shot_model},
+            "embed": {"model_name": embedding_model},
+            "analyze": {"embedding_model": embedding_model, "sentiment_model": sentiment_model},
+        }[scaling_stage]),
+    }
+
+    started = datetime.utcnow()
+    results = [run_benchmark(name, benchmarks[name], trace_memory) for name in selected]
+    return {
+        "generated_at": started.isoformat() + "Z",
+        "corpus_size": n,
+        "seed": seed,
+        "model_articles": min(n, model_articles),
+        "trace_memory": trace_memory,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the news pipeline on a synthetic corpus")
+    parser.add_argument('--scale', type=parse_scale, default=SCALES["1k"], help="1k, 100k, 1m or a number")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--only', help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--skip-models', action='store_true', help="Skip label/embed/analyze")
+    parser.add_argument('--model-articles', type=int, default=MODEL_ARTICLES)
+    parser.add_argument('--queries', type=int, default=SEARCH_QUERIES)
+    parser.add_argument('--mongo-uri', default=None, help="Defaults to config.MONGODB_URI")
+    parser.add_argument('--trace-memory', action='store_true', help="Also report tracemalloc peaks (slower)")
+    parser.add_argument('--keep-db', action='store_true', help=f"Keep the {BENCH_DATABASE} database")
+    parser.add_argument('--zero-shot-model', default=SMALL_ZERO_SHOT_MODEL)
+    parser.add_argument('--embedding-model', default=SMALL_EMBEDDING_MODEL)
+    parser.add_argument('--sentiment-model', default=SMALL_SENTIMENT_MODEL)
+    parser.add_argument('--scaling-stage', choices=MODEL_BENCHMARKS[:3], default=SCALING_STAGE)
+    parser.add_argument('--scaling-workers', default=",".join(map(str, SCALING_WORKERS)),
+                        help="Comma-separated worker counts for the scaling benchmark")
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format=config.LOG_FORMAT, stream=sys.stderr)
+
+    only = [name.strip() for name in args.only.split(",")] if args.only else list(BENCHMARKS)
+    unknown = set(only) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+    if args.skip_models:
+        only = [name for name in only if name not in MODEL_BENCHMARKS]
+
+    report = run_suite(
+        args.scale,
+        seed=args.seed,
+        only=only,
+        model_articles=args.model_articles,
+        queries=args.queries,
+        mongo_uri=args.mongo_uri,
+        trace_memory=args.trace_memory,
+        keep_db=args.keep_db,
+        zero_shot_model=args.zero_shot_model,
+        embedding_model=args.embedding_model,
+        sentiment_model=args.sentiment_model,
+        scaling_stage=args.scaling_stage,
+        scaling_workers=[int(count) for count in args.scaling_workers.split(",")]
+    )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        logger.info(f"✅ Report written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
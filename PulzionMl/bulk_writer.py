@@ -0,0 +1,235 @@
+"""
+Parallel, size-aware bulk writes for MongoDB.
+Splits write operations into chunks bounded by operation count and BSON
+size, runs several chunks concurrently on a thread pool, and adapts the
+chunk size to the observed write latency. Partial failures are reported
+per chunk instead of failing the whole batch.
+
+Operations are plain dicts built with update_one() / insert_one() /
+delete_one(), so their size can be measured before they are handed to
+pymongo.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional
+
+import bson
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+import config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Smallest chunk the adaptive sizing will shrink to
+MIN_CHUNK_OPS = 50
+
+# Write operation: {'op': 'update_one', 'filter': ..., 'update': ..., 'upsert': ...}
+Operation = Dict[str, Any]
+
+
+def update_one(filter: Dict, update: Any, upsert: bool = False) -> Operation:
+    """Update (or pipeline update, as a list) of the first document matching `filter`."""
+    return {'op': 'update_one', 'filter': filter, 'update': update, 'upsert': upsert}
+
+
+def insert_one(document: Dict) -> Operation:
+    return {'op': 'insert_one', 'document': document}
+
+
+def delete_one(filter: Dict) -> Operation:
+    return {'op': 'delete_one', 'filter': filter}
+
+
+def to_pymongo(operation: Operation):
+    """The pymongo request for an operation dict."""
+    kind = operation['op']
+    if kind == 'update_one':
+        return UpdateOne(operation['filter'], operation['update'], upsert=operation.get('upsert', False))
+    if kind == 'insert_one':
+        return InsertOne(operation['document'])
+    if kind == 'delete_one':
+        return DeleteOne(operation['filter'])
+    raise ValueError(f"Unknown write operation '{kind}'")
+
+
+def operation_size(operation: Operation) -> int:
+    """Approximate BSON size of an operation (filter + update or document)."""
+    size = 0
+    for part in ('filter', 'update', 'document'):
+        value = operation.get(part)
+        if value is not None:
+            # Pipeline updates are lists; wrap them to encode
+            size += len(bson.encode(value if isinstance(value, dict) else {'u': value}))
+    return size
+
+
+class BulkWriter:
+    """Chunked, concurrent bulk_write with latency-adaptive chunk sizing."""
+
+    def __init__(
+        self,
+        collection,
+        max_ops: int = config.BULK_MAX_OPS,
+        max_bytes: int = config.BULK_MAX_BYTES,
+        workers: int = config.BULK_WRITE_WORKERS,
+        adaptive: bool = True,
+        target_latency: float = config.BULK_TARGET_LATENCY
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            collection: pymongo Collection to write to
+            max_ops: Maximum operations per chunk
+            max_bytes: Maximum approximate BSON bytes per chunk
+            workers: Chunks written concurrently
+            adaptive: Adjust chunk size from observed latency
+            target_latency: Desired seconds per chunk when adaptive
+        """
+        self.collection = collection
+        self.max_ops = max_ops
+        self.max_bytes = max_bytes
+        self.workers = max(1, workers)
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+
+        self.chunk_ops = max_ops
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-writer")
+            return self._executor
+
+    def _chunks(self, operations: List[Operation]) -> Iterator[tuple]:
+        """Yield (offset, pymongo requests) chunks, reading the current chunk size as it goes."""
+        start = 0
+        chunk, chunk_bytes = [], 0
+        for i, operation in enumerate(operations):
+            size = operation_size(operation)
+            if chunk and (len(chunk) >= self.chunk_ops or chunk_bytes + size > self.max_bytes):
+                yield start, chunk
+                start, chunk, chunk_bytes = i, [], 0
+            chunk.append(to_pymongo(operation))
+            chunk_bytes += size
+        if chunk:
+            yield start, chunk
+
+    def _adapt(self, ops: int, latency: float):
+        """Shrink chunks that are too slow, grow chunks that are fast."""
+        if not self.adaptive or ops < self.chunk_ops // 2:
+            return
+        with self._lock:
+            if latency > self.target_latency * 1.5:
+                self.chunk_ops = max(MIN_CHUNK_OPS, self.chunk_ops // 2)
+            elif latency < self.target_latency / 2:
+                self.chunk_ops = min(self.max_ops, self.chunk_ops * 2)
+
+    def _write_chunk(self, offset: int, ops: List, ordered: bool) -> Dict[str, Any]:
+        """Write one chunk; never raises, failures are returned in the result."""
+        started = time.time()
+        result = {
+            'offset': offset, 'size': len(ops), 'inserted': 0, 'upserted': 0,
+            'matched': 0, 'modified': 0, 'deleted': 0, 'errors': [], 'error': None
+        }
+        try:
+            res = self.collection.bulk_write(ops, ordered=ordered)
+            result.update(
+                inserted=res.inserted_count, upserted=res.upserted_count,
+                matched=res.matched_count, modified=res.modified_count, deleted=res.deleted_count
+            )
+        except BulkWriteError as e:
+            details = e.details
+            result.update(
+                inserted=details.get('nInserted', 0), upserted=details.get('nUpserted', 0),
+                matched=details.get('nMatched', 0), modified=details.get('nModified', 0),
+                deleted=details.get('nRemoved', 0)
+            )
+            result['errors'] = [
+                {'index': offset + err.get('index', 0), 'code': err.get('code'), 'message': err.get('errmsg')}
+                for err in details.get('writeErrors', [])
+            ]
+        except Exception as e:
+            result['error'] = str(e)
+        result['latency'] = time.time() - started
+        self._adapt(len(ops), result['latency'])
+        collection = self.collection.name
+        metrics.MONGO_WRITE_LATENCY.labels(collection=collection).observe(result['latency'])
+        metrics.MONGO_WRITE_OPS.labels(collection=collection).inc(len(ops))
+        failed = len(ops) if result['error'] else len(result['errors'])
+        if failed:
+            metrics.MONGO_WRITE_ERRORS.labels(collection=collection).inc(failed)
+        return result
+
+    def write(self, operations: List[Operation], ordered: bool = False) -> Dict[str, Any]:
+        """
+        Write operations in chunks.
+
+        Args:
+            operations: Operations from update_one() / insert_one() / delete_one()
+            ordered: Write chunks one after another and stop at the first
+                     failure (unordered chunks run concurrently)
+
+        Returns:
+            Dict with totals ('inserted', 'upserted', 'matched', 'modified',
+            'deleted', 'errors', 'chunks') and 'failed_chunks', a list of
+            {'offset', 'size', 'errors', 'error'} for chunks that failed
+            entirely or partially; error indexes refer to `operations`
+        """
+        report = {
+            'inserted': 0, 'upserted': 0, 'matched': 0, 'modified': 0, 'deleted': 0,
+            'errors': 0, 'chunks': 0, 'failed_chunks': []
+        }
+        if not operations:
+            return report
+
+        def collect(result: Dict):
+            report['chunks'] += 1
+            for key in ('inserted', 'upserted', 'matched', 'modified', 'deleted'):
+                report[key] += result[key]
+            if result['error'] is not None or result['errors']:
+                # A chunk that failed outright counts every operation as an error
+                report['errors'] += result['size'] if result['error'] is not None else len(result['errors'])
+                report['failed_chunks'].append({
+                    'offset': result['offset'], 'size': result['size'],
+                    'errors': result['errors'], 'error': result['error']
+                })
+                return False
+            return True
+
+        chunks = self._chunks(operations)
+        if ordered or self.workers == 1:
+            for offset, ops in chunks:
+                if not collect(self._write_chunk(offset, ops, ordered)) and ordered:
+                    break
+        else:
+            executor = self._get_executor()
+            in_flight = set()
+            for offset, ops in chunks:
+                if len(in_flight) >= self.workers:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+                in_flight.add(executor.submit(self._write_chunk, offset, ops, False))
+            for future in wait(in_flight).done:
+                collect(future.result())
+
+        report['failed_chunks'].sort(key=lambda chunk: chunk['offset'])
+        for chunk in report['failed_chunks']:
+            reason = chunk['error'] or f"{len(chunk['errors'])} write errors"
+            logger.warning(f"Bulk write chunk at {chunk['offset']} ({chunk['size']} ops) failed: {reason}")
+        return report
+
+    def close(self):
+        """Shut down the worker threads."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
@@ -0,0 +1,137 @@
+"""
+Run-level checkpoints for the news pipeline.
+Each run gets an id and a document in the pipeline_runs collection that
+records its options and per-stage status/progress, so an interrupted run
+can be resumed with `python main.py --resume <run_id>`.
+
+Per-article progress lives on the articles themselves (pending_stages and
+leases), so a resumed run only redoes batches that were never persisted.
+"""
+
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+import config
+
+logger = logging.getLogger(__name__)
+
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+# Stages in run order (fetch and store are one unit: fetched articles are
+# only in memory until stored)
+RUN_STAGES = ("fetch", "label", "embed", "analyze")
+
+
+def new_run_id() -> str:
+    """Sortable, unique run id: YYYYmmdd-HHMMSS-xxxxxx."""
+    return f"{datetime.utcnow():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+class RunCheckpoint:
+    """Persistent status of one pipeline run."""
+
+    def __init__(self, db, run_id: str, doc: Dict):
+        self.collection = db[config.RUNS_COLLECTION]
+        self.run_id = run_id
+        self.doc = doc
+
+    @property
+    def owner(self) -> str:
+        """Lease owner id for this run (stable across resumes)."""
+        return f"run:{self.run_id}"
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        return self.doc.get('options', {})
+
+    @classmethod
+    def create(cls, db, options: Dict[str, Any], run_id: Optional[str] = None) -> "RunCheckpoint":
+        """Start a new run."""
+        run_id = run_id or new_run_id()
+        now = datetime.utcnow()
+        doc = {
+            '_id': run_id,
+            'status': STATUS_RUNNING,
+            'options': options,
+            'stages': {stage: {'status': 'pending', 'processed': 0} for stage in RUN_STAGES},
+            'started_at': now,
+            'updated_at': now,
+            'attempts': 1,
+        }
+        db[config.RUNS_COLLECTION].insert_one(doc)
+        logger.info(f"📌 Run id: {run_id} (resume with: python main.py --resume {run_id})")
+        return cls(db, run_id, doc)
+
+    @classmethod
+    def resume(cls, db, run_id: str) -> "RunCheckpoint":
+        """
+        Load an interrupted run.
+
+        Raises:
+            ValueError: If the run does not exist or already completed
+        """
+        collection = db[config.RUNS_COLLECTION]
+        doc = collection.find_one({'_id': run_id})
+        if doc is None:
+            raise ValueError(f"Unknown run: {run_id}")
+        if all(doc['stages'][s]['status'] in (STATUS_COMPLETED, STATUS_SKIPPED) for s in RUN_STAGES):
+            raise ValueError(f"Run {run_id} already completed")
+        doc = collection.find_one_and_update(
+            {'_id': run_id},
+            {'$set': {'status': STATUS_RUNNING, 'updated_at': datetime.utcnow()}, '$inc': {'attempts': 1}},
+            return_document=ReturnDocument.AFTER
+        )
+        done = [s for s in RUN_STAGES if doc['stages'][s]['status'] in (STATUS_COMPLETED, STATUS_SKIPPED)]
+        logger.info(f"↩️  Resuming run {run_id} (attempt {doc['attempts']}, done: {', '.join(done) or 'nothing'})")
+        return cls(db, run_id, doc)
+
+    @classmethod
+    def list_runs(cls, db, limit: int = 10) -> List[Dict]:
+        """Most recent runs, newest first."""
+        return list(db[config.RUNS_COLLECTION].find().sort('started_at', -1).limit(limit))
+
+    def _update(self, update: Dict):
+        update.setdefault('$set', {})['updated_at'] = datetime.utcnow()
+        self.collection.update_one({'_id': self.run_id}, update)
+
+    def is_done(self, stage: str) -> bool:
+        """True if the stage completed (or was skipped) in an earlier attempt."""
+        return self.doc['stages'][stage]['status'] in (STATUS_COMPLETED, STATUS_SKIPPED)
+
+    def start_stage(self, stage: str):
+        self.doc['stages'][stage]['status'] = STATUS_RUNNING
+        self._update({'$set': {f'stages.{stage}.status': STATUS_RUNNING,
+                               f'stages.{stage}.started_at': datetime.utcnow()}})
+
+    def add_progress(self, stage: str, count: int):
+        """Record `count` more articles persisted by a stage."""
+        if count:
+            self.doc['stages'][stage]['processed'] += count
+            self._update({'$inc': {f'stages.{stage}.processed': count}})
+
+    def progress_callback(self, stage: str) -> Callable[[int], None]:
+        """Callable that records progress for `stage` (for the stage functions' on_persist)."""
+        return lambda count: self.add_progress(stage, count)
+
+    def complete_stage(self, stage: str, status: str = STATUS_COMPLETED, **stats):
+        self.doc['stages'][stage]['status'] = status
+        fields = {f'stages.{stage}.status': status, f'stages.{stage}.completed_at': datetime.utcnow()}
+        fields.update({f'stages.{stage}.{key}': value for key, value in stats.items()})
+        self._update({'$set': fields})
+
+    def processed(self, stage: str) -> int:
+        """Articles persisted by a stage across all attempts of this run."""
+        return self.doc['stages'][stage]['processed']
+
+    def finish(self, status: str = STATUS_COMPLETED, error: Optional[str] = None):
+        fields = {'status': status, 'finished_at': datetime.utcnow()}
+        if error:
+            fields['error'] = error
+        self._update({'$set': fields})
@@ -33,8 +33,15 @@ NEWS_API_KEYS = [
 
 NEWS_API_KEY = NEWS_API_KEYS[0] if NEWS_API_KEYS else ""
 
-NEWS_API_BASE_URL = "https://newsapi.org/v2/everything"
-NEWS_API_TOP_HEADLINES_URL = "https://newsapi.org/v2/top-headlines"
+# A key that failed (quota, rate limit, invalid) is retried after this long;
+# developer keys get 50 requests every 12 hours
+API_KEY_RETRY_SECONDS = 12 * 60 * 60
+
+# Point NEWS_API_ROOT at a local stand-in (fake_newsapi.py) to run the
+# fetcher offline, e.g. NEWS_API_ROOT=http://localhost:8765/v2
+NEWS_API_ROOT = os.getenv("NEWS_API_ROOT", "https://newsapi.org/v2").rstrip("/")
+NEWS_API_BASE_URL = os.getenv("NEWS_API_BASE_URL", f"{NEWS_API_ROOT}/everything")
+NEWS_API_TOP_HEADLINES_URL = os.getenv("NEWS_API_TOP_HEADLINES_URL", f"{NEWS_API_ROOT}/top-headlines")
 
 MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
 DATABASE_NAME = "news_pipeline"
@@ -94,4 +101,60 @@ LOG_FILE = "pipeline.log"
 MAX_CONTENT_LENGTH = 5000
 MIN_CONTENT_LENGTH = 50
 EMBEDDING_BATCH_SIZE = 32
-LABELING_BATCH_SIZE = 46
\ No newline at end of file
+LABELING_BATCH_SIZE = 46
+
+# Streaming reads: documents per cursor round-trip, and articles loaded
+# per model pass when a stage sweeps its backlog (None = no per-run cap)
+CURSOR_BATCH_SIZE = 500
+STAGE_CHUNK_SIZE = 1000
+MAX_ARTICLES_PER_STAGE = None
+
+# Work claiming: how long a worker holds a batch before others may reclaim it
+# (renewed after every persisted model batch), and how many attempts that
+# produce no result an article gets before a stage gives up on it
+CLAIM_LEASE_SECONDS = 600
+MAX_STAGE_FAILURES = 3
+
+# Change-stream worker (stream_worker.py): a micro-batch is processed when it
+# reaches STREAM_BATCH_SIZE inserts or is STREAM_MAX_LATENCY_SECONDS old
+STREAM_BATCH_SIZE = 32
+STREAM_MAX_LATENCY_SECONDS = 2.0
+STATE_COLLECTION = "pipeline_state"
+
+# Bulk writes (bulk_writer.py): operations are split into chunks of at most
+# BULK_MAX_OPS operations / BULK_MAX_BYTES of BSON, BULK_WRITE_WORKERS chunks
+# run at once, and chunk size adapts towards BULK_TARGET_LATENCY seconds
+BULK_MAX_OPS = 1000
+BULK_MAX_BYTES = 8 * 1024 * 1024
+BULK_WRITE_WORKERS = 4
+BULK_TARGET_LATENCY = 1.0
+
+# Analysis results are persisted every ANALYSIS_CALLBACK_EVERY articles, and
+# run checkpoints (main.py --resume) are kept in RUNS_COLLECTION
+ANALYSIS_CALLBACK_EVERY = 25
+RUNS_COLLECTION = "pipeline_runs"
+
+# Prometheus-style metrics (metrics.py): port for main.py / stream_worker.py
+# to serve /metrics on (None = disabled; override with --metrics-port)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0")) or None
+
+# Multi-process inference (inference_pool.py): with INFERENCE_WORKERS > 1 each
+# stage runs that many worker processes, each with its own model copy and
+# INFERENCE_THREADS_PER_WORKER PyTorch threads (None = cores / workers).
+# Meant for many-core CPU nodes; keep 1 on a GPU
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+INFERENCE_THREADS_PER_WORKER = None
+
+# Daemon mode (main.py --daemon, scheduler.py): each topic is polled every
+# POLL_TARGET_NEW_ARTICLES / (smoothed arrival rate) hours, clamped to
+# [POLL_MIN_INTERVAL_MINUTES, POLL_MAX_INTERVAL_MINUTES]. POLL_RATE_SMOOTHING
+# is the weight of the newest rate observation. At most
+# DAEMON_MAX_TOPICS_PER_CYCLE topics are fetched per cycle, and the daemon
+# checks for due topics at least every DAEMON_IDLE_SLEEP_SECONDS
+SCHEDULE_COLLECTION = "topic_schedule"
+POLL_MIN_INTERVAL_MINUTES = 10
+POLL_MAX_INTERVAL_MINUTES = 24 * 60
+POLL_TARGET_NEW_ARTICLES = 20
+POLL_RATE_SMOOTHING = 0.3
+DAEMON_MAX_TOPICS_PER_CYCLE = 20
+DAEMON_IDLE_SLEEP_SECONDS = 60
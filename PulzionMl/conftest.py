@@ -0,0 +1,38 @@
+"""
+Shared pytest fixtures.
+Storage-level tests run against an in-memory mongomock database, so no
+MongoDB server is needed (pip install -r requirements-dev.txt).
+"""
+
+from unittest import mock
+
+import mongomock
+import pytest
+
+from storage import ArticleStorage
+
+TEST_DB = "news_pipeline_test"
+
+
+@pytest.fixture
+def mongo_client():
+    """In-memory MongoDB client."""
+    client = mongomock.MongoClient()
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def mongo_db(mongo_client):
+    """Empty test database."""
+    return mongo_client[TEST_DB]
+
+
+@pytest.fixture
+def storage(mongo_client):
+    """ArticleStorage backed by the in-memory client."""
+    with mock.patch('storage.MongoClient', lambda *args, **kwargs: mongo_client):
+        article_storage = ArticleStorage(db_name=TEST_DB)
+    yield article_storage
+    article_storage.close()
+
@@ -131,7 +131,9 @@ def main():
                                             "embedding": embedding,
                                             "embedding_dim": len(embedding),
                                             "embedded_at": time.time()
-                                        }
+                                        },
+                                        "$pull": {"pending_stages": "embed"},
+                                        "$unset": {"leases.embed": ""}
                                     }
                                 )
                             )
@@ -160,7 +162,9 @@ def main():
                                         "embedding": embedding,
                                         "embedding_dim": len(embedding),
                                         "embedded_at": time.time()
-                                    }
+                                    },
+                                    "$pull": {"pending_stages": "embed"},
+                                    "$unset": {"leases.embed": ""}
                                 }
                             )
                         )
@@ -4,10 +4,8 @@ Optimized for batch processing and memory efficiency.
 """
 
 import logging
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 import numpy as np
-import torch
-from sentence_transformers import SentenceTransformer
 from tqdm import tqdm
 
 import config
@@ -17,6 +15,8 @@ logger = logging.getLogger(__name__)
 
 class EmbeddingGenerator:
     """Generate semantic embeddings for articles."""
+
+    INPUT_FIELDS = ['title', 'description', 'content', 'url']
     
     def __init__(self, model_name: Optional[str] = None):
         """
@@ -25,6 +25,9 @@ class EmbeddingGenerator:
         Args:
             model_name: SentenceTransformer model name (uses config if None)
         """
+        import torch
+        from sentence_transformers import SentenceTransformer
+
         self.model_name = model_name or config.EMBEDDING_MODEL
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
         
@@ -89,7 +92,8 @@ class EmbeddingGenerator:
         self,
         articles: List[Dict],
         batch_size: Optional[int] = None,
-        show_progress: bool = True
+        show_progress: bool = True,
+        batch_callback: Optional[Callable[[List[Dict]], None]] = None
     ) -> List[Dict]:
         """
         Generate embeddings for multiple articles with batch processing.
@@ -98,6 +102,7 @@ class EmbeddingGenerator:
             articles: List of article dicts
             batch_size: Batch size (uses config if None)
             show_progress: Show progress bar
+            batch_callback: Optional callable invoked with each embedded batch
             
         Returns:
             List of articles with added embedding field
@@ -113,7 +118,20 @@ class EmbeddingGenerator:
         # Process in batches
         batches = [articles[i:i + batch_size] for i in range(0, len(articles), batch_size)]
         
+        def emit(batch_results: List[Dict]):
+            if batch_callback:
+                try:
+                    batch_callback(batch_results)
+                except Exception as callback_error:
+                    # The articles stay unpersisted; their leases are released when the chunk ends
+                    logger.warning(
+                        f"⚠️  Batch callback failed for {len(batch_results)} articles: {callback_error}",
+                        exc_info=True
+                    )
+        
         for batch in tqdm(batches, desc="Generating embeddings", disable=not show_progress):
+            batch_start = len(embedded_articles)
+            
             # Prepare texts
             texts = [self._prepare_text(article) for article in batch]
             
@@ -124,6 +142,7 @@ class EmbeddingGenerator:
             if not valid_texts:
                 logger.warning("Batch has no valid texts")
                 embedded_articles.extend(batch)
+                emit(embedded_articles[batch_start:])
                 continue
             
             try:
@@ -159,6 +178,8 @@ class EmbeddingGenerator:
                     article_copy['embedding'] = None
                     article_copy['embedding_dim'] = 0
                     embedded_articles.append(article_copy)
+            
+            emit(embedded_articles[batch_start:])
         
         success_count = sum(1 for a in embedded_articles if a.get('embedding') is not None)
         logger.info(f"✓ Successfully generated embeddings for {success_count}/{len(articles)} articles")
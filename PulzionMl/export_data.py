@@ -1,12 +1,22 @@
 """
-Export articles from MongoDB to various formats (JSON, CSV).
+Export articles from MongoDB to various formats (JSON, NDJSON, CSV, Parquet).
+Exports stream from a projected cursor and run in constant memory.
 """
 
+import io
+import os
 import json
 import csv
+import shutil
 import logging
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 from storage import ArticleStorage
 
@@ -14,8 +24,367 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Rows buffered per write and documents per cursor round-trip
+EXPORT_CHUNK_SIZE = 1000
+
+# Fields never exported as text (embedding is too large for JSON/CSV)
+EXCLUDED_FIELDS = ('embedding',)
+
+# Parquet row group size and fallback embedding dimension (all-MiniLM-L6-v2)
+PARQUET_ROW_GROUP_SIZE = 10000
+DEFAULT_EMBEDDING_DIM = 384
+
+# Parallel export: one shard per core by default; _id (url_hash) is an md5
+# hex digest, so shards split the 8-hex-digit prefix space evenly
+DEFAULT_EXPORT_SHARDS = os.cpu_count() or 4
+SHARD_PREFIX_DIGITS = 8
+
+CSV_COLUMNS = [
+    'title', 'description', 'source', 'author', 'url',
+    'published_at', 'categories', 'keywords', 'sentiment',
+    'sentiment_confidence', 'search_topic'
+]
+
+
+def _json_default(value):
+    """Serialize datetimes and other BSON types."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class ArticleWriter(ABC):
+    """
+    Base class for streaming article writers.
+    Rows are buffered and written every `chunk_size` articles, so memory
+    use is independent of the export size.
+    """
+
+    extension = ''
+    includes_embedding = False
+
+    def __init__(self, filename: str, chunk_size: int = EXPORT_CHUNK_SIZE):
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.count = 0
+        self._buffer: List = []
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def write(self, article: Dict):
+        self._buffer.append(self._prepare(article))
+        self.count += 1
+        if len(self._buffer) >= self.chunk_size:
+            self._flush()
+
+    def write_all(self, articles: Iterable[Dict]) -> int:
+        for article in articles:
+            self.write(article)
+        return self.count
+
+    def _prepare(self, article: Dict):
+        """Buffered form of an article (the article itself by default)."""
+        return article
+
+    @abstractmethod
+    def open(self):
+        """Create the output file."""
+
+    @abstractmethod
+    def _flush(self):
+        """Write and clear the buffer."""
+
+    @abstractmethod
+    def close(self):
+        """Flush remaining rows and finish the file."""
+
+
+class TextArticleWriter(ArticleWriter):
+    """Writer for UTF-8 text formats: each article is formatted to a string."""
+
+    def __init__(self, filename: str, chunk_size: int = EXPORT_CHUNK_SIZE):
+        super().__init__(filename, chunk_size)
+        self._file = None
+
+    def open(self):
+        self._file = open(self.filename, 'w', encoding='utf-8', newline='')
+        self._write_header()
+
+    def close(self):
+        if self._file is None:
+            return
+        self._flush()
+        self._write_footer()
+        self._file.close()
+        self._file = None
+
+    def _prepare(self, article: Dict) -> str:
+        return self._format({k: v for k, v in article.items() if k not in EXCLUDED_FIELDS})
+
+    def _flush(self):
+        if self._buffer:
+            self._file.write(''.join(self._buffer))
+            self._buffer = []
+
+    def _write_header(self):
+        pass
+
+    def _write_footer(self):
+        pass
+
+    @abstractmethod
+    def _format(self, row: Dict) -> str:
+        """Serialize one article (embedding already removed)."""
+
+
+class NDJSONWriter(TextArticleWriter):
+    """One JSON document per line."""
+
+    extension = 'ndjson'
+
+    def _format(self, row):
+        return json.dumps(row, ensure_ascii=False, default=_json_default) + '\n'
+
+
+class JSONArrayWriter(TextArticleWriter):
+    """A single JSON array, written element by element."""
+
+    extension = 'json'
+
+    def __init__(self, filename: str, chunk_size: int = EXPORT_CHUNK_SIZE, pretty: bool = True):
+        super().__init__(filename, chunk_size)
+        self.pretty = pretty
+
+    def _write_header(self):
+        self._file.write('[')
+
+    def _write_footer(self):
+        self._file.write('\n]\n' if self.pretty and self.count else ']\n')
+
+    def _format(self, row):
+        separator = ',' if self.count else ''
+        if self.pretty:
+            body = json.dumps(row, indent=2, ensure_ascii=False, default=_json_default)
+            return separator + '\n  ' + body.replace('\n', '\n  ')
+        return separator + json.dumps(row, ensure_ascii=False, default=_json_default)
+
+
+class CSVWriter(TextArticleWriter):
+    """Flat CSV with list fields joined into strings."""
+
+    extension = 'csv'
+
+    def __init__(self, filename: str, chunk_size: int = EXPORT_CHUNK_SIZE, columns: Optional[List[str]] = None):
+        super().__init__(filename, chunk_size)
+        self.columns = columns or CSV_COLUMNS
+        self._line = io.StringIO()
+        self._csv = csv.DictWriter(self._line, fieldnames=self.columns, extrasaction='ignore')
+
+    def _write_header(self):
+        self._csv.writeheader()
+        self._file.write(self._take_line())
+
+    def _take_line(self) -> str:
+        line = self._line.getvalue()
+        self._line.seek(0)
+        self._line.truncate()
+        return line
+
+    def _format(self, row):
+        # Convert lists to strings
+        if 'categories' in row and isinstance(row['categories'], list):
+            row['categories'] = ', '.join(row['categories'])
+        if 'keywords' in row and isinstance(row['keywords'], list):
+            row['keywords'] = ', '.join(row['keywords'][:10])  # Limit keywords
+        self._csv.writerow(row)
+        return self._take_line()
+
+
+class ParquetWriter(ArticleWriter):
+    """
+    Columnar Parquet export for analytics (requires pyarrow).
+    Embeddings are stored as a fixed-size float32 list column and
+    categories/keywords as list columns; each buffered chunk becomes one
+    row group, so downstream jobs can memory-map and scan column-wise.
+    """
+
+    extension = 'parquet'
+    includes_embedding = True
+
+    STRING_FIELDS = [
+        '_id', 'url', 'title', 'description', 'content', 'source', 'author',
+        'published_at', 'fetched_at', 'search_topic', 'urlToImage', 'sentiment'
+    ]
+    LIST_FIELDS = ['categories', 'keywords']
+    SCORE_FIELDS = ['category_scores', 'keyword_scores', 'sentiment_scores']
+
+    def __init__(
+        self,
+        filename: str,
+        chunk_size: int = PARQUET_ROW_GROUP_SIZE,
+        embedding_dim: Optional[int] = None,
+        compression: str = 'snappy'
+    ):
+        super().__init__(filename, chunk_size)
+        self.embedding_dim = embedding_dim
+        self.compression = compression
+        self._pa = None
+        self._pq = None
+        self._schema = None
+        # The file writer is created with the first row group, once the
+        # schema (embedding size) is known; _opened covers the time before
+        self._writer = None
+        self._opened = False
+
+    def open(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow") from e
+        self._pa = pa
+        self._pq = pq
+        self._opened = True
+
+    def write(self, article: Dict):
+        if not self._opened:
+            raise ValueError(f"{self.filename} is not open for writing")
+        super().write(article)
+
+    def _build_schema(self, rows: List[Dict]):
+        pa = self._pa
+        if self.embedding_dim is None:
+            dims = (len(r['embedding']) for r in rows if r.get('embedding'))
+            self.embedding_dim = next(dims, DEFAULT_EMBEDDING_DIM)
+        fields = [pa.field(name, pa.string()) for name in self.STRING_FIELDS]
+        fields += [pa.field(name, pa.list_(pa.string())) for name in self.LIST_FIELDS]
+        fields += [pa.field(name, pa.map_(pa.string(), pa.float64())) for name in self.SCORE_FIELDS]
+        fields += [
+            pa.field('sentiment_confidence', pa.float64()),
+            pa.field('embedding', pa.list_(pa.float32(), self.embedding_dim)),
+            pa.field('embedding_dim', pa.int32()),
+        ]
+        return pa.schema(fields)
+
+    def _to_table(self, rows: List[Dict]):
+        pa = self._pa
+
+        def text(value):
+            if value is None:
+                return None
+            return value.isoformat() if isinstance(value, datetime) else str(value)
+
+        def scores(value):
+            return list(value.items()) if isinstance(value, dict) else None
+
+        columns = {}
+        for name in self.STRING_FIELDS:
+            columns[name] = [text(r.get(name)) for r in rows]
+        for name in self.LIST_FIELDS:
+            columns[name] = [r.get(name) if isinstance(r.get(name), list) else None for r in rows]
+        for name in self.SCORE_FIELDS:
+            columns[name] = [scores(r.get(name)) for r in rows]
+        columns['sentiment_confidence'] = [r.get('sentiment_confidence') for r in rows]
+
+        dim = self.embedding_dim
+        embeddings = [r.get('embedding') for r in rows]
+        valid = [e is not None and len(e) == dim for e in embeddings]
+        if all(valid):
+            flat = np.asarray(embeddings, dtype=np.float32).reshape(-1)
+            columns['embedding'] = pa.FixedSizeListArray.from_arrays(pa.array(flat, pa.float32()), dim)
+        else:
+            columns['embedding'] = [e if ok else None for e, ok in zip(embeddings, valid)]
+        columns['embedding_dim'] = [dim if ok else None for ok in valid]
+
+        return pa.Table.from_pydict(columns, schema=self._schema)
+
+    def _create_writer(self, rows: List[Dict]):
+        self._schema = self._build_schema(rows)
+        self._writer = self._pq.ParquetWriter(self.filename, self._schema, compression=self.compression)
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        if self._writer is None:
+            self._create_writer(rows)
+        self._writer.write_table(self._to_table(rows), row_group_size=len(rows))
+
+    def close(self):
+        if not self._opened:
+            return
+        self._flush()
+        if self._writer is None:
+            # Empty export: still produce a valid file with the schema
+            self._create_writer([])
+        self._writer.close()
+        self._writer = None
+        self._opened = False
+
+
+WRITERS = {
+    'json': JSONArrayWriter,
+    'ndjson': NDJSONWriter,
+    'csv': CSVWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def iter_export_articles(
+    storage: ArticleStorage,
+    filter_dict: Optional[Dict] = None,
+    limit: Optional[int] = None,
+    include_embedding: bool = False,
+    sort: Optional[List[Tuple[str, int]]] = None
+) -> Iterator[Dict]:
+    """
+    Stream articles for export, newest first unless `sort` is given.
+    Unless requested, the embedding field is excluded server-side by the projection.
+    """
+    projection = None if include_embedding else {field: 0 for field in EXCLUDED_FIELDS}
+    cursor = storage.collection.find(
+        filter_dict or {},
+        projection
+    ).sort(sort or [('published_at', -1)]).batch_size(EXPORT_CHUNK_SIZE)
+    if limit:
+        cursor = cursor.limit(limit)
+    try:
+        yield from cursor
+    finally:
+        cursor.close()
+
+
+def export_articles(articles: Iterable[Dict], filename: str, format: str = 'json', **options) -> int:
+    """
+    Write articles with a streaming writer.
+
+    Args:
+        articles: Iterable of article dicts (list or cursor)
+        filename: Output filename
+        format: json, ndjson, csv or parquet
+        **options: Writer options (e.g. pretty=False for json)
+
+    Returns:
+        Number of articles written
+    """
+    if format not in WRITERS:
+        raise ValueError(f"Unknown format: {format} (use {', '.join(WRITERS)})")
+
+    logger.info(f"Exporting articles to {filename}...")
+    with WRITERS[format](filename, **options) as writer:
+        writer.write_all(articles)
+    logger.info(f"✓ Exported {writer.count:,} articles to {filename}")
+    return writer.count
+
+
 def export_to_json(
-    articles: List[Dict],
+    articles: Iterable[Dict],
     filename: str = "articles_export.json",
     pretty: bool = True
 ):
@@ -23,118 +392,72 @@ def export_to_json(
     Export articles to JSON file.
     
     Args:
-        articles: List of article dicts
+        articles: Iterable of article dicts
         filename: Output filename
         pretty: Pretty print JSON
     """
-    logger.info(f"Exporting {len(articles)} articles to {filename}...")
-    
-    # Convert non-serializable fields
-    serializable_articles = []
-    for article in articles:
-        article_copy = article.copy()
-        
-        # Remove embedding (too large for JSON)
-        if 'embedding' in article_copy:
-            del article_copy['embedding']
-        
-        serializable_articles.append(article_copy)
-    
-    with open(filename, 'w', encoding='utf-8') as f:
-        if pretty:
-            json.dump(serializable_articles, f, indent=2, ensure_ascii=False)
-        else:
-            json.dump(serializable_articles, f, ensure_ascii=False)
-    
-    logger.info(f"✓ Exported to {filename}")
+    return export_articles(articles, filename, 'json', pretty=pretty)
 
 
 def export_to_csv(
-    articles: List[Dict],
+    articles: Iterable[Dict],
     filename: str = "articles_export.csv"
 ):
     """
     Export articles to CSV file.
     
     Args:
-        articles: List of article dicts
+        articles: Iterable of article dicts
         filename: Output filename
+        
+    Returns:
+        Number of articles written (no file is created when there are none)
     """
-    logger.info(f"Exporting {len(articles)} articles to {filename}...")
-    
-    if not articles:
+    iterator = iter(articles)
+    first = next(iterator, None)
+    if first is None:
         logger.warning("No articles to export")
-        return
-    
-    # Define CSV columns
-    columns = [
-        'title', 'description', 'source', 'author', 'url',
-        'published_at', 'categories', 'keywords', 'sentiment',
-        'sentiment_confidence', 'search_topic'
-    ]
-    
-    with open(filename, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
-        writer.writeheader()
-        
-        for article in articles:
-            # Convert lists to strings
-            row = article.copy()
-            if 'categories' in row and isinstance(row['categories'], list):
-                row['categories'] = ', '.join(row['categories'])
-            if 'keywords' in row and isinstance(row['keywords'], list):
-                row['keywords'] = ', '.join(row['keywords'][:10])  # Limit keywords
-            
-            writer.writerow(row)
-    
-    logger.info(f"✓ Exported to {filename}")
+        return 0
+    return export_articles(chain([first], iterator), filename, 'csv')
+
+
+def _export_query(
+    storage: ArticleStorage,
+    filter_dict: Optional[Dict],
+    name: str,
+    format: str,
+    limit: Optional[int] = None
+) -> Optional[str]:
+    """Stream a query into a timestamped export file; returns the filename."""
+    if format not in WRITERS:
+        logger.error(f"Unknown format: {format}")
+        return None
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"articles_{name}_{timestamp}.{WRITERS[format].extension}"
+    articles = iter_export_articles(storage, filter_dict, limit, WRITERS[format].includes_embedding)
+    count = export_articles(articles, filename, format)
+
+    if count == 0:
+        os.remove(filename)
+        return None
+    return filename
 
 
 def export_by_category(storage: ArticleStorage, category: str, format: str = 'json'):
     """Export articles from a specific category."""
-    logger.info(f"Fetching articles in category: {category}")
-    
-    articles = storage.get_articles(
-        filter_dict={'categories': category},
-        limit=10000
-    )
+    logger.info(f"Exporting articles in category: {category}")
     
-    if not articles:
+    if not _export_query(storage, {'categories': category}, category, format):
         logger.warning(f"No articles found in category: {category}")
-        return
-    
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    if format == 'json':
-        filename = f"articles_{category}_{timestamp}.json"
-        export_to_json(articles, filename)
-    elif format == 'csv':
-        filename = f"articles_{category}_{timestamp}.csv"
-        export_to_csv(articles, filename)
-    else:
-        logger.error(f"Unknown format: {format}")
 
 
-def export_all(storage: ArticleStorage, format: str = 'json', limit: int = 10000):
-    """Export all articles."""
-    logger.info(f"Fetching all articles (limit: {limit})")
-    
-    articles = storage.get_articles(limit=limit)
+def export_all(storage: ArticleStorage, format: str = 'json', limit: Optional[int] = None):
+    """Export all articles (no limit by default)."""
+    logger.info(f"Exporting all articles" + (f" (limit: {limit})" if limit else ""))
     
-    if not articles:
+    if not _export_query(storage, None, 'all', format, limit):
         logger.warning("No articles found")
-        return
-    
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    if format == 'json':
-        filename = f"articles_all_{timestamp}.json"
-        export_to_json(articles, filename)
-    elif format == 'csv':
-        filename = f"articles_all_{timestamp}.csv"
-        export_to_csv(articles, filename)
-    else:
-        logger.error(f"Unknown format: {format}")
 
 
 def export_recent(storage: ArticleStorage, days: int = 7, format: str = 'json'):
@@ -143,27 +466,222 @@ def export_recent(storage: ArticleStorage, days: int = 7, format: str = 'json'):
     
     cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
     
-    logger.info(f"Fetching articles from last {days} days")
-    
-    articles = storage.get_articles(
-        filter_dict={'fetched_at': {'$gte': cutoff}},
-        limit=10000
-    )
+    logger.info(f"Exporting articles from last {days} days")
     
-    if not articles:
+    if not _export_query(storage, {'fetched_at': {'$gte': cutoff}}, f"recent_{days}days", format):
         logger.warning(f"No articles found from last {days} days")
-        return
-    
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    if format == 'json':
-        filename = f"articles_recent_{days}days_{timestamp}.json"
-        export_to_json(articles, filename)
+
+
+def shard_ranges(shards: int) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Split the _id (url_hash) space into contiguous ranges.
+
+    The first and last ranges are open-ended so every string _id falls
+    into exactly one shard.
+
+    Returns:
+        List of (lower, upper) bounds; lower is inclusive, upper exclusive
+    """
+    space = 16 ** SHARD_PREFIX_DIGITS
+    bounds = [format(i * space // shards, f'0{SHARD_PREFIX_DIGITS}x') for i in range(1, shards)]
+    lowers = [None] + bounds
+    uppers = bounds + [None]
+    return list(zip(lowers, uppers))
+
+
+def _shard_filter(filter_dict: Optional[Dict], lower: Optional[str], upper: Optional[str]) -> Dict:
+    """Combine a base query with an _id range."""
+    id_range = {'$type': 'string'}
+    if lower is not None:
+        id_range['$gte'] = lower
+    if upper is not None:
+        id_range['$lt'] = upper
+    shard = {'_id': id_range}
+    return {'$and': [filter_dict, shard]} if filter_dict else shard
+
+
+def _export_shard(task: Dict) -> Tuple[str, int]:
+    """
+    Export one _id range with its own MongoDB connection (runs in a worker process).
+
+    Returns:
+        (filename, number of articles written)
+    """
+    logging.basicConfig(level=logging.INFO)
+    storage = ArticleStorage(task['uri'], task['db_name'])
+    try:
+        writer_cls = WRITERS[task['format']]
+        articles = iter_export_articles(
+            storage,
+            task['filter'],
+            include_embedding=writer_cls.includes_embedding,
+            sort=[('_id', 1)]
+        )
+        count = export_articles(articles, task['filename'], task['format'], **task['options'])
+    finally:
+        storage.close()
+    return task['filename'], count
+
+
+def _detect_embedding_dim(storage: ArticleStorage, filter_dict: Optional[Dict]) -> int:
+    """Embedding size of the first embedded article (shared Parquet schema for all shards)."""
+    query = {'$and': [filter_dict, {'embedding': {'$exists': True, '$ne': None}}]} if filter_dict \
+        else {'embedding': {'$exists': True, '$ne': None}}
+    doc = storage.collection.find_one(query, {'embedding': 1})
+    return len(doc['embedding']) if doc and doc.get('embedding') else DEFAULT_EMBEDDING_DIM
+
+
+def _merge_text(parts: List[str], filename: str, skip_header: bool = False):
+    """Concatenate NDJSON/CSV parts (dropping repeated CSV header lines)."""
+    with open(filename, 'wb') as out:
+        for i, part in enumerate(parts):
+            with open(part, 'rb') as f:
+                if skip_header and i > 0:
+                    f.readline()
+                shutil.copyfileobj(f, out)
+
+
+def _merge_json_arrays(parts: List[str], filename: str, pretty: bool = True):
+    """Splice JSON array parts into one array without parsing them."""
+    wrote = False
+    with open(filename, 'wb') as out:
+        out.write(b'[')
+        for part in parts:
+            size = os.path.getsize(part)
+            with open(part, 'rb') as f:
+                # Body sits between the opening '[' and the closing ']'
+                f.seek(max(size - 8, 0))
+                tail = f.read()
+                end = size - len(tail) + tail.rfind(b']')
+                f.seek(1)
+                body_size = end - 1
+                if pretty and body_size > 0:
+                    body_size -= 1  # newline before ']'
+                if body_size <= 0:
+                    continue
+                if wrote:
+                    out.write(b',')
+                remaining = body_size
+                while remaining > 0:
+                    chunk = f.read(min(remaining, 1 << 20))
+                    out.write(chunk)
+                    remaining -= len(chunk)
+                wrote = True
+        out.write(b'\n]\n' if pretty and wrote else b']\n')
+
+
+def _merge_parquet(parts: List[str], filename: str):
+    """Copy row groups from every part into one Parquet file."""
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for part in parts:
+            pf = pq.ParquetFile(part)
+            if writer is None:
+                writer = pq.ParquetWriter(filename, pf.schema_arrow)
+            for i in range(pf.num_row_groups):
+                writer.write_table(pf.read_row_group(i))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def merge_exports(parts: List[str], filename: str, format: str, **options):
+    """
+    Merge shard files into a single export and delete the parts.
+
+    Args:
+        parts: Shard files in _id order
+        filename: Merged output filename
+        format: json, ndjson, csv or parquet
+        **options: Writer options used for the parts (pretty for json)
+    """
+    logger.info(f"Merging {len(parts)} shards into {filename}...")
+    if format == 'ndjson':
+        _merge_text(parts, filename)
     elif format == 'csv':
-        filename = f"articles_recent_{days}days_{timestamp}.csv"
-        export_to_csv(articles, filename)
+        _merge_text(parts, filename, skip_header=True)
+    elif format == 'json':
+        _merge_json_arrays(parts, filename, options.get('pretty', True))
+    elif format == 'parquet':
+        _merge_parquet(parts, filename)
     else:
-        logger.error(f"Unknown format: {format}")
+        raise ValueError(f"Unknown format: {format}")
+    for part in parts:
+        os.remove(part)
+
+
+def export_parallel(
+    storage: ArticleStorage,
+    shards: int = DEFAULT_EXPORT_SHARDS,
+    format: str = 'ndjson',
+    filter_dict: Optional[Dict] = None,
+    name: str = 'all',
+    merge: bool = False,
+    workers: Optional[int] = None,
+    **options
+) -> List[str]:
+    """
+    Export in parallel: one worker process and one cursor per _id range.
+
+    Each shard is written to `articles_<name>_<timestamp>_partNNN.<ext>`;
+    with merge=True the parts are combined into a single file. Shards are
+    ordered by _id rather than by date. Only string _ids (url_hash) are
+    covered by the ranges.
+
+    Args:
+        storage: ArticleStorage (used for connection settings)
+        shards: Number of _id ranges
+        format: json, ndjson, csv or parquet
+        filter_dict: Optional base query
+        name: Name used in the output filenames
+        merge: Combine the shard files into one file at the end
+        workers: Worker processes (defaults to min(shards, cpu count))
+        **options: Writer options
+
+    Returns:
+        List of written filenames (a single file when merged)
+    """
+    if format not in WRITERS:
+        raise ValueError(f"Unknown format: {format} (use {', '.join(WRITERS)})")
+
+    shards = max(1, shards)
+    workers = workers or min(shards, os.cpu_count() or 1)
+    extension = WRITERS[format].extension
+    base = f"articles_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    if format == 'parquet':
+        options.setdefault('embedding_dim', _detect_embedding_dim(storage, filter_dict))
+
+    tasks = [
+        {
+            'uri': storage.uri,
+            'db_name': storage.db_name,
+            'format': format,
+            'filter': _shard_filter(filter_dict, lower, upper),
+            'filename': f"{base}_part{i:03d}.{extension}",
+            'options': options,
+        }
+        for i, (lower, upper) in enumerate(shard_ranges(shards))
+    ]
+
+    logger.info(f"Exporting {shards} shards with {workers} worker processes...")
+    started = datetime.now()
+    # spawn: pymongo clients are not fork-safe
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        results = list(executor.map(_export_shard, tasks))
+
+    total = sum(count for _, count in results)
+    elapsed = (datetime.now() - started).total_seconds()
+    logger.info(f"✓ Exported {total:,} articles in {len(results)} shards ({elapsed:.1f}s)")
+
+    files = [filename for filename, _ in results]
+    if merge:
+        merged = f"{base}.{extension}"
+        merge_exports(files, merged, format, **options)
+        files = [merged]
+    return files
 
 
 def main():
@@ -175,14 +693,17 @@ def main():
     # Check arguments
     if len(sys.argv) < 2:
         print("Usage:")
-        print("  python export_data.py all [json|csv]                  # Export all articles")
-        print("  python export_data.py category <name> [json|csv]      # Export by category")
-        print("  python export_data.py recent <days> [json|csv]        # Export recent articles")
+        print("  python export_data.py all [json|ndjson|csv|parquet]             # Export all articles")
+        print("  python export_data.py category <name> [json|ndjson|csv|parquet] # Export by category")
+        print("  python export_data.py recent <days> [json|ndjson|csv|parquet]   # Export recent articles")
+        print("  python export_data.py parallel [shards] [format] [--merge]     # Sharded export by _id range")
         print()
         print("Examples:")
         print("  python export_data.py all json")
         print("  python export_data.py category AI csv")
-        print("  python export_data.py recent 7 json")
+        print("  python export_data.py recent 7 ndjson")
+        print("  python export_data.py all parquet")
+        print("  python export_data.py parallel 8 ndjson --merge")
         storage.close()
         return
     
@@ -209,6 +730,14 @@ def main():
             format = sys.argv[3] if len(sys.argv) > 3 else 'json'
             export_recent(storage, days, format)
         
+        elif command == 'parallel':
+            args = [a for a in sys.argv[2:] if not a.startswith('--')]
+            shards = int(args[0]) if args else DEFAULT_EXPORT_SHARDS
+            format = args[1] if len(args) > 1 else 'ndjson'
+            files = export_parallel(storage, shards, format, merge='--merge' in sys.argv)
+            for filename in files:
+                print(filename)
+        
         else:
             print(f"Unknown command: {command}")
     
@@ -0,0 +1,279 @@
+"""
+Local stand-in for NewsAPI, for load-testing the fetcher offline.
+Serves /v2/everything and /v2/top-headlines in NewsAPI's response format
+with deterministic synthetic articles and configurable behaviour:
+
+- latency (fixed + random jitter) per request
+- pagination (page / pageSize, totalResults per query)
+- per-key request quotas (429 rateLimited once exhausted)
+- random 429 / 401 injection and permanently invalid keys
+- a duplicate ratio: that share of articles repeats a shared pool, so the
+  same URL shows up across queries (exercises cross-topic dedup)
+
+GET /_stats returns request counts per key and status; POST /_reset clears them.
+
+Usage:
+    python fake_newsapi.py --port 8765 --latency 0.05 --quota 100 --duplicate-ratio 0.2
+    NEWS_API_ROOT=http://localhost:8765/v2 python main.py --skip-labeling --skip-embeddings --skip-analysis
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+DEFAULT_TOTAL_RESULTS = 500
+MAX_PAGE_SIZE = 100
+SHARED_POOL_SIZE = 1000
+ARTICLE_HOST = "https://fake-newsapi.local"
+
+WORDS = (
+    "market growth model data network security research launch report company government policy "
+    "energy climate health study team season election court investors revenue startup platform "
+    "privacy breach software chip cloud robot satellite mission scientists vaccine economy bank "
+    "crypto blockchain battery vehicle solar carbon summit agreement product release forecast risk"
+).split()
+SOURCES = ("Reuters", "BBC News", "The Verge", "TechCrunch", "Wired", "Bloomberg", "The Guardian", "NPR")
+
+RATE_LIMITED = {
+    "status": "error",
+    "code": "rateLimited",
+    "message": "You have made too many requests recently. Developer accounts are limited to 100 requests "
+               "over a 24 hour period (50 requests available every 12 hours).",
+}
+KEY_INVALID = {
+    "status": "error",
+    "code": "apiKeyInvalid",
+    "message": "Your API key is invalid or incorrect. Check your key, or go to https://newsapi.org to create a free API key.",
+}
+KEY_MISSING = {
+    "status": "error",
+    "code": "apiKeyMissing",
+    "message": "Your API key is missing. Append this to the URL with the apiKey param, or use the x-api-key HTTP header.",
+}
+PARAMETERS_MISSING = {
+    "status": "error",
+    "code": "parametersMissing",
+    "message": "Required parameters are missing. Please set any of the following parameters and try again: q, qInTitle, sources, domains.",
+}
+
+
+def _key_label(api_key: str) -> str:
+    return f"...{api_key[-4:]}"
+
+
+class FakeNewsAPI:
+    """Configurable NewsAPI stand-in (an aiohttp application factory plus counters)."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        total_results: int = DEFAULT_TOTAL_RESULTS,
+        quota: Optional[int] = None,
+        invalid_keys: Iterable[str] = (),
+        rate_429: float = 0.0,
+        rate_401: float = 0.0,
+        duplicate_ratio: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 42
+    ):
+        """
+        Initialize the fake API.
+
+        Args:
+            latency: Seconds added to every request
+            jitter: Extra random latency, uniform in [0, jitter]
+            total_results: Articles available per query (spread over pages)
+            quota: Requests allowed per key before it gets 429 (None = unlimited)
+            invalid_keys: Keys that always get 401
+            rate_429: Probability of an injected 429 per request
+            rate_401: Probability of an injected 401 per request
+            duplicate_ratio: Share of articles taken from a pool shared by all queries
+            retry_after: Retry-After seconds sent with 429 responses
+            seed: Seed for article content and error injection
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.total_results = total_results
+        self.quota = quota
+        self.invalid_keys = set(invalid_keys)
+        self.rate_429 = rate_429
+        self.rate_401 = rate_401
+        self.duplicate_ratio = duplicate_ratio
+        self.retry_after = retry_after
+        self.seed = seed
+
+        self._rng = random.Random(seed)
+        self.anchor = datetime.utcnow().replace(microsecond=0)
+        self.reset()
+
+    def reset(self):
+        """Clear request counters and quotas."""
+        self.requests_per_key: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self.articles_served = 0
+        self.duplicates_served = 0
+
+    def stats(self) -> Dict:
+        return {
+            "requests": sum(self.statuses.values()),
+            "per_key": {_key_label(key): count for key, count in self.requests_per_key.items()},
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "articles_served": self.articles_served,
+            "duplicates_served": self.duplicates_served,
+        }
+
+    # ----- content -----
+    def _article(self, query: str, index: int) -> Dict:
+        """Deterministic article `index` for `query` (possibly from the shared pool)."""
+        rng = random.Random(f"{self.seed}:{query}:{index}")
+        if rng.random() < self.duplicate_ratio:
+            shared = rng.randrange(SHARED_POOL_SIZE)
+            rng = random.Random(f"{self.seed}:shared:{shared}")
+            url = f"{ARTICLE_HOST}/shared/{shared}"
+            self.duplicates_served += 1
+        else:
+            url = f"{ARTICLE_HOST}/{query.replace(' ', '-') or 'all'}/{index}"
+
+        def sentence(words: int) -> str:
+            return " ".join(rng.choices(WORDS, k=words)).capitalize() + "."
+
+        published = self.anchor - timedelta(minutes=rng.randrange(7 * 24 * 60))
+        return {
+            "source": {"id": None, "name": rng.choice(SOURCES)},
+            "author": f"Author {rng.randrange(200)}",
+            "title": sentence(rng.randint(6, 12)),
+            "description": sentence(rng.randint(20, 35)),
+            "url": url,
+            "urlToImage": f"{ARTICLE_HOST}/img/{rng.randrange(10 ** 6)}.jpg" if rng.random() < 0.8 else None,
+            "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "content": " ".join(sentence(rng.randint(15, 25)) for _ in range(3)) + " [+1200 chars]",
+        }
+
+    # ----- handlers -----
+    def _error(self, status: int, body: Dict, headers: Optional[Dict] = None) -> web.Response:
+        self.statuses[status] += 1
+        return web.json_response(body, status=status, headers=headers)
+
+    async def _serve(self, request: web.Request, endpoint: str) -> web.Response:
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        api_key = request.query.get("apiKey") or request.headers.get("X-Api-Key")
+        if not api_key:
+            return self._error(401, KEY_MISSING)
+        if api_key in self.invalid_keys or (self.rate_401 and self._rng.random() < self.rate_401):
+            return self._error(401, KEY_INVALID)
+
+        self.requests_per_key[api_key] += 1
+        over_quota = self.quota is not None and self.requests_per_key[api_key] > self.quota
+        if over_quota or (self.rate_429 and self._rng.random() < self.rate_429):
+            return self._error(429, RATE_LIMITED, {"Retry-After": str(self.retry_after)})
+
+        query = request.query.get("q", "")
+        if endpoint == "everything" and not query:
+            return self._error(400, PARAMETERS_MISSING)
+        if endpoint == "top-headlines":
+            query = f"top-headlines:{request.query.get('category', '')}:{query}"
+
+        try:
+            page = max(1, int(request.query.get("page", 1)))
+            page_size = min(max(1, int(request.query.get("pageSize", MAX_PAGE_SIZE))), MAX_PAGE_SIZE)
+        except ValueError:
+            return self._error(400, {"status": "error", "code": "parameterInvalid",
+                                     "message": "page and pageSize must be integers."})
+
+        start = (page - 1) * page_size
+        articles = [self._article(query, i) for i in range(start, min(start + page_size, self.total_results))]
+        self.articles_served += len(articles)
+        self.statuses[200] += 1
+        return web.json_response({"status": "ok", "totalResults": self.total_results, "articles": articles})
+
+    async def everything(self, request: web.Request) -> web.Response:
+        return await self._serve(request, "everything")
+
+    async def top_headlines(self, request: web.Request) -> web.Response:
+        return await self._serve(request, "top-headlines")
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    async def post_reset(self, request: web.Request) -> web.Response:
+        self.reset()
+        return web.json_response({"status": "ok"})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.get("/v2/everything", self.everything),
+            web.get("/v2/top-headlines", self.top_headlines),
+            web.get("/_stats", self.get_stats),
+            web.post("/_reset", self.post_reset),
+        ])
+        return app
+
+
+@asynccontextmanager
+async def serve(api: FakeNewsAPI, host: str = "127.0.0.1", port: int = 0) -> AsyncIterator[str]:
+    """
+    Run the fake API in the current event loop.
+
+    Yields:
+        API root URL (e.g. http://127.0.0.1:54321/v2) for config.NEWS_API_ROOT
+    """
+    runner = web.AppRunner(api.app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    try:
+        bound_port = runner.addresses[0][1]
+        yield f"http://{host}:{bound_port}/v2"
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Local NewsAPI stand-in")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random latency (seconds)")
+    parser.add_argument('--total-results', type=int, default=DEFAULT_TOTAL_RESULTS)
+    parser.add_argument('--quota', type=int, default=None, help="Requests per key before 429")
+    parser.add_argument('--invalid-keys', default="", help="Comma-separated keys that always get 401")
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--rate-401', type=float, default=0.0)
+    parser.add_argument('--duplicate-ratio', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    api = FakeNewsAPI(
+        latency=args.latency,
+        jitter=args.jitter,
+        total_results=args.total_results,
+        quota=args.quota,
+        invalid_keys=[key for key in args.invalid_keys.split(",") if key],
+        rate_429=args.rate_429,
+        rate_401=args.rate_401,
+        duplicate_ratio=args.duplicate_ratio,
+        seed=args.seed
+    )
+    logger.info(f"Point the fetcher here with: NEWS_API_ROOT=http://{args.host}:{args.port}/v2")
+    web.run_app(api.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
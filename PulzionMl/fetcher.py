@@ -6,24 +6,95 @@ Fetches articles from NewsAPI with rate limiting and error handling.
 import asyncio
 import hashlib
 import logging
+import time
 from typing import Dict, List, Set, Optional
 from datetime import datetime, timedelta
 import aiohttp
 from aiohttp import ClientTimeout
 
 import config
+import metrics
 
 logger = logging.getLogger(__name__)
 
+# Pseudo-topic standing for the top-headlines endpoint
+TRENDING_TOPIC = "trending"
+
+# 401: Unauthorized, 403: Forbidden, 429: Rate limit exceeded
+KEY_ERROR_STATUSES = (401, 403, 429)
+
+
+class ApiKeyPool:
+    """
+    Round-robin over NewsAPI keys, skipping keys that recently failed.
+
+    One pool can be shared by concurrent requests (and by other NewsAPI
+    clients such as update_image_urls.py): rotate() takes the key that
+    failed, so a request that lost a race does not rotate away from the
+    key another request already switched to.
+    """
+
+    def __init__(self, api_keys: List[str], retry_after: float = config.API_KEY_RETRY_SECONDS):
+        """
+        Args:
+            api_keys: Keys in order of preference
+            retry_after: Seconds before a failed key is tried again
+        """
+        self.api_keys = list(api_keys)
+        self.current_key_index = 0
+        self.failed_keys: Set[str] = set()
+        self.retry_after = retry_after
+        self._failed_at: Dict[str, float] = {}
+
+    def current(self) -> Optional[str]:
+        """Get the current working API key (None if every key has failed)."""
+        now = time.monotonic()
+        for key, failed_at in list(self._failed_at.items()):
+            if now - failed_at >= self.retry_after:
+                del self._failed_at[key]
+                self.failed_keys.discard(key)
+
+        # Find next working key
+        for _ in range(len(self.api_keys)):
+            key = self.api_keys[self.current_key_index]
+            if key not in self.failed_keys:
+                return key
+            self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
+
+        logger.error("All API keys have failed!")
+        return None
+
+    def rotate(self, failed_key: Optional[str] = None) -> Optional[str]:
+        """
+        Mark a key as failed and move on to the next working one.
+
+        Args:
+            failed_key: Key the failed request used (defaults to the current key)
+
+        Returns:
+            The key to use next, or None if every key has failed
+        """
+        if not self.api_keys:
+            return None
+        current_key = self.api_keys[self.current_key_index]
+        old_key = failed_key or current_key
+        if old_key not in self.failed_keys:
+            self.failed_keys.add(old_key)
+            self._failed_at[old_key] = time.monotonic()
+
+        new_key = self.current()
+        if new_key and old_key == current_key:
+            logger.warning(f"Rotating API key: ...{old_key[-8:]} -> ...{new_key[-8:]}")
+        return new_key
+
 
 class ArticleFetcher:
     """Async fetcher for news articles with deduplication and multi-key fallback."""
     
     def __init__(self):
         """Initialize the fetcher with configuration."""
-        self.api_keys = config.NEWS_API_KEYS.copy()
-        self.current_key_index = 0
-        self.failed_keys: Set[str] = set()
+        self.keys = ApiKeyPool(config.NEWS_API_KEYS)
+        self.api_keys = self.keys.api_keys
         
         self.base_url = config.NEWS_API_BASE_URL
         self.top_headlines_url = config.NEWS_API_TOP_HEADLINES_URL
@@ -38,33 +109,20 @@ class ArticleFetcher:
     
     def _get_current_api_key(self) -> Optional[str]:
         """Get the current working API key."""
-        # Find next working key
-        for _ in range(len(self.api_keys)):
-            key = self.api_keys[self.current_key_index]
-            if key not in self.failed_keys:
-                return key
-            self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
-        
-        logger.error("All API keys have failed!")
-        return None
+        return self.keys.current()
     
-    def _rotate_api_key(self):
-        """Rotate to the next API key."""
-        old_key = self.api_keys[self.current_key_index]
-        self.failed_keys.add(old_key)
-        
-        self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
-        new_key = self._get_current_api_key()
-        
-        if new_key:
-            logger.warning(f"Rotating API key: ...{old_key[-8:]} -> ...{new_key[-8:]}")
-        
-        return new_key
+    def _rotate_api_key(self, failed_key: Optional[str] = None) -> Optional[str]:
+        """Rotate away from `failed_key` (the current key if None) to the next API key."""
+        return self.keys.rotate(failed_key)
+    
+    def _record_call(self, endpoint: str, api_key: str, status, started: float):
+        """Count a NewsAPI call per key and status, and record its latency."""
+        metrics.API_REQUESTS.labels(key=metrics.key_label(api_key), endpoint=endpoint, status=status).inc()
+        metrics.API_LATENCY.labels(endpoint=endpoint).observe(time.perf_counter() - started)
     
     def _is_api_error(self, status_code: int) -> bool:
         """Check if status code indicates API key issue."""
-        # 401: Unauthorized, 403: Forbidden, 429: Rate limit exceeded
-        return status_code in [401, 403, 429]
+        return status_code in KEY_ERROR_STATUSES
         
     def _hash_url(self, url: str) -> str:
         """Generate a hash for URL-based deduplication."""
@@ -131,8 +189,9 @@ class ArticleFetcher:
         self, 
         session: aiohttp.ClientSession, 
         topic: str,
-        sort_by: str = "relevancy"
-    ) -> List[Dict]:
+        sort_by: str = "relevancy",
+        since: Optional[datetime] = None
+    ) -> Optional[List[Dict]]:
         """
         Fetch articles for a single topic with automatic API key fallback.
         
@@ -140,9 +199,12 @@ class ArticleFetcher:
             session: Aiohttp session
             topic: Topic to search for
             sort_by: Sort method (relevancy, popularity, publishedAt)
+            since: Only articles published after this time (UTC); defaults
+                to the last 7 days
             
         Returns:
-            List of cleaned articles
+            List of cleaned articles, or None if the request failed
+            (timeout, API or key errors), as opposed to an empty result
         """
         max_retries = len(self.api_keys)
         
@@ -150,7 +212,7 @@ class ArticleFetcher:
             api_key = self._get_current_api_key()
             if not api_key:
                 logger.error(f"No working API keys available for topic '{topic}'")
-                return []
+                return None
             
             params = {
                 "q": topic,
@@ -161,24 +223,32 @@ class ArticleFetcher:
             }
             
             # Search within last 7 days for relevancy
-            from_date = (datetime.utcnow() - timedelta(days=7)).strftime("%Y-%m-%d")
-            params["from"] = from_date
+            window_start = datetime.utcnow() - timedelta(days=7)
+            if since and since > window_start:
+                params["from"] = since.strftime("%Y-%m-%dT%H:%M:%S")
+            else:
+                params["from"] = window_start.strftime("%Y-%m-%d")
             
             try:
-                logger.info(f"Fetching articles for topic: '{topic}' (sort: {sort_by}) [Key #{self.current_key_index + 1}]")
+                logger.info(f"Fetching articles for topic: '{topic}' (sort: {sort_by}) [Key #{self.keys.current_key_index + 1}]")
+                # HTTP status once the response arrives; the call is counted
+                # then, so errors while reading the body are not counted twice
+                started, status = time.perf_counter(), None
                 async with session.get(self.base_url, params=params, timeout=self.timeout) as response:
+                    status = response.status
+                    self._record_call("everything", api_key, status, started)
                     
                     # Check for API key errors
                     if self._is_api_error(response.status):
                         logger.warning(f"API key error ({response.status}) for '{topic}' - attempting key rotation")
-                        next_key = self._rotate_api_key()
+                        next_key = self._rotate_api_key(api_key)
                         if next_key and attempt < max_retries - 1:
                             continue  # Retry with next key
-                        return []
+                        return None
                     
                     if response.status != 200:
                         logger.error(f"API error for '{topic}': {response.status}")
-                        return []
+                        return None
                     
                     data = await response.json()
                     
@@ -188,10 +258,10 @@ class ArticleFetcher:
                         
                         # Check if error is key-related
                         if any(keyword in error_message.lower() for keyword in ['api key', 'unauthorized', 'rate limit']):
-                            next_key = self._rotate_api_key()
+                            next_key = self._rotate_api_key(api_key)
                             if next_key and attempt < max_retries - 1:
                                 continue  # Retry with next key
-                        return []
+                        return None
                     
                     articles = data.get("articles", [])
                     logger.info(f"✓ Received {len(articles)} articles for '{topic}'")
@@ -207,16 +277,20 @@ class ArticleFetcher:
                     return cleaned_articles
                     
             except asyncio.TimeoutError:
+                if status is None:
+                    self._record_call("everything", api_key, "timeout", started)
                 logger.error(f"Timeout fetching articles for '{topic}'")
-                return []
+                return None
             except Exception as e:
+                if status is None:
+                    self._record_call("everything", api_key, "error", started)
                 logger.error(f"Error fetching articles for '{topic}': {str(e)}")
-                return []
+                return None
         
         logger.error(f"Failed to fetch articles for '{topic}' after {max_retries} attempts")
-        return []
+        return None
     
-    async def _fetch_top_headlines(self, session: aiohttp.ClientSession) -> List[Dict]:
+    async def _fetch_top_headlines(self, session: aiohttp.ClientSession) -> Optional[List[Dict]]:
         """
         Fetch trending top headlines with automatic API key fallback.
         
@@ -224,7 +298,8 @@ class ArticleFetcher:
             session: Aiohttp session
             
         Returns:
-            List of cleaned articles
+            List of cleaned articles, or None if the request failed
+            (timeout, API or key errors), as opposed to an empty result
         """
         max_retries = len(self.api_keys)
         
@@ -232,7 +307,7 @@ class ArticleFetcher:
             api_key = self._get_current_api_key()
             if not api_key:
                 logger.error("No working API keys available for top headlines")
-                return []
+                return None
             
             params = {
                 "apiKey": api_key,
@@ -241,20 +316,25 @@ class ArticleFetcher:
             }
             
             try:
-                logger.info(f"Fetching top headlines (trending news) [Key #{self.current_key_index + 1}]")
+                logger.info(f"Fetching top headlines (trending news) [Key #{self.keys.current_key_index + 1}]")
+                # HTTP status once the response arrives; the call is counted
+                # then, so errors while reading the body are not counted twice
+                started, status = time.perf_counter(), None
                 async with session.get(self.top_headlines_url, params=params, timeout=self.timeout) as response:
+                    status = response.status
+                    self._record_call("top-headlines", api_key, status, started)
                     
                     # Check for API key errors
                     if self._is_api_error(response.status):
                         logger.warning(f"API key error ({response.status}) for top headlines - attempting key rotation")
-                        next_key = self._rotate_api_key()
+                        next_key = self._rotate_api_key(api_key)
                         if next_key and attempt < max_retries - 1:
                             continue  # Retry with next key
-                        return []
+                        return None
                     
                     if response.status != 200:
                         logger.error(f"API error for top headlines: {response.status}")
-                        return []
+                        return None
                     
                     data = await response.json()
                     
@@ -264,10 +344,10 @@ class ArticleFetcher:
                         
                         # Check if error is key-related
                         if any(keyword in error_message.lower() for keyword in ['api key', 'unauthorized', 'rate limit']):
-                            next_key = self._rotate_api_key()
+                            next_key = self._rotate_api_key(api_key)
                             if next_key and attempt < max_retries - 1:
                                 continue  # Retry with next key
-                        return []
+                        return None
                     
                     articles = data.get("articles", [])
                     logger.info(f"✓ Received {len(articles)} top headlines")
@@ -275,7 +355,7 @@ class ArticleFetcher:
                     # Clean and deduplicate
                     cleaned_articles = []
                     for article in articles:
-                        cleaned = self._clean_article(article, search_topic="trending")
+                        cleaned = self._clean_article(article, search_topic=TRENDING_TOPIC)
                         if cleaned:
                             cleaned_articles.append(cleaned)
                     
@@ -283,14 +363,18 @@ class ArticleFetcher:
                     return cleaned_articles
                     
             except asyncio.TimeoutError:
+                if status is None:
+                    self._record_call("top-headlines", api_key, "timeout", started)
                 logger.error("Timeout fetching top headlines")
-                return []
+                return None
             except Exception as e:
+                if status is None:
+                    self._record_call("top-headlines", api_key, "error", started)
                 logger.error(f"Error fetching top headlines: {str(e)}")
-                return []
+                return None
         
         logger.error(f"Failed to fetch top headlines after {max_retries} attempts")
-        return []
+        return None
     
     async def fetch_all_articles(self, topics: Optional[List[str]] = None) -> List[Dict]:
         """
@@ -316,7 +400,7 @@ class ArticleFetcher:
             
             # Fetch top headlines first
             headlines = await self._fetch_top_headlines(session)
-            all_articles.extend(headlines)
+            all_articles.extend(headlines or [])
             
             # Fetch articles for each topic with semaphore for rate limiting
             semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_REQUESTS)
@@ -339,6 +423,50 @@ class ArticleFetcher:
         logger.info(f"✓ Total unique articles fetched: {len(all_articles)}")
         return all_articles
     
+    async def fetch_by_topic(
+        self,
+        topics: List[str],
+        sort_by: str = "relevancy",
+        since: Optional[Dict[str, Optional[datetime]]] = None
+    ) -> Dict[str, Optional[List[Dict]]]:
+        """
+        Fetch a set of topics, keeping each topic's articles separate.
+        
+        Used by the daemon scheduler, which needs per-topic yields and
+        must not mistake a failed request for a topic with no news.
+        TRENDING_TOPIC fetches the top headlines.
+        
+        Args:
+            topics: Topics to fetch
+            sort_by: Sort method for topic searches
+            since: Topic -> only articles published after this time
+                (top headlines have no date filter)
+            
+        Returns:
+            Dict of topic -> cleaned articles (None when the fetch failed)
+        """
+        connector = aiohttp.TCPConnector(limit=config.MAX_CONCURRENT_REQUESTS)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_REQUESTS)
+            
+            async def fetch_with_semaphore(topic: str):
+                async with semaphore:
+                    if topic == TRENDING_TOPIC:
+                        return await self._fetch_top_headlines(session)
+                    return await self._fetch_articles_for_topic(
+                        session, topic, sort_by=sort_by, since=(since or {}).get(topic)
+                    )
+            
+            results = await asyncio.gather(*(fetch_with_semaphore(t) for t in topics), return_exceptions=True)
+        
+        by_topic = {}
+        for topic, result in zip(topics, results):
+            if isinstance(result, Exception):
+                logger.error(f"Task failed with exception for '{topic}': {result}")
+                result = None
+            by_topic[topic] = result
+        return by_topic
+    
     def reset_deduplication(self):
         """Clear deduplication cache."""
         self.seen_urls.clear()
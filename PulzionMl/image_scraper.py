@@ -1,12 +1,20 @@
 import asyncio
+import codecs
 import logging
-from pymongo import MongoClient, UpdateOne
+from html.parser import HTMLParser
+from pymongo import MongoClient
 import aiohttp
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import os
+from typing import Dict, Optional
 from dotenv import load_dotenv
 
+from bulk_writer import BulkWriter, update_one
+from scrape_cache import (
+    ScrapeCache, STATUS_ERROR, STATUS_FOUND, STATUS_NO_IMAGE, STATUS_NOT_MODIFIED
+)
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -16,63 +24,287 @@ MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
 DATABASE_NAME = "news_pipeline"
 COLLECTION_NAME = "articles"
 
+MAX_CONCURRENT_PAGES = int(os.getenv("IMAGE_SCRAPER_CONCURRENCY", "64"))
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("IMAGE_SCRAPER_PER_HOST", "4"))
+CURSOR_BATCH_SIZE = 500
+WRITE_BATCH_SIZE = 200
 
-async def extract_best_image(url, session):
-    """Scrape a webpage to find the best image."""
+STREAM_CHUNK_SIZE = 8192
+HEAD_BYTE_CAP = 64 * 1024    # stop the streaming meta-tag scan after this many bytes
+BODY_BYTE_CAP = 512 * 1024   # max bytes read for the full-parse fallback
+
+USE_SCRAPE_CACHE = os.getenv("IMAGE_SCRAPER_CACHE", "1") != "0"
+
+
+# (attribute, value) pairs of <meta> image tags, in priority order
+META_IMAGE_TAGS = [
+    ("property", "og:image"),
+    ("name", "twitter:image"),
+    ("itemprop", "image"),
+]
+
+
+class MetaImageParser(HTMLParser):
+    """
+    Incremental parser that collects image <meta> tags and the first <img>.
+    Fed chunk by chunk while the page downloads; `head_done` flips at
+    </head> (or <body>) so the caller can stop reading early.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.first_img = None
+        self.head_done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta":
+            attrs = dict(attrs)
+            content = attrs.get("content")
+            if not content:
+                return
+            for key in META_IMAGE_TAGS:
+                attr, value = key
+                if attrs.get(attr) == value and key not in self.meta:
+                    self.meta[key] = content
+        elif tag == "img" and self.first_img is None:
+            src = dict(attrs).get("src")
+            if src:
+                self.first_img = src
+        elif tag == "body":
+            self.head_done = True
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.head_done = True
+
+    def best_meta(self):
+        for key in META_IMAGE_TAGS:
+            if key in self.meta:
+                return self.meta[key]
+        return None
+
+    def is_done(self) -> bool:
+        """True once further bytes cannot improve the result."""
+        if META_IMAGE_TAGS[0] in self.meta:
+            return True
+        if self.head_done:
+            return bool(self.meta) or self.first_img is not None
+        return False
+
+
+def _full_parse_best_image(html: str):
+    """Original full-tree lookup, used when the streaming scan comes up empty."""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # 1. Check OpenGraph/Twitter meta tags
+    for attr, value in META_IMAGE_TAGS:
+        tag = soup.find("meta", {attr: value})
+        if tag and tag.get("content"):
+            return tag["content"]
+
+    # 2. Fallback: pick first <img> on page
+    img = soup.find("img", src=True)
+    if img:
+        return img["src"]
+    return None
+
+
+async def fetch_best_image(url, session, headers: Optional[Dict[str, str]] = None) -> Dict:
+    """
+    Find the best image for a webpage.
+    Streams the response through MetaImageParser and stops at </head>
+    (or HEAD_BYTE_CAP) once a candidate is known. Only when the scan hits
+    the cap without a result is more of the body read (up to
+    BODY_BYTE_CAP) and parsed with BeautifulSoup.
+
+    Args:
+        url: Page URL
+        session: aiohttp session
+        headers: Extra request headers (e.g. conditional request validators)
+
+    Returns:
+        Dict with status ('found', 'no_image', 'error', 'not_modified'),
+        image_url, http_status, etag and last_modified
+    """
+    result = {"status": STATUS_ERROR, "image_url": None, "http_status": None,
+              "etag": None, "last_modified": None}
     try:
-        async with session.get(url, ssl=False, timeout=10) as resp:
+        async with session.get(url, ssl=False, timeout=10, headers=headers) as resp:
+            result["http_status"] = resp.status
+            if resp.status == 304:
+                result["status"] = STATUS_NOT_MODIFIED
+                return result
             if resp.status != 200:
-                return None
-            html = await resp.text()
-            soup = BeautifulSoup(html, 'html.parser')
-
-            # 1. Check OpenGraph/Twitter meta tags
-            for tag_name, attr, value in [
-                ("meta", "property", "og:image"),
-                ("meta", "name", "twitter:image"),
-                ("meta", "itemprop", "image")
-            ]:
-                tag = soup.find(tag_name, {attr: value})
-                if tag and tag.get("content"):
-                    return urljoin(url, tag["content"])
-
-            # 2. Fallback: pick first <img> on page
-            img = soup.find("img", src=True)
-            if img:
-                return urljoin(url, img["src"])
+                return result
+            result["etag"] = resp.headers.get("ETag")
+            result["last_modified"] = resp.headers.get("Last-Modified")
+            result["status"] = STATUS_NO_IMAGE
+
+            charset = resp.charset or "utf-8"
+            try:
+                decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+            except LookupError:
+                charset = "utf-8"
+                decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+
+            parser = MetaImageParser()
+            chunks = []
+            received = 0
+            async for chunk in resp.content.iter_chunked(STREAM_CHUNK_SIZE):
+                chunks.append(chunk)
+                received += len(chunk)
+                parser.feed(decoder.decode(chunk))
+                if parser.is_done() or received >= HEAD_BYTE_CAP:
+                    break
+
+            image = parser.best_meta() or parser.first_img
+
+            # Nothing found before the cap: read a bounded amount more and do a full parse
+            if not image and received >= HEAD_BYTE_CAP and not resp.content.at_eof():
+                async for chunk in resp.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    chunks.append(chunk)
+                    received += len(chunk)
+                    if received >= BODY_BYTE_CAP:
+                        break
+                html = b"".join(chunks).decode(charset, errors="replace")
+                image = _full_parse_best_image(html)
+
+            if image:
+                result["status"] = STATUS_FOUND
+                result["image_url"] = urljoin(url, image)
     except Exception as e:
+        result["status"] = STATUS_ERROR
         logger.warning(f"Failed to extract image from {url}: {e}")
-    return None
+    return result
 
 
-async def update_images():
+async def extract_best_image(url, session):
+    """Scrape a webpage to find the best image (image URL or None)."""
+    result = await fetch_best_image(url, session)
+    return result["image_url"]
+
+
+def _next_chunk(cursor, size):
+    """Pull up to `size` documents from a blocking pymongo cursor."""
+    chunk = []
+    for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) >= size:
+            break
+    return chunk
+
+
+async def update_images(
+    concurrency: int = MAX_CONCURRENT_PAGES,
+    per_host: int = MAX_CONNECTIONS_PER_HOST,
+    use_cache: bool = USE_SCRAPE_CACHE
+):
+    """
+    Scrape images for all articles missing `urlToImage`.
+    Articles are streamed from a cursor into a bounded queue consumed by
+    `concurrency` workers; aiohttp caps open connections per publisher and
+    found images are flushed through a BulkWriter off the event loop.
+    With `use_cache`, URLs that recently failed and hosts that never yield
+    images are skipped, and retried URLs are fetched conditionally.
+    """
     client = MongoClient(MONGODB_URI)
     collection = client[DATABASE_NAME][COLLECTION_NAME]
+    writer = BulkWriter(collection)
+    loop = asyncio.get_running_loop()
+    cache = await loop.run_in_executor(None, ScrapeCache, client[DATABASE_NAME]) if use_cache else None
+
+    query = {"url": {"$exists": True}, "urlToImage": {"$exists": False}}
+    total = await loop.run_in_executor(None, collection.count_documents, query)
+    logger.info(f"Found {total} articles without images "
+                f"(workers: {concurrency}, per-host connections: {per_host})")
 
-    # Find all articles with missing urlToImage
-    articles = list(collection.find({"url": {"$exists": True}, "urlToImage": {"$exists": False}}))
-    logger.info(f"Found {len(articles)} articles without images")
+    cursor = collection.find(query, {"url": 1}).batch_size(CURSOR_BATCH_SIZE)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    updates = []
+    stats = {"scanned": 0, "found": 0, "updated": 0, "cached": 0, "skipped": 0}
 
-    async with aiohttp.ClientSession() as session:
-        updates = []
-        for article in articles:
+    async def flush(force: bool = False):
+        nonlocal updates
+        cache_pending = cache.pending_count if cache else 0
+        if len(updates) < WRITE_BATCH_SIZE and cache_pending < WRITE_BATCH_SIZE and not force:
+            return
+        ops, updates = updates, []
+        if cache and cache_pending:
+            await loop.run_in_executor(None, cache.flush)
+        if not ops:
+            return
+        report = await loop.run_in_executor(None, writer.write, ops)
+        stats["updated"] += report["modified"]
+        if report["errors"]:
+            logger.error(f"Bulk write failed for {report['errors']} of {len(ops)} updates")
+        logger.info(f"Updated {report['modified']} articles "
+                    f"(scanned {stats['scanned']}/{total}, found {stats['found']}, "
+                    f"skipped {stats['skipped']})")
+
+    async def produce():
+        try:
+            while True:
+                docs = await loop.run_in_executor(None, _next_chunk, cursor, CURSOR_BATCH_SIZE)
+                if not docs:
+                    break
+                entries = {}
+                if cache:
+                    entries = await loop.run_in_executor(None, cache.lookup, [d["url"] for d in docs])
+                for doc in docs:
+                    entry = entries.get(doc["url"])
+                    if cache:
+                        if entry and entry.get("status") == STATUS_FOUND and entry.get("image_url"):
+                            # Already scraped; the article write just never landed
+                            stats["cached"] += 1
+                            updates.append(update_one({"_id": doc["_id"]}, {"$set": {"urlToImage": entry["image_url"]}}))
+                            continue
+                        skip, _ = cache.should_skip(doc["url"], entry)
+                        if skip:
+                            stats["skipped"] += 1
+                            continue
+                    doc["_cache_entry"] = entry
+                    await queue.put(doc)
+        finally:
+            for _ in range(concurrency):
+                await queue.put(None)
+
+    async def work(session):
+        while True:
+            article = await queue.get()
+            if article is None:
+                return
             url = article["url"]
-            image_url = await extract_best_image(url, session)
+            entry = article.get("_cache_entry")
+            headers = ScrapeCache.conditional_headers(entry) if cache else None
+            result = await fetch_best_image(url, session, headers=headers)
+            if cache:
+                entry = cache.record(url, result, previous=entry)
+                image_url = entry["image_url"] if entry["status"] == STATUS_FOUND else None
+            else:
+                image_url = result["image_url"]
+            stats["scanned"] += 1
             if image_url:
-                updates.append(UpdateOne({"_id": article["_id"]}, {"$set": {"urlToImage": image_url}}))
-                logger.info(f"Found image for {url}: {image_url}")
+                stats["found"] += 1
+                updates.append(update_one({"_id": article["_id"]}, {"$set": {"urlToImage": image_url}}))
+                logger.debug(f"Found image for {url}: {image_url}")
+            await flush()
 
-            # Bulk write in batches of 50 to avoid overload
-            if len(updates) >= 50:
-                result = collection.bulk_write(updates, ordered=False)
-                logger.info(f"Updated {result.modified_count} articles")
-                updates = []
-
-        if updates:
-            result = collection.bulk_write(updates, ordered=False)
-            logger.info(f"Updated {result.modified_count} articles")
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ttl_dns_cache=300)
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await asyncio.gather(produce(), *(work(session) for _ in range(concurrency)))
+        await flush(force=True)
+    finally:
+        cursor.close()
+        writer.close()
+        client.close()
 
-    client.close()
+    logger.info(f"Done: scanned {stats['scanned']}, found {stats['found']}, updated {stats['updated']}, "
+                f"from cache {stats['cached']}, skipped {stats['skipped']}")
 
 
 if __name__ == "__main__":
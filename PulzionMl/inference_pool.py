@@ -0,0 +1,338 @@
+"""
+Multi-process model inference for CPU nodes.
+Runs N worker processes, each holding its own copy of a stage model with
+a pinned PyTorch thread count, fans batches out to them and gathers the
+results back in order. Small batches scale much better this way than
+with PyTorch intra-op threading in a single process.
+
+The sharded classes expose the same batch methods as ArticleLabeler,
+EmbeddingGenerator and ArticleAnalyzer, so the pipeline uses them
+unchanged; create_model() picks one or the other from
+config.INFERENCE_WORKERS.
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent import futures
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import config
+from storage import STAGE_ANALYZE, STAGE_EMBED, STAGE_LABEL
+
+logger = logging.getLogger(__name__)
+
+# Result fields copied back from the workers, per stage
+STAGE_RESULT_FIELDS = {
+    STAGE_LABEL: ('categories', 'category_scores'),
+    STAGE_EMBED: ('embedding', 'embedding_dim'),
+    STAGE_ANALYZE: ('keywords', 'keyword_scores', 'sentiment', 'sentiment_scores', 'sentiment_confidence'),
+}
+
+STAGE_METHODS = {
+    STAGE_LABEL: 'label_articles_batch',
+    STAGE_EMBED: 'generate_embeddings_batch',
+    STAGE_ANALYZE: 'analyze_articles_batch',
+}
+
+# Batches queued per worker, so workers never wait on the parent
+MAX_IN_FLIGHT_PER_WORKER = 2
+
+# Tag used to match worker results back to input articles
+_INDEX_FIELD = '_shard_index'
+
+# Model held by a worker process (set by _init_worker)
+_model = None
+_stage = None
+
+
+def model_class(stage: str):
+    """Model class for a stage (imported lazily)."""
+    if stage == STAGE_LABEL:
+        from labeling import ArticleLabeler
+        return ArticleLabeler
+    if stage == STAGE_EMBED:
+        from embeddings import EmbeddingGenerator
+        return EmbeddingGenerator
+    if stage == STAGE_ANALYZE:
+        from analyzer import ArticleAnalyzer
+        return ArticleAnalyzer
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def default_factory(stage: str, **model_kwargs):
+    """Build the in-process model for a stage."""
+    return model_class(stage)(**model_kwargs)
+
+
+def pin_threads(threads: int):
+    """Limit BLAS/OpenMP and PyTorch to `threads` threads in this process."""
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    # Tokenizers spawn their own pool; one per process is enough
+    os.environ['TOKENIZERS_PARALLELISM'] = 'false'
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # already set (only allowed before the first parallel op)
+
+
+def _init_worker(stage: str, threads: int, factory: Callable, model_kwargs: Dict):
+    """Worker initializer: pin threads, then load the model once."""
+    global _model, _stage
+    pin_threads(threads)
+    _stage = stage
+    _model = factory(stage, **model_kwargs)
+
+
+def _infer(articles: List[Dict], options: Dict) -> List[Tuple[int, Dict]]:
+    """Run the stage model on one batch. Returns (index, result fields) pairs."""
+    results = getattr(_model, STAGE_METHODS[_stage])(articles, **options)
+    fields = STAGE_RESULT_FIELDS[_stage]
+    return [
+        (article[_INDEX_FIELD], {field: article[field] for field in fields if field in article})
+        for article in results
+    ]
+
+
+def _ping(delay: float) -> int:
+    time.sleep(delay)
+    return os.getpid()
+
+
+class InferenceExecutor:
+    """Pool of worker processes, each with its own model copy for one stage."""
+
+    def __init__(
+        self,
+        stage: str,
+        workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        factory: Callable = default_factory,
+        **model_kwargs
+    ):
+        """
+        Start the worker pool (models load in the background).
+
+        Args:
+            stage: STAGE_LABEL, STAGE_EMBED or STAGE_ANALYZE
+            workers: Worker processes (uses config if None)
+            threads_per_worker: PyTorch threads per worker (defaults to cores / workers)
+            factory: Picklable callable (stage, **model_kwargs) -> model, run in each worker
+            **model_kwargs: Passed to the model constructor (e.g. model_name)
+        """
+        if stage not in STAGE_METHODS:
+            raise ValueError(f"Unknown stage: {stage}")
+        self.stage = stage
+        self.workers = max(1, workers or config.INFERENCE_WORKERS)
+        self.threads_per_worker = threads_per_worker or config.INFERENCE_THREADS_PER_WORKER \
+            or max(1, (os.cpu_count() or 1) // self.workers)
+        self.input_fields = model_class(stage).INPUT_FIELDS
+
+        # spawn: each worker starts clean and loads its own model
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(stage, self.threads_per_worker, factory, model_kwargs)
+        )
+        logger.info(
+            f"Started {self.workers} {stage} inference workers "
+            f"({self.threads_per_worker} threads each)"
+        )
+
+    def warm_up(self, timeout: Optional[float] = None):
+        """
+        Block until every worker process has started and loaded its model.
+
+        Pings are sent in rounds of one per worker, each holding its
+        worker for a while so the others pick up the rest; a round where
+        one worker answered twice is repeated with longer pings until
+        every worker has answered.
+
+        Args:
+            timeout: Seconds to wait at most (None = no limit)
+
+        Returns:
+            Set of worker process ids
+
+        Raises:
+            TimeoutError: If not every worker answered within `timeout`
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pids = set()
+        hold = 0.2
+        while len(pids) < self.workers:
+            pings = [self._pool.submit(_ping, hold) for _ in range(self.workers)]
+            for ping in pings:
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    pids.add(ping.result(timeout=remaining))
+                except futures.TimeoutError:
+                    raise TimeoutError(
+                        f"Only {len(pids)} of {self.workers} {self.stage} workers ready after {timeout}s"
+                    ) from None
+            hold *= 2
+        logger.info(f"✓ {len(pids)} {self.stage} workers ready")
+        return pids
+
+    def map(
+        self,
+        articles: List[Dict],
+        task_size: int,
+        batch_callback: Optional[Callable[[List[Dict]], None]] = None,
+        **options
+    ) -> List[Dict]:
+        """
+        Run the stage on `articles`, `task_size` articles per worker task.
+
+        Only the stage's input fields are sent to the workers; result
+        fields are merged back into copies of the input articles.
+        batch_callback is invoked with each task's articles in input
+        order, as soon as that task and all earlier ones are done.
+        `options` are passed to the model's batch method.
+
+        Returns:
+            The processed articles, in input order
+        """
+        if not articles:
+            return []
+
+        processed = [dict(article) for article in articles]
+        pending: Deque[Tuple[List[Dict], Future]] = deque()
+        max_in_flight = self.workers * MAX_IN_FLIGHT_PER_WORKER
+
+        for start in range(0, len(processed), task_size):
+            batch = processed[start:start + task_size]
+            payload = [
+                {**{field: article[field] for field in self.input_fields if field in article},
+                 _INDEX_FIELD: start + offset}
+                for offset, article in enumerate(batch)
+            ]
+            pending.append((batch, self._pool.submit(_infer, payload, options)))
+            if len(pending) >= max_in_flight:
+                self._gather(processed, *pending.popleft(), batch_callback)
+
+        while pending:
+            self._gather(processed, *pending.popleft(), batch_callback)
+        return processed
+
+    def _gather(self, processed: List[Dict], batch: List[Dict], future: Future, batch_callback):
+        for index, fields in future.result():
+            processed[index].update(fields)
+        if batch_callback:
+            try:
+                batch_callback(batch)
+            except Exception as callback_error:
+                logger.error(f"Error in batch callback: {callback_error}")
+
+    def close(self):
+        """Stop the worker processes."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ShardedLabeler(InferenceExecutor):
+    """ArticleLabeler spread over worker processes."""
+
+    def __init__(self, workers: Optional[int] = None, **kwargs):
+        super().__init__(STAGE_LABEL, workers, **kwargs)
+
+    def label_articles_batch(
+        self,
+        articles: List[Dict],
+        multi_label: bool = True,
+        threshold: float = 0.5,
+        batch_size: Optional[int] = None,
+        batch_callback: Optional[Callable[[List[Dict]], None]] = None
+    ) -> List[Dict]:
+        batch_size = batch_size or config.LABELING_BATCH_SIZE
+        return self.map(
+            articles, batch_size, batch_callback,
+            multi_label=multi_label, threshold=threshold, batch_size=batch_size
+        )
+
+
+class ShardedEmbeddingGenerator(InferenceExecutor):
+    """EmbeddingGenerator spread over worker processes."""
+
+    def __init__(self, workers: Optional[int] = None, **kwargs):
+        super().__init__(STAGE_EMBED, workers, **kwargs)
+
+    def generate_embeddings_batch(
+        self,
+        articles: List[Dict],
+        batch_size: Optional[int] = None,
+        show_progress: bool = True,
+        batch_callback: Optional[Callable[[List[Dict]], None]] = None
+    ) -> List[Dict]:
+        batch_size = batch_size or config.EMBEDDING_BATCH_SIZE
+        return self.map(articles, batch_size, batch_callback, batch_size=batch_size, show_progress=False)
+
+
+class ShardedAnalyzer(InferenceExecutor):
+    """ArticleAnalyzer spread over worker processes."""
+
+    def __init__(self, workers: Optional[int] = None, **kwargs):
+        super().__init__(STAGE_ANALYZE, workers, **kwargs)
+
+    def analyze_articles_batch(
+        self,
+        articles: List[Dict],
+        extract_kw: bool = True,
+        analyze_sent: bool = True,
+        top_keywords: int = 10,
+        batch_size: int = 1,
+        batch_callback: Optional[Callable[[List[Dict]], None]] = None,
+        callback_every: Optional[int] = None
+    ) -> List[Dict]:
+        # The analyzer works article by article; fan out callback-sized groups
+        group = callback_every or config.ANALYSIS_CALLBACK_EVERY
+        return self.map(
+            articles, group, batch_callback,
+            extract_kw=extract_kw, analyze_sent=analyze_sent, top_keywords=top_keywords
+        )
+
+
+SHARDED_CLASSES = {
+    STAGE_LABEL: ShardedLabeler,
+    STAGE_EMBED: ShardedEmbeddingGenerator,
+    STAGE_ANALYZE: ShardedAnalyzer,
+}
+
+
+def create_model(stage: str, workers: Optional[int] = None, **model_kwargs) -> Any:
+    """
+    Model for a pipeline stage: in-process with one worker, sharded otherwise.
+
+    Args:
+        stage: STAGE_LABEL, STAGE_EMBED or STAGE_ANALYZE
+        workers: Worker processes (uses config.INFERENCE_WORKERS if None)
+        **model_kwargs: Passed to the model constructor
+
+    Returns:
+        An object with the stage's batch method (call close_model() when done)
+    """
+    workers = workers or config.INFERENCE_WORKERS
+    if workers <= 1:
+        return default_factory(stage, **model_kwargs)
+    return SHARDED_CLASSES[stage](workers, **model_kwargs)
+
+
+def close_model(model: Any):
+    """Release a model from create_model() (stops worker processes if sharded)."""
+    if isinstance(model, InferenceExecutor):
+        model.close()
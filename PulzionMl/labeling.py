@@ -5,8 +5,6 @@ Uses transformer models with batch processing for efficiency.
 
 import logging
 from typing import Callable, Dict, List, Optional
-import torch
-from transformers import pipeline
 from tqdm import tqdm
 
 import config
@@ -16,6 +14,9 @@ logger = logging.getLogger(__name__)
 
 class ArticleLabeler:
     """Zero-shot classification for article categorization."""
+
+    # Article fields read by this stage (used as the MongoDB projection)
+    INPUT_FIELDS = ['title', 'description', 'url']
     
     def __init__(self, model_name: Optional[str] = None, categories: Optional[List[str]] = None):
         """
@@ -25,6 +26,10 @@ class ArticleLabeler:
             model_name: Hugging Face model name (uses config if None)
             categories: List of categories (uses config if None)
         """
+        # Heavy ML imports are deferred until a labeler is actually created
+        import torch
+        from transformers import pipeline
+
         self.model_name = model_name or config.ZERO_SHOT_MODEL
         self.categories = categories or config.CATEGORIES
         self.device = 0 if torch.cuda.is_available() else -1
@@ -3,44 +3,53 @@ Main orchestration script for the news article pipeline.
 Coordinates all modules and provides comprehensive logging and timing.
 """
 
+import argparse
 import asyncio
 import logging
 import sys
 import time
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
 
 import config
+import metrics
 from fetcher import fetch_articles
-from storage import ArticleStorage
+from storage import ArticleStorage, PIPELINE_STAGES, STAGE_ANALYZE, STAGE_EMBED, STAGE_LABEL
+from checkpoint import RunCheckpoint, STATUS_FAILED, STATUS_SKIPPED
 from labeling import ArticleLabeler
 from embeddings import EmbeddingGenerator
 from analyzer import ArticleAnalyzer
-
-# Configure logging with UTF-8 encoding to handle emojis on Windows
-logging.basicConfig(
-    level=getattr(logging, config.LOG_LEVEL),
-    format=config.LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(config.LOG_FILE, encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-# Force UTF-8 encoding for stdout/stderr on Windows
-try:
-    if sys.stdout.encoding != 'utf-8':
-        sys.stdout.reconfigure(encoding='utf-8')
-    if sys.stderr.encoding != 'utf-8':
-        sys.stderr.reconfigure(encoding='utf-8')
-except (AttributeError, OSError):
-
-    import os
-    os.environ['PYTHONIOENCODING'] = 'utf-8'
+from inference_pool import close_model, create_model
 
 logger = logging.getLogger(__name__)
 
 
+def setup_logging():
+    """
+    Configure pipeline logging (file and stdout) for command-line runs.
+    Done here rather than at import so importing main has no side effects.
+    """
+    # Force UTF-8 encoding for stdout/stderr on Windows
+    try:
+        if sys.stdout.encoding != 'utf-8':
+            sys.stdout.reconfigure(encoding='utf-8')
+        if sys.stderr.encoding != 'utf-8':
+            sys.stderr.reconfigure(encoding='utf-8')
+    except (AttributeError, OSError):
+        import os
+        os.environ['PYTHONIOENCODING'] = 'utf-8'
+    
+    # Configure logging with UTF-8 encoding to handle emojis on Windows
+    logging.basicConfig(
+        level=getattr(logging, config.LOG_LEVEL),
+        format=config.LOG_FORMAT,
+        handlers=[
+            logging.FileHandler(config.LOG_FILE, encoding='utf-8'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+
 class PipelineStats:
     """Track pipeline statistics."""
     
@@ -50,6 +59,7 @@ class PipelineStats:
         self.articles_fetched = 0
         self.articles_stored = 0
         self.articles_updated = 0
+        self.articles_unchanged = 0
         self.articles_labeled = 0
         self.embeddings_generated = 0
         self.keywords_extracted = 0
@@ -78,6 +88,7 @@ class PipelineStats:
         logger.info(f"   ├─ Articles fetched:        {self.articles_fetched:,}")
         logger.info(f"   ├─ New articles stored:     {self.articles_stored:,}")
         logger.info(f"   ├─ Articles updated:        {self.articles_updated:,}")
+        logger.info(f"   ├─ Articles unchanged:      {self.articles_unchanged:,}")
         logger.info(f"   ├─ Articles labeled:        {self.articles_labeled:,}")
         logger.info(f"   ├─ Embeddings generated:    {self.embeddings_generated:,}")
         logger.info(f"   ├─ Keywords extracted:      {self.keywords_extracted:,}")
@@ -97,6 +108,344 @@ class PipelineStats:
     def record_stage(self, stage_name: str, duration: float):
         """Record stage timing."""
         self.stage_times[stage_name] = duration
+        metrics.STAGE_DURATION.labels(stage=stage_name).set(duration)
+
+
+def iter_stage_chunks(storage: ArticleStorage, stage: str, fields: List[str], owner: str):
+    """
+    Claim and yield chunks of articles pending `stage` until none are left.
+
+    Chunks of config.STAGE_CHUNK_SIZE articles (only `fields` are fetched)
+    are leased to `owner`, so several pipeline processes can share the
+    backlog without processing the same article twice. Stops after
+    config.MAX_ARTICLES_PER_STAGE articles when set.
+    """
+    seen = 0
+    limit = config.MAX_ARTICLES_PER_STAGE
+    while limit is None or seen < limit:
+        size = config.STAGE_CHUNK_SIZE if limit is None else min(config.STAGE_CHUNK_SIZE, limit - seen)
+        chunk = storage.claim_batch(stage, owner, size, projection=fields)
+        if not chunk:
+            return
+        seen += len(chunk)
+        logger.info(f"Processing {len(chunk)} articles ({seen:,} so far)")
+        yield chunk
+
+
+class ChunkLease:
+    """
+    Lease bookkeeping for one claimed chunk.
+
+    Leases on the unfinished articles are renewed after every persisted
+    model batch, so a chunk that runs longer than config.CLAIM_LEASE_SECONDS
+    is not reclaimed by another worker half-way. Articles still unfinished
+    when the chunk ends produced no result; finish() releases them with a
+    failed attempt recorded (see ArticleStorage.fail_leases).
+    Without an owner (articles that were not claimed) it does nothing.
+    """
+
+    def __init__(self, storage: ArticleStorage, stage: str, owner: Optional[str], articles: List[Dict]):
+        self.storage = storage
+        self.stage = stage
+        self.owner = owner
+        self.unfinished = {article['_id'] for article in articles}
+
+    def persisted(self, article_ids: List):
+        """Mark articles done and extend the leases on the rest."""
+        self.unfinished.difference_update(article_ids)
+        if self.owner and self.unfinished:
+            self.storage.renew_leases(self.stage, self.owner, list(self.unfinished))
+
+    def finish(self) -> int:
+        """Release the articles that produced no result. Returns articles given up on."""
+        if not self.owner or not self.unfinished:
+            return 0
+        logger.warning(f"{len(self.unfinished)} articles produced no '{self.stage}' result")
+        return self.storage.fail_leases(self.stage, self.owner, list(self.unfinished))
+
+
+def label_chunk(
+    storage: ArticleStorage,
+    labeler: ArticleLabeler,
+    articles: List[Dict],
+    on_persist: Optional[Callable[[int], None]] = None,
+    owner: Optional[str] = None
+) -> int:
+    """
+    Label a chunk of articles, persisting each model batch as soon as it is done.
+    Pass the lease `owner` for claimed chunks (see ChunkLease).
+
+    Returns:
+        Articles labeled
+    """
+    labeled_count = 0
+    timer = metrics.BatchTimer(STAGE_LABEL)
+    lease = ChunkLease(storage, STAGE_LABEL, owner, articles)
+
+    def persist_batch(batch_articles: List[Dict]):
+        nonlocal labeled_count
+        timer.lap(len(batch_articles))
+        updates = [
+            (
+                article['_id'],
+                {
+                    'categories': article.get('categories', []),
+                    'category_scores': article.get('category_scores', {})
+                }
+            )
+            for article in batch_articles
+            if article.get('categories')
+        ]
+
+        if updates:
+            updated = storage.update_articles_batch(updates, complete_stage=STAGE_LABEL)
+            labeled_count += updated
+            metrics.ARTICLES_PROCESSED.labels(stage=STAGE_LABEL).inc(updated)
+            if on_persist:
+                on_persist(updated)
+        lease.persisted([article_id for article_id, _ in updates])
+        timer.reset()
+
+    labeler.label_articles_batch(
+        articles,
+        multi_label=True,
+        threshold=0.4,
+        batch_callback=persist_batch
+    )
+    lease.finish()
+    return labeled_count
+
+
+def embed_chunk(
+    storage: ArticleStorage,
+    generator: EmbeddingGenerator,
+    articles: List[Dict],
+    show_progress: bool = True,
+    on_persist: Optional[Callable[[int], None]] = None,
+    owner: Optional[str] = None
+) -> int:
+    """
+    Embed a chunk of articles, persisting each model batch as soon as it is done.
+    Pass the lease `owner` for claimed chunks (see ChunkLease).
+
+    Returns:
+        Embeddings stored
+    """
+    embedded_count = 0
+    timer = metrics.BatchTimer(STAGE_EMBED)
+    lease = ChunkLease(storage, STAGE_EMBED, owner, articles)
+
+    def persist_batch(batch_articles: List[Dict]):
+        nonlocal embedded_count
+        timer.lap(len(batch_articles))
+        updates = [
+            (
+                article['_id'],
+                {
+                    'embedding': article.get('embedding'),
+                    'embedding_dim': article.get('embedding_dim', 0)
+                }
+            )
+            for article in batch_articles
+            if article.get('embedding') is not None
+        ]
+
+        if updates:
+            updated = storage.update_articles_batch(updates, complete_stage=STAGE_EMBED)
+            embedded_count += updated
+            metrics.ARTICLES_PROCESSED.labels(stage=STAGE_EMBED).inc(updated)
+            if on_persist:
+                on_persist(updated)
+        lease.persisted([article_id for article_id, _ in updates])
+        timer.reset()
+
+    generator.generate_embeddings_batch(articles, show_progress=show_progress, batch_callback=persist_batch)
+    lease.finish()
+    return embedded_count
+
+
+def analyze_chunk(
+    storage: ArticleStorage,
+    analyzer: ArticleAnalyzer,
+    articles: List[Dict],
+    on_persist: Optional[Callable[[int], None]] = None,
+    owner: Optional[str] = None
+) -> Tuple[int, int]:
+    """
+    Extract keywords and sentiment for a chunk of articles, persisting
+    results every config.ANALYSIS_CALLBACK_EVERY articles.
+    Pass the lease `owner` for claimed chunks (see ChunkLease).
+
+    Returns:
+        (keywords extracted, sentiments analyzed)
+    """
+    keywords_extracted = 0
+    sentiments_analyzed = 0
+    timer = metrics.BatchTimer(STAGE_ANALYZE)
+    lease = ChunkLease(storage, STAGE_ANALYZE, owner, articles)
+
+    def persist_batch(batch_articles: List[Dict]):
+        nonlocal keywords_extracted, sentiments_analyzed
+        timer.lap(len(batch_articles))
+        updates = []
+        for article in batch_articles:
+            update_dict = {}
+            
+            if article.get('keywords'):
+                update_dict['keywords'] = article['keywords']
+                update_dict['keyword_scores'] = article.get('keyword_scores', {})
+            
+            if article.get('sentiment'):
+                update_dict['sentiment'] = article['sentiment']
+                update_dict['sentiment_scores'] = article.get('sentiment_scores', {})
+                update_dict['sentiment_confidence'] = article.get('sentiment_confidence', 0)
+            
+            if update_dict:
+                updates.append((article['_id'], update_dict))
+
+        if updates:
+            storage.update_articles_batch(updates, complete_stage=STAGE_ANALYZE)
+            keywords_extracted += sum(1 for a in batch_articles if a.get('keywords'))
+            sentiments_analyzed += sum(1 for a in batch_articles if a.get('sentiment'))
+            metrics.ARTICLES_PROCESSED.labels(stage=STAGE_ANALYZE).inc(len(updates))
+            if on_persist:
+                on_persist(len(updates))
+        lease.persisted([article_id for article_id, _ in updates])
+        timer.reset()
+
+    analyzer.analyze_articles_batch(
+        articles,
+        extract_kw=config.ENABLE_KEYWORD_EXTRACTION,
+        analyze_sent=config.ENABLE_SENTIMENT_ANALYSIS,
+        batch_callback=persist_batch
+    )
+    lease.finish()
+    return keywords_extracted, sentiments_analyzed
+
+
+def label_stage(
+    storage: ArticleStorage,
+    owner: str,
+    on_persist: Optional[Callable[[int], None]] = None,
+    labeler: Optional[ArticleLabeler] = None
+) -> int:
+    """
+    Label every article pending the label stage. Returns articles labeled.
+
+    A preloaded `labeler` is used and left open (the daemon keeps models
+    warm between cycles); otherwise one is created for the first chunk
+    and closed when the stage ends.
+    """
+    owns_model = labeler is None
+    labeled_count = 0
+    chunks = 0
+
+    try:
+        for chunk in iter_stage_chunks(storage, STAGE_LABEL, ArticleLabeler.INPUT_FIELDS, owner):
+            if labeler is None:
+                labeler = create_model(STAGE_LABEL)
+            chunks += 1
+            labeled_count += label_chunk(storage, labeler, chunk, on_persist=on_persist, owner=owner)
+    finally:
+        if owns_model:
+            close_model(labeler)
+
+    if not chunks:
+        logger.info("No articles need labeling")
+    return labeled_count
+
+
+def embed_stage(
+    storage: ArticleStorage,
+    owner: str,
+    on_persist: Optional[Callable[[int], None]] = None,
+    generator: Optional[EmbeddingGenerator] = None
+) -> int:
+    """
+    Embed every article pending the embed stage. Returns embeddings stored.
+    A preloaded `generator` is used and left open, as in label_stage.
+    """
+    owns_model = generator is None
+    embedded_count = 0
+    chunks = 0
+
+    try:
+        for chunk in iter_stage_chunks(storage, STAGE_EMBED, EmbeddingGenerator.INPUT_FIELDS, owner):
+            if generator is None:
+                generator = create_model(STAGE_EMBED)
+            chunks += 1
+            embedded_count += embed_chunk(storage, generator, chunk, on_persist=on_persist, owner=owner)
+    finally:
+        if owns_model:
+            close_model(generator)
+
+    if not chunks:
+        logger.info("No articles need embeddings")
+    return embedded_count
+
+
+def analyze_stage(
+    storage: ArticleStorage,
+    owner: str,
+    on_persist: Optional[Callable[[int], None]] = None,
+    analyzer: Optional[ArticleAnalyzer] = None
+) -> Tuple[int, int]:
+    """
+    Extract keywords and sentiment for every article pending the analyze stage.
+    A preloaded `analyzer` is used and left open, as in label_stage.
+
+    Returns:
+        (keywords extracted, sentiments analyzed)
+    """
+    owns_model = analyzer is None
+    keywords_extracted = 0
+    sentiments_analyzed = 0
+    chunks = 0
+
+    try:
+        for chunk in iter_stage_chunks(storage, STAGE_ANALYZE, ArticleAnalyzer.INPUT_FIELDS, owner):
+            if analyzer is None:
+                analyzer = create_model(STAGE_ANALYZE)
+            chunks += 1
+            keywords, sentiments = analyze_chunk(storage, analyzer, chunk, on_persist=on_persist, owner=owner)
+            keywords_extracted += keywords
+            sentiments_analyzed += sentiments
+    finally:
+        if owns_model:
+            close_model(analyzer)
+
+    if not chunks:
+        logger.info("No articles need analysis")
+    return keywords_extracted, sentiments_analyzed
+
+
+def should_run_stage(checkpoint: RunCheckpoint, stage: str, enabled: bool) -> bool:
+    """
+    Decide whether a run stage executes, recording skipped stages.
+    Stages completed by an earlier attempt of the run are not repeated.
+    """
+    if checkpoint.is_done(stage):
+        if enabled:
+            logger.info(f"⏭️  Stage '{stage}' already completed in run {checkpoint.run_id}")
+        return False
+    if not enabled:
+        checkpoint.complete_stage(stage, STATUS_SKIPPED)
+        return False
+    checkpoint.start_stage(stage)
+    return True
+
+
+def _failed_run(checkpoint: Optional[RunCheckpoint], error: str) -> Dict:
+    """Mark the run failed and build the failure result."""
+    result = {'success': False, 'error': error}
+    if checkpoint is not None:
+        try:
+            checkpoint.finish(STATUS_FAILED, error)
+        except Exception as e:
+            logger.warning(f"Could not record run failure: {e}")
+        result['run_id'] = checkpoint.run_id
+        logger.info(f"↩️  Resume with: python main.py --resume {checkpoint.run_id}")
+    return result
 
 
 async def run_pipeline(
@@ -104,31 +453,68 @@ async def run_pipeline(
     skip_fetch: bool = False,
     skip_labeling: bool = False,
     skip_embeddings: bool = False,
-    skip_analysis: bool = False
+    skip_analysis: bool = False,
+    worker_id: Optional[str] = None,
+    resume_run: Optional[str] = None
 ) -> Dict:
     """
     Run the complete news article pipeline.
     
+    Every run is checkpointed in the pipeline_runs collection; stages that
+    completed are skipped when the run is resumed, and model results are
+    persisted batch by batch, so an interrupted stage continues with the
+    articles it had not finished.
+    
     Args:
         topics: List of topics to fetch (uses config if None)
         skip_fetch: Skip fetching (process existing articles)
         skip_labeling: Skip categorization
         skip_embeddings: Skip embedding generation
         skip_analysis: Skip keyword and sentiment analysis
+        worker_id: Lease owner for claimed articles (defaults to the run's id)
+        resume_run: Run id to resume (its stored options replace the arguments above)
         
     Returns:
         Dict with pipeline statistics
     """
     stats = PipelineStats()
     stats.start()
+    checkpoint = None
+    storage = None
     
     try:
         # Initialize storage
         logger.info("🔌 Connecting to database...")
         storage = ArticleStorage()
+        storage.backfill_processing_state()
+        
+        if resume_run:
+            checkpoint = RunCheckpoint.resume(storage.db, resume_run)
+            options = checkpoint.options
+            topics = options.get('topics')
+            skip_fetch = options.get('skip_fetch', False)
+            skip_labeling = options.get('skip_labeling', False)
+            skip_embeddings = options.get('skip_embeddings', False)
+            skip_analysis = options.get('skip_analysis', False)
+        else:
+            checkpoint = RunCheckpoint.create(storage.db, {
+                'topics': topics,
+                'skip_fetch': skip_fetch,
+                'skip_labeling': skip_labeling,
+                'skip_embeddings': skip_embeddings,
+                'skip_analysis': skip_analysis,
+            })
+        
+        worker_id = worker_id or checkpoint.owner
+        if resume_run:
+            # Batches the interrupted attempt held but never persisted
+            released = sum(storage.release_leases(stage, worker_id) for stage in PIPELINE_STAGES)
+            if released:
+                logger.info(f"Released {released} leases held by the interrupted attempt")
+        logger.info(f"Worker id: {worker_id}")
         logger.info("")
         
-        if not skip_fetch:
+        if should_run_stage(checkpoint, 'fetch', not skip_fetch):
             logger.info("="*80)
             logger.info("📰 STAGE 1: FETCHING ARTICLES")
             logger.info("="*80)
@@ -142,7 +528,7 @@ async def run_pipeline(
             logger.info("")
         else:
             logger.info("⏭️  Skipping fetch - will process existing articles")
-            articles = []
+            articles = None
         
         # ============ STAGE 2: STORE ARTICLES ============
         if articles:
@@ -154,143 +540,59 @@ async def run_pipeline(
             result = storage.save_articles(articles)
             stats.articles_stored = result['inserted']
             stats.articles_updated = result['updated']
+            stats.articles_unchanged = result['unchanged']
             
             stage_duration = time.time() - stage_start
             stats.record_stage("2. Store Articles", stage_duration)
             logger.info("")
         
+        if articles is not None:
+            checkpoint.complete_stage(
+                'fetch',
+                fetched=stats.articles_fetched,
+                inserted=stats.articles_stored,
+                updated=stats.articles_updated
+            )
+        
         # ============ STAGE 3: LABEL ARTICLES ============
-        if not skip_labeling and config.ENABLE_LABELING:
+        if should_run_stage(checkpoint, 'label', not skip_labeling and config.ENABLE_LABELING):
             logger.info("="*80)
             logger.info("🏷️  STAGE 3: LABELING ARTICLES")
             logger.info("="*80)
             stage_start = time.time()
             
-            # Get articles without categories
-            articles_to_label = storage.get_articles_without_field('categories', limit=5000)
-            
-            if articles_to_label:
-                logger.info(f"Found {len(articles_to_label)} articles to label")
-                
-                labeler = ArticleLabeler()
-                labeled_count = 0
-
-                def persist_batch(batch_articles: List[Dict]):
-                    nonlocal labeled_count
-                    updates = [
-                        (
-                            article['_id'],
-                            {
-                                'categories': article.get('categories', []),
-                                'category_scores': article.get('category_scores', {})
-                            }
-                        )
-                        for article in batch_articles
-                        if article.get('categories')
-                    ]
-
-                    if updates:
-                        updated = storage.update_articles_batch(updates)
-                        labeled_count += updated
-
-                labeler.label_articles_batch(
-                    articles_to_label,
-                    multi_label=True,
-                    threshold=0.4,
-                    batch_callback=persist_batch
-                )
-
-                stats.articles_labeled = labeled_count
-            else:
-                logger.info("No articles need labeling")
+            stats.articles_labeled = label_stage(storage, worker_id, checkpoint.progress_callback('label'))
+            checkpoint.complete_stage('label')
             
             stage_duration = time.time() - stage_start
             stats.record_stage("3. Label Articles", stage_duration)
             logger.info("")
         
-        if not skip_embeddings and config.ENABLE_EMBEDDINGS:
+        if should_run_stage(checkpoint, 'embed', not skip_embeddings and config.ENABLE_EMBEDDINGS):
             logger.info("="*80)
             logger.info("🧮 STAGE 4: GENERATING EMBEDDINGS")
             logger.info("="*80)
             stage_start = time.time()
             
-            articles_to_embed = storage.get_articles_without_field('embedding', limit=5000)
-            
-            if articles_to_embed:
-                logger.info(f"Found {len(articles_to_embed)} articles to embed")
-                
-                generator = EmbeddingGenerator()
-                embedded_articles = generator.generate_embeddings_batch(
-                    articles_to_embed,
-                    show_progress=True
-                )
-                
-                # Update in database
-                updates = [
-                    (
-                        article['_id'],
-                        {
-                            'embedding': article.get('embedding'),
-                            'embedding_dim': article.get('embedding_dim', 0)
-                        }
-                    )
-                    for article in embedded_articles
-                    if article.get('embedding') is not None
-                ]
-                
-                if updates:
-                    updated_count = storage.update_articles_batch(updates)
-                    stats.embeddings_generated = updated_count
-            else:
-                logger.info("No articles need embeddings")
+            stats.embeddings_generated = embed_stage(storage, worker_id, checkpoint.progress_callback('embed'))
+            checkpoint.complete_stage('embed')
             
             stage_duration = time.time() - stage_start
             stats.record_stage("4. Generate Embeddings", stage_duration)
             logger.info("")
         
         # ============ STAGE 5: ANALYZE ARTICLES ============
-        if not skip_analysis and (config.ENABLE_KEYWORD_EXTRACTION or config.ENABLE_SENTIMENT_ANALYSIS):
+        analysis_enabled = config.ENABLE_KEYWORD_EXTRACTION or config.ENABLE_SENTIMENT_ANALYSIS
+        if should_run_stage(checkpoint, 'analyze', not skip_analysis and analysis_enabled):
             logger.info("="*80)
             logger.info("🔍 STAGE 5: ANALYZING ARTICLES")
             logger.info("="*80)
             stage_start = time.time()
             
-            # Get articles without keywords or sentiment
-            articles_to_analyze = storage.get_articles_without_field('keywords', limit=5000)
-            
-            if articles_to_analyze:
-                logger.info(f"Found {len(articles_to_analyze)} articles to analyze")
-                
-                analyzer = ArticleAnalyzer()
-                analyzed_articles = analyzer.analyze_articles_batch(
-                    articles_to_analyze,
-                    extract_kw=config.ENABLE_KEYWORD_EXTRACTION,
-                    analyze_sent=config.ENABLE_SENTIMENT_ANALYSIS
-                )
-                
-                # Update in database
-                updates = []
-                for article in analyzed_articles:
-                    update_dict = {}
-                    
-                    if article.get('keywords'):
-                        update_dict['keywords'] = article['keywords']
-                        update_dict['keyword_scores'] = article.get('keyword_scores', {})
-                    
-                    if article.get('sentiment'):
-                        update_dict['sentiment'] = article['sentiment']
-                        update_dict['sentiment_scores'] = article.get('sentiment_scores', {})
-                        update_dict['sentiment_confidence'] = article.get('sentiment_confidence', 0)
-                    
-                    if update_dict:
-                        updates.append((article['_id'], update_dict))
-                
-                if updates:
-                    updated_count = storage.update_articles_batch(updates)
-                    stats.keywords_extracted = sum(1 for a in analyzed_articles if a.get('keywords'))
-                    stats.sentiments_analyzed = sum(1 for a in analyzed_articles if a.get('sentiment'))
-            else:
-                logger.info("No articles need analysis")
+            stats.keywords_extracted, stats.sentiments_analyzed = analyze_stage(
+                storage, worker_id, checkpoint.progress_callback('analyze')
+            )
+            checkpoint.complete_stage('analyze')
             
             stage_duration = time.time() - stage_start
             stats.record_stage("5. Analyze Articles", stage_duration)
@@ -320,18 +622,19 @@ async def run_pipeline(
         
         logger.info("")
         
-        # Close storage
-        storage.close()
+        checkpoint.finish()
         
         # Print final summary
         stats.end()
         
         return {
             'success': True,
+            'run_id': checkpoint.run_id,
             'stats': {
                 'articles_fetched': stats.articles_fetched,
                 'articles_stored': stats.articles_stored,
                 'articles_updated': stats.articles_updated,
+                'articles_unchanged': stats.articles_unchanged,
                 'articles_labeled': stats.articles_labeled,
                 'embeddings_generated': stats.embeddings_generated,
                 'keywords_extracted': stats.keywords_extracted,
@@ -343,21 +646,99 @@ async def run_pipeline(
         
     except KeyboardInterrupt:
         logger.warning("\n⚠️  Pipeline interrupted by user")
-        return {'success': False, 'error': 'User interrupted'}
+        return _failed_run(checkpoint, 'User interrupted')
         
     except Exception as e:
         logger.error(f"\n❌ Pipeline failed with error: {str(e)}", exc_info=True)
-        return {'success': False, 'error': str(e)}
+        return _failed_run(checkpoint, str(e))
+    
+    finally:
+        if storage is not None:
+            storage.close()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Command-line options."""
+    parser = argparse.ArgumentParser(description="News article pipeline")
+    parser.add_argument('--resume', metavar='RUN_ID', help="Resume an interrupted run")
+    parser.add_argument('--list-runs', action='store_true', help="Show recent runs and exit")
+    parser.add_argument('--skip-fetch', action='store_true', help="Process existing articles only")
+    parser.add_argument('--skip-labeling', action='store_true')
+    parser.add_argument('--skip-embeddings', action='store_true')
+    parser.add_argument('--skip-analysis', action='store_true')
+    parser.add_argument('--metrics-port', type=int, default=config.METRICS_PORT,
+                        help="Serve Prometheus metrics on this port while the pipeline runs")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Run continuously, polling each topic as often as it gets new articles")
+    parser.add_argument('--max-topics', type=int, default=config.DAEMON_MAX_TOPICS_PER_CYCLE,
+                        help="Daemon mode: topics fetched per cycle at most")
+    return parser.parse_args(argv)
+
+
+def list_runs():
+    """Print recent runs with their stage status."""
+    storage = ArticleStorage()
+    try:
+        for run in RunCheckpoint.list_runs(storage.db):
+            stages = ', '.join(
+                f"{name}={stage['status']}({stage.get('processed', 0)})"
+                for name, stage in run['stages'].items()
+            )
+            print(f"{run['_id']}  {run['status']:<10} {stages}")
+    finally:
+        storage.close()
+
+
+async def run_daemon(args: argparse.Namespace) -> Dict:
+    """Run the pipeline continuously with adaptive per-topic polling."""
+    from scheduler import PipelineDaemon
+    
+    storage = ArticleStorage()
+    storage.backfill_processing_state()
+    daemon = PipelineDaemon(
+        storage,
+        max_topics=args.max_topics,
+        skip_labeling=args.skip_labeling,
+        skip_embeddings=args.skip_embeddings,
+        skip_analysis=args.skip_analysis
+    )
+    try:
+        await daemon.run()
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        logger.warning("⚠️  Daemon interrupted by user")
+    finally:
+        stats = daemon.stats
+        logger.info(
+            f"Daemon stopped - cycles: {stats['cycles']}, topic polls: {stats['polls']} "
+            f"({stats['failed']} failed), "
+            f"new articles: {stats['new']}, labeled: {stats['labeled']}, "
+            f"embedded: {stats['embedded']}, analyzed: {stats['analyzed']}"
+        )
+        daemon.close_models()
+        storage.close()
+    return {'success': True, 'stats': daemon.stats}
 
 
 async def main():
     """Main entry point."""
+    args = parse_args()
+    setup_logging()
+    if args.list_runs:
+        list_runs()
+        return {'success': True}
+    if args.metrics_port:
+        metrics.start_http_server(args.metrics_port)
+    
+    if args.daemon:
+        return await run_daemon(args)
+    
     result = await run_pipeline(
         topics=config.TOPICS,
-        skip_fetch=False,
-        skip_labeling=False,
-        skip_embeddings=False,
-        skip_analysis=False
+        skip_fetch=args.skip_fetch,
+        skip_labeling=args.skip_labeling,
+        skip_embeddings=args.skip_embeddings,
+        skip_analysis=args.skip_analysis,
+        resume_run=args.resume
     )
     
     return result
@@ -0,0 +1,402 @@
+"""
+Lightweight Prometheus-style metrics for the news pipeline.
+Counters, gauges and histograms (optionally labelled) rendered in the
+Prometheus text exposition format, plus a small HTTP server that serves
+them on /metrics. Dependency-free, so the pipeline, the stream worker and
+the embedding service can all expose metrics without prometheus_client;
+the API (.labels(...).inc(), .observe(), .time()) mirrors it.
+
+Usage:
+    import metrics
+    metrics.start_http_server(9100)           # scrape http://host:9100/metrics
+    metrics.ARTICLES_PROCESSED.labels(stage="embed").inc(32)
+"""
+
+import logging
+import math
+from abc import ABC, abstractmethod
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default buckets: latencies in seconds, and batch sizes in articles
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape(value: str) -> str:
+    """Escape a label value (HELP text leaves double quotes alone)."""
+    return _escape_help(value).replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric"):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional["_Metric"]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the text exposition format."""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric(ABC):
+    """Base class: a named metric with one child per label combination."""
+
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[Registry] = REGISTRY
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        if registry is not None:
+            registry.register(self)
+
+    @abstractmethod
+    def _new_child(self):
+        """Value holder for one label combination (a _CounterChild, _GaugeChild, ...)."""
+
+    def labels(self, *values, **kwargs):
+        """Child metric for one combination of label values."""
+        if kwargs:
+            try:
+                values = tuple(str(kwargs[name]) for name in self.labelnames)
+            except KeyError as e:
+                raise ValueError(f"Missing label {e} for metric '{self.name}'")
+        else:
+            values = tuple(str(value) for value in values)
+        if len(values) != len(self.labelnames) or not values:
+            raise ValueError(f"Metric '{self.name}' expects labels {self.labelnames}")
+        with self._lock:
+            child = self._children.get(values)
+            if child is None:
+                child = self._children[values] = self._new_child()
+        return child
+
+    def _unlabelled(self):
+        if self.labelnames:
+            raise ValueError(f"Metric '{self.name}' has labels {self.labelnames}; use .labels()")
+        return self._children[()]
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            labels = dict(zip(self.labelnames, values))
+            for suffix, extra, value in child.samples():
+                yield suffix, {**labels, **extra}, value
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self.value += amount
+
+    def samples(self) -> List[Sample]:
+        return [("_total", {}, self.value)]
+
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = float(value)
+
+    @contextmanager
+    def track_inprogress(self):
+        """Increment while the block runs."""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def samples(self) -> List[Sample]:
+        return [("", {}, self.value)]
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of the block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        samples, cumulative = [], 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            samples.append(("_bucket", {"le": _format_value(bound)}, cumulative))
+        samples.append(("_bucket", {"le": "+Inf"}, count))
+        samples.append(("_sum", {}, total))
+        samples.append(("_count", {}, count))
+        return samples
+
+
+class Counter(_Metric):
+    """Monotonically increasing count (exposed as <name>_total)."""
+
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self._unlabelled().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1):
+        self._unlabelled().inc(amount)
+
+    def dec(self, amount: float = 1):
+        self._unlabelled().dec(amount)
+
+    def set(self, value: float):
+        self._unlabelled().set(value)
+
+    def track_inprogress(self):
+        return self._unlabelled().track_inprogress()
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        registry: Optional[Registry] = REGISTRY
+    ):
+        self.buckets = tuple(sorted(b for b in buckets if not math.isinf(b)))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._unlabelled().observe(value)
+
+    def time(self):
+        return self._unlabelled().time()
+
+
+class BatchTimer:
+    """
+    Records model batch sizes and inference latency for a stage.
+
+    lap() is called from a batch callback: the time since the timer was
+    created (or last reset) is the inference time of that batch. Call
+    reset() after persisting so write time is not counted as inference.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._mark = time.perf_counter()
+
+    def lap(self, batch_size: int):
+        BATCH_SIZE.labels(stage=self.stage).observe(batch_size)
+        BATCH_LATENCY.labels(stage=self.stage).observe(time.perf_counter() - self._mark)
+
+    def reset(self):
+        self._mark = time.perf_counter()
+
+
+def key_label(api_key: str) -> str:
+    """Label value identifying an API key without exposing it."""
+    return f"...{api_key[-4:]}" if api_key else "none"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port: int, addr: str = "0.0.0.0", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """
+    Serve metrics on http://addr:port/metrics from a daemon thread.
+
+    Returns:
+        The running server (call shutdown() to stop it)
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((addr, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    logger.info(f"📈 Serving metrics on http://{addr}:{server.server_port}/metrics")
+    return server
+
+
+# ============ Pipeline Metrics ============
+ARTICLES_PROCESSED = Counter(
+    "pulzion_articles_processed", "Articles whose results were persisted, per pipeline stage", ["stage"]
+)
+BATCH_SIZE = Histogram(
+    "pulzion_batch_size_articles", "Articles per model batch", ["stage"], buckets=SIZE_BUCKETS
+)
+BATCH_LATENCY = Histogram(
+    "pulzion_batch_inference_seconds", "Model inference time per batch", ["stage"]
+)
+STAGE_DURATION = Gauge(
+    "pulzion_stage_duration_seconds", "Duration of the most recent run of each pipeline stage", ["stage"]
+)
+STREAM_QUEUE_DEPTH = Gauge(
+    "pulzion_stream_pending_articles", "Inserted articles waiting in the stream worker's current micro-batch"
+)
+TOPIC_ARRIVAL_RATE = Gauge(
+    "pulzion_topic_arrival_rate", "Smoothed new articles per hour, per topic (daemon mode)", ["topic"]
+)
+TOPIC_POLL_INTERVAL = Gauge(
+    "pulzion_topic_poll_interval_minutes", "Current polling interval per topic (daemon mode)", ["topic"]
+)
+TOPIC_NEW_ARTICLES = Counter(
+    "pulzion_topic_new_articles", "New articles stored per polled topic (daemon mode)", ["topic"]
+)
+
+# ============ External Calls ============
+API_REQUESTS = Counter(
+    "pulzion_newsapi_requests", "NewsAPI requests per key, endpoint and HTTP status", ["key", "endpoint", "status"]
+)
+API_LATENCY = Histogram(
+    "pulzion_newsapi_request_seconds", "NewsAPI request latency", ["endpoint"]
+)
+MONGO_WRITE_LATENCY = Histogram(
+    "pulzion_mongo_write_seconds", "Latency of one bulk_write chunk", ["collection"]
+)
+MONGO_WRITE_OPS = Counter(
+    "pulzion_mongo_write_operations", "Write operations sent to MongoDB", ["collection"]
+)
+MONGO_WRITE_ERRORS = Counter(
+    "pulzion_mongo_write_errors", "Write operations that failed", ["collection"]
+)
+
+# ============ Embedding Service ============
+EMBED_LATENCY = Histogram(
+    "pulzion_embed_request_seconds", "End-to-end /embed request latency, including queueing"
+)
+EMBED_INFERENCE = Histogram(
+    "pulzion_embed_inference_seconds", "Model encode time per /embed request"
+)
+EMBED_QUEUE_DEPTH = Gauge(
+    "pulzion_embed_requests_in_flight", "/embed requests received and not yet answered"
+)
+EMBED_REQUESTS = Counter(
+    "pulzion_embed_requests", "/embed requests per HTTP status", ["status"]
+)
@@ -1,20 +1,27 @@
 #!/usr/bin/env python3
 """
-MongoDB → Qdrant Full-Field Migration
-Exports ALL fields + stores embedding as vector in Qdrant
-No MongoDB needed after migration
+MongoDB → Qdrant Migration
+Stores embedding as vector in Qdrant with a configurable payload schema:
+- "full" (default): ALL Mongo fields (no MongoDB needed after migration)
+- "slim": only the small fields, for readers that fetch the large ones
+  from Mongo by id (fetch_lazy_fields); the Backend still reads content,
+  fetched_at and the score dicts from the payload, so keep "full" for it
+Set VECTOR_STORE=local to migrate into the embedded local store instead.
 """
 import os
 import time
+import uuid
+import queue
 import logging
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from pymongo import MongoClient
-from qdrant_client import QdrantClient
-from qdrant_client.http import models
 from tqdm import tqdm
 from dotenv import load_dotenv
 from datetime import datetime
 
+from vector_store import PAYLOAD_INDEXES, VectorStore, get_vector_store
+
 # --------------------- Load Config ---------------------
 load_dotenv()
 
@@ -35,9 +42,27 @@ QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 QDRANT_COLLECTION = "articles_collection"
 
+# Vector store backend ("qdrant" or "local")
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE", "qdrant")
+LOCAL_VECTOR_STORE_PATH = os.getenv("LOCAL_VECTOR_STORE_PATH", os.path.join("data", "vector_store"))
+
 # Settings
 BATCH_SIZE = 100
 RETRY_DELAY = 3  # seconds
+UPLOAD_PARALLELISM = int(os.getenv("QDRANT_UPLOAD_PARALLELISM", "4"))  # concurrent upserts (1 = serial)
+UPLOAD_QUEUE_SIZE = int(os.getenv("QDRANT_UPLOAD_QUEUE_SIZE", "8"))  # batches buffered ahead of the uploaders
+
+# Payload schema ("full" or "slim"); full until the Backend reads lazy fields from Mongo
+PAYLOAD_SCHEMA = os.getenv("QDRANT_PAYLOAD_SCHEMA", "full").lower()
+SLIM_PAYLOAD_FIELDS = [
+    "url", "url_hash", "title", "description", "source", "author",
+    "published_at", "urlToImage", "search_topic",
+    "categories", "keywords", "sentiment", "sentiment_confidence",
+]
+# Optional override, e.g. QDRANT_PAYLOAD_FIELDS=title,url,published_at,categories
+PAYLOAD_FIELDS_OVERRIDE = [f.strip() for f in os.getenv("QDRANT_PAYLOAD_FIELDS", "").split(",") if f.strip()]
+# Large fields kept in Mongo only and fetched by id at query time
+LAZY_FIELDS = ["content", "category_scores", "sentiment_scores", "keyword_scores"]
 
 
 # --------------------- Clients ---------------------
@@ -48,23 +73,19 @@ def get_mongodb_client() -> MongoClient:
     return client
 
 
-def get_qdrant_client() -> QdrantClient:
+def get_store() -> VectorStore:
+    if VECTOR_STORE_BACKEND == "local":
+        return get_vector_store("local", QDRANT_COLLECTION, path=LOCAL_VECTOR_STORE_PATH)
     if not QDRANT_URL or not QDRANT_API_KEY:
         raise ValueError("QDRANT_URL and QDRANT_API_KEY must be set in .env")
-    client = QdrantClient(
-        url=QDRANT_URL,
-        api_key=QDRANT_API_KEY,
-        timeout=60
-    )
-    logger.info("Connected to Qdrant Cloud")
-    return client
+    return get_vector_store("qdrant", QDRANT_COLLECTION, url=QDRANT_URL, api_key=QDRANT_API_KEY, timeout=60)
 
 
 # --------------------- Embedding Dimension ---------------------
 def detect_embedding_dim(mongo_client: MongoClient) -> int:
     db = mongo_client[DATABASE_NAME]
     coll = db[COLLECTION_NAME]
-    sample = coll.find_one({"embedding": {"$exists": True, "$ne": None}})
+    sample = coll.find_one({"embedding": {"$exists": True, "$ne": None}}, {"embedding": 1})
     if not sample or 'embedding' not in sample:
         raise ValueError("No document with 'embedding' found!")
     dim = len(sample['embedding'])
@@ -93,98 +114,221 @@ def build_full_payload(article: Dict[str, Any]) -> Dict[str, Any]:
     return payload
 
 
+# --------------------- Slim Payload Schema ---------------------
+def get_payload_fields(schema: str = PAYLOAD_SCHEMA) -> Optional[List[str]]:
+    """Payload fields for a schema; None means copy every field."""
+    if schema == "full":
+        return None
+    if schema != "slim":
+        raise ValueError(f"Unknown payload schema: {schema} (use 'slim' or 'full')")
+    return PAYLOAD_FIELDS_OVERRIDE or SLIM_PAYLOAD_FIELDS
+
+
+def build_projection(fields: Optional[List[str]]) -> Optional[Dict[str, int]]:
+    """Mongo projection so the cursor only ships payload fields + embedding."""
+    if fields is None:
+        return None
+    projection = {field: 1 for field in fields}
+    projection["embedding"] = 1
+    return projection
+
+
+def build_payload(article: Dict[str, Any], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Build a payload restricted to `fields` (full payload if None).
+    Fields missing from the article are left out rather than stored as null.
+    """
+    if fields is None:
+        return build_full_payload(article)
+    payload = {}
+    for key in fields:
+        if key not in article or key == "embedding":
+            continue
+        value = article[key]
+        payload[key] = value.isoformat() if isinstance(value, datetime) else value
+    payload["_id"] = str(article["_id"])
+    return payload
+
+
+def fetch_lazy_fields(
+    collection,
+    ids: List[str],
+    fields: Optional[List[str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch large fields left out of slim payloads, in one query by _id.
+
+    Qdrant returns point ids as hyphenated UUIDs, while Mongo `_id`s are
+    the plain md5 hex url_hash, so ids are converted before querying.
+
+    Args:
+        collection: Mongo articles collection
+        ids: Qdrant point ids or payload `_id` / `url_hash` values
+        fields: Fields to fetch (LAZY_FIELDS if None)
+
+    Returns:
+        Dict mapping each id as given to a dict of the requested fields
+    """
+    if not ids:
+        return {}
+    fields = fields or LAZY_FIELDS
+    by_mongo_id = {to_mongo_id(point_id): point_id for point_id in ids}
+    cursor = collection.find({"_id": {"$in": list(by_mongo_id)}}, {field: 1 for field in fields})
+    return {by_mongo_id[doc.pop("_id")]: doc for doc in cursor}
+
+
+def to_mongo_id(point_id: Any) -> str:
+    """Mongo `_id` for a Qdrant point id ("1b4e28ba-2fa1-..." -> "1b4e28ba2fa1...")."""
+    try:
+        return uuid.UUID(str(point_id)).hex
+    except ValueError:
+        return str(point_id)  # not a UUID (e.g. the local store keeps ids as given)
+
+
 # --------------------- Process Article ---------------------
-def process_article(article: Dict[str, Any]) -> Dict[str, Any]:
+def process_article(article: Dict[str, Any], fields: Optional[List[str]] = None) -> Dict[str, Any]:
     if not article.get("embedding"):
         return None  # Skip if no embedding
     return {
         "id": str(article["_id"]),
         "vector": article["embedding"],  # ← STORE VECTOR IN QDRANT
-        "payload": build_full_payload(article)
+        "payload": build_payload(article, fields)
     }
 
 
-# --------------------- Qdrant Collection Setup ---------------------
-def ensure_qdrant_collection(qdrant_client: QdrantClient, vector_size: int):
-    try:
-        qdrant_client.delete_collection(collection_name=QDRANT_COLLECTION)
-        logger.info(f"Deleted existing collection: {QDRANT_COLLECTION}")
-    except Exception:
-        logger.info("No existing collection to delete")
-
-    # Step 1: Create collection
-    qdrant_client.create_collection(
-        collection_name=QDRANT_COLLECTION,
-        vectors_config=models.VectorParams(
-            size=vector_size,
-            distance=models.Distance.COSINE
-        ),
-    )
-    logger.info(f"Created Qdrant collection: {QDRANT_COLLECTION} (dim={vector_size})")
-
-    # Step 2: Add payload indexes
-    indexes = [
-        ("published_at", models.PayloadSchemaType.DATETIME),
-        ("source", models.PayloadSchemaType.KEYWORD),
-        ("categories", models.PayloadSchemaType.KEYWORD),
-        ("sentiment", models.PayloadSchemaType.KEYWORD),
-        ("keywords", models.PayloadSchemaType.KEYWORD),
-        ("_id", models.PayloadSchemaType.KEYWORD),
-    ]
-
-    for field_name, schema_type in indexes:
-        try:
-            qdrant_client.create_payload_index(
-                collection_name=QDRANT_COLLECTION,
-                field_name=field_name,
-                field_schema=schema_type
-            )
-            logger.info(f"Indexed payload field: {field_name} → {schema_type}")
-        except Exception as e:
-            logger.warning(f"Failed to index {field_name}: {e}")
+# --------------------- Collection Setup ---------------------
+def ensure_qdrant_collection(store: VectorStore, vector_size: int):
+    # Recreate collection and add payload indexes
+    store.recreate_collection(vector_size, PAYLOAD_INDEXES)
 
 
 # --------------------- Upload Batch with Retry ---------------------
-def upload_batch_with_retry(qdrant_client: QdrantClient, batch: List[Dict[str, Any]]):
-    points = [
-        models.PointStruct(
-            id=item["id"],
-            vector=item["vector"],
-            payload=item["payload"]
-        )
-        for item in batch
-    ]
+def upload_batch_with_retry(store: VectorStore, batch: List[Dict[str, Any]]):
+    last_error = None
     for attempt in range(3):
         try:
-            qdrant_client.upsert(
-                collection_name=QDRANT_COLLECTION,
-                points=points,
-                wait=True
-            )
+            store.upsert(batch, wait=True)
             logger.debug(f"Uploaded batch of {len(batch)} points")
             return
         except Exception as e:
+            last_error = e
             logger.warning(f"Upload failed (attempt {attempt+1}): {e}")
             time.sleep(RETRY_DELAY * (2 ** attempt))
     logger.error("Final upload failed after retries")
-    raise
+    raise last_error
+
+
+# --------------------- Batching ---------------------
+def iter_point_batches(
+    cursor: Iterable[Dict[str, Any]],
+    batch_size: int = BATCH_SIZE,
+    fields: Optional[List[str]] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """Group processed articles from a Mongo cursor into upload batches."""
+    batch = []
+    for doc in cursor:
+        item = process_article(doc, fields)
+        if item:
+            batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# --------------------- Pipelined Uploader ---------------------
+class PipelinedUploader:
+    """
+    Producer/consumer uploader.
+    The caller keeps reading the Mongo cursor and submits batches while
+    `parallelism` worker threads run `upload_batch_with_retry` concurrently.
+    The bounded queue applies backpressure: `submit` blocks once
+    `queue_size` batches are waiting, so memory stays bounded.
+    """
+
+    _SENTINEL = object()
+
+    def __init__(self, store: VectorStore, parallelism: int = UPLOAD_PARALLELISM,
+                 queue_size: int = UPLOAD_QUEUE_SIZE, on_uploaded=None):
+        self.store = store
+        self.parallelism = max(1, parallelism)
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self.on_uploaded = on_uploaded
+        self.uploaded = 0
+        self.error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"qdrant-upload-{i}", daemon=True)
+            for i in range(self.parallelism)
+        ]
+
+    def __enter__(self):
+        for worker in self._workers:
+            worker.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _worker(self):
+        while True:
+            batch = self.queue.get()
+            try:
+                if batch is self._SENTINEL:
+                    return
+                # After a failure keep draining so the producer never blocks forever
+                if self.error is not None:
+                    continue
+                upload_batch_with_retry(self.store, batch)
+                with self._lock:
+                    self.uploaded += len(batch)
+                    if self.on_uploaded:
+                        self.on_uploaded(len(batch))
+            except Exception as e:
+                with self._lock:
+                    if self.error is None:
+                        self.error = e
+            finally:
+                self.queue.task_done()
+
+    def submit(self, batch: List[Dict[str, Any]]):
+        """Queue a batch for upload, blocking while the queue is full."""
+        if self.error is not None:
+            raise self.error
+        self.queue.put(batch)
+
+    def close(self):
+        """Wait for queued uploads to finish and re-raise the first failure."""
+        for _ in self._workers:
+            self.queue.put(self._SENTINEL)
+        for worker in self._workers:
+            if worker.is_alive():
+                worker.join()
+        if self.error is not None:
+            raise self.error
 
 
 # --------------------- Main Migration ---------------------
-def main():
+def main(
+    parallelism: int = UPLOAD_PARALLELISM,
+    queue_size: int = UPLOAD_QUEUE_SIZE,
+    payload_schema: str = PAYLOAD_SCHEMA
+):
     start_time = time.time()
     mongo_client = None
-    qdrant_client = None
+    store = None
     try:
         # Connect
         mongo_client = get_mongodb_client()
-        qdrant_client = get_qdrant_client()
+        store = get_store()
 
         # Detect embedding size
         embedding_dim = detect_embedding_dim(mongo_client)
 
-        # Setup Qdrant collection with indexes
-        ensure_qdrant_collection(qdrant_client, embedding_dim)
+        # Setup collection with indexes
+        ensure_qdrant_collection(store, embedding_dim)
 
         # Count total with embeddings
         db = mongo_client[DATABASE_NAME]
@@ -195,36 +339,36 @@ def main():
             logger.warning("No articles to migrate.")
             return
 
-        # Stream + process
+        # Stream + process (projection applied server-side for slim payloads)
+        fields = get_payload_fields(payload_schema)
+        logger.info(f"Payload schema: {payload_schema}" + (f" ({len(fields)} fields)" if fields else ""))
         cursor = coll.find(
             {"embedding": {"$exists": True, "$ne": None}},
+            build_projection(fields),
             no_cursor_timeout=True
         ).batch_size(BATCH_SIZE)
 
-        batch = []
         processed = 0
         with tqdm(total=total, desc="Migrating", unit="doc") as pbar:
-            for doc in cursor:
-                item = process_article(doc)
-                if item:
-                    batch.append(item)
-                if len(batch) >= BATCH_SIZE:
-                    upload_batch_with_retry(qdrant_client, batch)
+            if parallelism <= 1:
+                for batch in iter_point_batches(cursor, BATCH_SIZE, fields):
+                    upload_batch_with_retry(store, batch)
                     processed += len(batch)
                     pbar.update(len(batch))
-                    batch.clear()
-
-            # Final batch
-            if batch:
-                upload_batch_with_retry(qdrant_client, batch)
-                processed += len(batch)
-                pbar.update(len(batch))
+            else:
+                logger.info(f"Pipelined upload: {parallelism} concurrent upserts, queue size {queue_size}")
+                uploader = PipelinedUploader(store, parallelism, queue_size, on_uploaded=pbar.update)
+                try:
+                    with uploader:
+                        for batch in iter_point_batches(cursor, BATCH_SIZE, fields):
+                            uploader.submit(batch)
+                finally:
+                    processed = uploader.uploaded
 
         # Final stats
-        collection_info = qdrant_client.get_collection(QDRANT_COLLECTION)
         logger.info("Migration completed!")
         logger.info(f" Processed: {processed:,}")
-        logger.info(f" Qdrant points: {collection_info.points_count:,}")
+        logger.info(f" Stored points: {store.count():,}")
         logger.info(f" Time taken: {time.time() - start_time:.2f}s")
 
     except Exception as e:
@@ -232,8 +376,8 @@ def main():
     finally:
         if mongo_client:
             mongo_client.close()
-        if qdrant_client:
-            qdrant_client.close()
+        if store:
+            store.close()
         logger.info("Clients closed.")
 
 
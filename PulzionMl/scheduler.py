@@ -0,0 +1,368 @@
+"""
+Daemon mode for the news pipeline (main.py --daemon).
+Instead of fetching every topic on every run, the daemon tracks how fast
+new articles arrive for each topic and polls hot topics often and cold
+ones rarely, so API calls go where the fresh articles are. Models are
+loaded once and kept warm between cycles.
+
+Per-topic state (smoothed arrival rate, interval, next poll) is kept in
+the topic_schedule collection, so a restarted daemon keeps its schedule.
+
+Usage:
+    python main.py --daemon [--max-topics N] [--metrics-port PORT]
+"""
+
+import asyncio
+import logging
+import signal
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+import config
+import metrics
+from fetcher import ArticleFetcher, TRENDING_TOPIC
+from main import analyze_stage, embed_stage, label_stage
+from storage import ArticleStorage, STAGE_ANALYZE, STAGE_EMBED, STAGE_LABEL, make_worker_id
+from inference_pool import close_model, create_model
+
+logger = logging.getLogger(__name__)
+
+# A poll returning at least this share of a full page probably missed
+# articles (the page was cut off), so the topic is polled sooner
+SATURATION_SHARE = 0.9
+
+
+class TopicScheduler:
+    """Adaptive polling schedule: one document per topic in SCHEDULE_COLLECTION."""
+
+    def __init__(
+        self,
+        db,
+        topics: List[str],
+        min_interval: float = config.POLL_MIN_INTERVAL_MINUTES,
+        max_interval: float = config.POLL_MAX_INTERVAL_MINUTES,
+        target_new: float = config.POLL_TARGET_NEW_ARTICLES,
+        smoothing: float = config.POLL_RATE_SMOOTHING
+    ):
+        """
+        Load the schedule, adding unknown topics as due immediately.
+
+        Args:
+            db: MongoDB database holding the schedule collection
+            topics: Topics to schedule (topics no longer listed are ignored)
+            min_interval: Shortest polling interval (minutes)
+            max_interval: Longest polling interval (minutes)
+            target_new: New articles a poll should find on average
+            smoothing: Weight of the newest rate observation (0-1)
+        """
+        self.collection = db[config.SCHEDULE_COLLECTION]
+        self.topics = list(dict.fromkeys(topics))
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_new = target_new
+        self.smoothing = smoothing
+
+        now = datetime.utcnow()
+        for topic in self.topics:
+            self.collection.update_one(
+                {'_id': topic},
+                {'$setOnInsert': {
+                    'rate': None,
+                    'interval_minutes': min_interval,
+                    'last_polled': None,
+                    'next_poll': now,
+                    'polls': 0,
+                    'new_total': 0,
+                }},
+                upsert=True
+            )
+
+    def get(self, topic: str) -> Optional[Dict]:
+        return self.collection.find_one({'_id': topic})
+
+    def last_polled(self, topics: List[str]) -> Dict[str, Optional[datetime]]:
+        """Last successful poll time per topic (None if never polled)."""
+        docs = self.collection.find({'_id': {'$in': topics}}, projection={'last_polled': 1})
+        polled = {doc['_id']: doc.get('last_polled') for doc in docs}
+        return {topic: polled.get(topic) for topic in topics}
+
+    def due(self, now: Optional[datetime] = None, limit: Optional[int] = None) -> List[str]:
+        """
+        Topics whose next poll time has passed, most promising first.
+
+        Topics are ranked by the new articles they are expected to have
+        waiting (rate x hours since the last poll); never-polled topics
+        come first.
+
+        Args:
+            now: Current time (defaults to utcnow)
+            limit: Maximum topics to return
+
+        Returns:
+            List of topics to poll now
+        """
+        now = now or datetime.utcnow()
+        docs = list(self.collection.find({'_id': {'$in': self.topics}, 'next_poll': {'$lte': now}}))
+
+        def expected_new(doc: Dict) -> float:
+            if doc.get('last_polled') is None or doc.get('rate') is None:
+                return float('inf')
+            return doc['rate'] * (now - doc['last_polled']).total_seconds() / 3600
+
+        docs.sort(key=expected_new, reverse=True)
+        return [doc['_id'] for doc in docs[:limit]]
+
+    def next_wakeup(self) -> Optional[datetime]:
+        """Earliest next poll time over all topics."""
+        doc = self.collection.find_one(
+            {'_id': {'$in': self.topics}}, sort=[('next_poll', 1)], projection={'next_poll': 1}
+        )
+        return doc['next_poll'] if doc else None
+
+    def record(self, topic: str, fetched: int, new: int, now: Optional[datetime] = None) -> Dict:
+        """
+        Update a topic's arrival rate and schedule its next poll.
+
+        The observed rate (new articles per hour since the last poll) is
+        folded into an exponentially weighted average, and the interval is
+        set so the next poll finds about `target_new` articles. A poll with
+        nothing new doubles the interval; a saturated poll (a near-full
+        page, so articles were probably cut off) halves it. The first poll
+        only sets the baseline.
+
+        Args:
+            topic: Polled topic
+            fetched: Articles returned by the API
+            new: Articles that were not in the database yet
+            now: Poll time (defaults to utcnow)
+
+        Returns:
+            The updated schedule document
+        """
+        now = now or datetime.utcnow()
+        doc = self.get(topic) or {'rate': None, 'interval_minutes': self.min_interval, 'last_polled': None}
+        previous = doc['interval_minutes']
+        rate = doc['rate']
+
+        if doc['last_polled'] is not None:
+            hours = max((now - doc['last_polled']).total_seconds() / 3600, 1 / 60)
+            observed = new / hours
+            rate = observed if rate is None else self.smoothing * observed + (1 - self.smoothing) * rate
+
+        if rate is None:
+            interval = self.min_interval
+        elif rate > 0:
+            interval = self.target_new / rate * 60
+        else:
+            interval = self.max_interval
+
+        if fetched >= SATURATION_SHARE * config.MAX_ARTICLES_PER_TOPIC and new:
+            interval = min(interval, previous / 2)
+        elif new == 0 and doc['last_polled'] is not None:
+            interval = max(interval, previous * 2)
+        interval = min(max(interval, self.min_interval), self.max_interval)
+
+        update = {
+            'rate': rate,
+            'interval_minutes': interval,
+            'last_polled': now,
+            'next_poll': now + timedelta(minutes=interval),
+            'last_fetched': fetched,
+            'last_new': new,
+        }
+        doc = self.collection.find_one_and_update(
+            {'_id': topic},
+            {'$set': update, '$inc': {'polls': 1, 'new_total': new}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        metrics.TOPIC_ARRIVAL_RATE.labels(topic).set(rate or 0)
+        metrics.TOPIC_POLL_INTERVAL.labels(topic).set(interval)
+        metrics.TOPIC_NEW_ARTICLES.labels(topic).inc(new)
+        return doc
+
+    def record_failure(self, topic: str, now: Optional[datetime] = None) -> Dict:
+        """
+        Reschedule a topic whose fetch failed (timeout, quota, key errors).
+
+        A failed fetch says nothing about the topic, so the rate and
+        interval are left alone and the topic is retried one interval
+        later. last_polled is kept too, so the next successful poll
+        measures the rate over the whole gap.
+
+        Returns:
+            The updated schedule document
+        """
+        now = now or datetime.utcnow()
+        doc = self.get(topic) or {'interval_minutes': self.min_interval}
+        return self.collection.find_one_and_update(
+            {'_id': topic},
+            {
+                '$set': {'next_poll': now + timedelta(minutes=doc['interval_minutes']), 'last_failed': now},
+                '$inc': {'failures': 1}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+
+class PipelineDaemon:
+    """Fetches due topics and processes new articles in a loop, with models kept loaded."""
+
+    def __init__(
+        self,
+        storage: ArticleStorage,
+        topics: Optional[List[str]] = None,
+        max_topics: int = config.DAEMON_MAX_TOPICS_PER_CYCLE,
+        idle_sleep: float = config.DAEMON_IDLE_SLEEP_SECONDS,
+        skip_labeling: bool = False,
+        skip_embeddings: bool = False,
+        skip_analysis: bool = False,
+        scheduler: Optional[TopicScheduler] = None,
+        fetcher: Optional[ArticleFetcher] = None
+    ):
+        """
+        Initialize the daemon.
+
+        Args:
+            storage: ArticleStorage to save and process articles in
+            topics: Topics to schedule (uses config.TOPICS plus top headlines if None)
+            max_topics: Topics fetched per cycle at most
+            idle_sleep: Longest sleep between cycles (seconds)
+            skip_labeling: Skip categorization
+            skip_embeddings: Skip embedding generation
+            skip_analysis: Skip keyword and sentiment analysis
+            scheduler: Schedule to use (created from `topics` if None)
+            fetcher: Fetcher to poll with (one is created if None)
+        """
+        self.storage = storage
+        self.max_topics = max_topics
+        self.idle_sleep = idle_sleep
+        self.owner = make_worker_id()
+        self.scheduler = scheduler or TopicScheduler(storage.db, topics or config.TOPICS + [TRENDING_TOPIC])
+        # One fetcher for the daemon's lifetime, so keys that hit their
+        # quota stay out of rotation across cycles
+        self.fetcher = fetcher or ArticleFetcher()
+
+        analysis_enabled = config.ENABLE_KEYWORD_EXTRACTION or config.ENABLE_SENTIMENT_ANALYSIS
+        self.enabled = {
+            STAGE_LABEL: not skip_labeling and config.ENABLE_LABELING,
+            STAGE_EMBED: not skip_embeddings and config.ENABLE_EMBEDDINGS,
+            STAGE_ANALYZE: not skip_analysis and analysis_enabled,
+        }
+        self.models: Dict[str, object] = {}
+        self.stats = {'cycles': 0, 'polls': 0, 'failed': 0, 'fetched': 0, 'new': 0, 'labeled': 0, 'embedded': 0, 'analyzed': 0}
+        self._stop: Optional[asyncio.Event] = None
+
+    def _model(self, stage: str):
+        """Stage model, loaded on first use and kept for later cycles."""
+        if stage not in self.models:
+            self.models[stage] = create_model(stage)
+        return self.models[stage]
+
+    def close_models(self):
+        """Release the models (stops inference worker processes)."""
+        for model in self.models.values():
+            close_model(model)
+        self.models.clear()
+
+    async def poll(self, topics: List[str]) -> int:
+        """
+        Fetch `topics`, store their articles and update their schedules.
+
+        Topics are searched newest first from their last poll, so a poll
+        returns what arrived since, rather than the same relevant page.
+
+        Returns:
+            New articles stored
+        """
+        # URLs seen in earlier cycles are handled by save_articles
+        self.fetcher.reset_deduplication()
+        by_topic = await self.fetcher.fetch_by_topic(
+            topics, sort_by="publishedAt", since=self.scheduler.last_polled(topics)
+        )
+
+        new_total = 0
+        for topic, articles in by_topic.items():
+            if articles is None:
+                doc = self.scheduler.record_failure(topic)
+                logger.warning(f"   ├─ {topic:<28} fetch failed, retrying in {doc['interval_minutes']:.0f} min")
+                self.stats['failed'] += 1
+                continue
+            result = self.storage.save_articles(articles) if articles else {'inserted': 0}
+            new = result['inserted']
+            doc = self.scheduler.record(topic, len(articles), new)
+            logger.info(
+                f"   ├─ {topic:<28} {len(articles):>4} fetched, {new:>4} new "
+                f"(rate {doc['rate'] or 0:.1f}/h, next in {doc['interval_minutes']:.0f} min)"
+            )
+            self.stats['fetched'] += len(articles)
+            new_total += new
+
+        self.stats['polls'] += len(topics)
+        self.stats['new'] += new_total
+        return new_total
+
+    def process_pending(self):
+        """Run every enabled stage on pending articles with the warm models."""
+        if self.enabled[STAGE_LABEL] and self.storage.count_pending(STAGE_LABEL):
+            self.stats['labeled'] += label_stage(
+                self.storage, self.owner, labeler=self._model(STAGE_LABEL)
+            )
+        if self.enabled[STAGE_EMBED] and self.storage.count_pending(STAGE_EMBED):
+            self.stats['embedded'] += embed_stage(
+                self.storage, self.owner, generator=self._model(STAGE_EMBED)
+            )
+        if self.enabled[STAGE_ANALYZE] and self.storage.count_pending(STAGE_ANALYZE):
+            keywords, _ = analyze_stage(self.storage, self.owner, analyzer=self._model(STAGE_ANALYZE))
+            self.stats['analyzed'] += keywords
+
+    async def run_cycle(self) -> int:
+        """Poll the due topics, then process what is pending. Returns new articles."""
+        due = self.scheduler.due(limit=self.max_topics)
+        new = 0
+        if due:
+            started = time.time()
+            logger.info(f"📰 Polling {len(due)} due topics")
+            new = await self.poll(due)
+            logger.info(f"✓ {new} new articles in {time.time() - started:.1f}s")
+        self.process_pending()
+        self.stats['cycles'] += 1
+        return new
+
+    def seconds_until_next_poll(self) -> float:
+        wakeup = self.scheduler.next_wakeup()
+        if wakeup is None:
+            return self.idle_sleep
+        return min(max((wakeup - datetime.utcnow()).total_seconds(), 0), self.idle_sleep)
+
+    async def run(self):
+        """Run cycles until stop() is called (or SIGINT/SIGTERM is received)."""
+        self._stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows / not the main thread: Ctrl+C raises KeyboardInterrupt instead
+
+        logger.info(f"🔁 Daemon started - {len(self.scheduler.topics)} topics, worker id {self.owner}")
+        while not self._stop.is_set():
+            await self.run_cycle()
+            delay = self.seconds_until_next_poll()
+            if delay <= 0:
+                continue
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        logger.info("Daemon stopped")
+
+    def stop(self):
+        """Finish the current cycle and exit."""
+        if self._stop is not None:
+            self._stop.set()
@@ -0,0 +1,213 @@
+"""
+Persistent scrape-result cache for the image scraper.
+Records the outcome of every page fetch (image found, no image, error)
+with ETag/Last-Modified validators so reruns can:
+- skip URLs that failed recently (TTL-based negative caching with backoff)
+- send conditional requests when a cached URL is retried
+- skip hosts that have never yielded an image
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+CACHE_COLLECTION = "image_scrape_cache"
+DOMAIN_COLLECTION = "image_scrape_domains"
+
+STATUS_FOUND = "found"
+STATUS_NO_IMAGE = "no_image"
+STATUS_ERROR = "error"
+STATUS_NOT_MODIFIED = "not_modified"
+
+NO_IMAGE_TTL = timedelta(days=7)      # page fetched fine but had no image
+ERROR_TTL = timedelta(hours=6)        # HTTP error / timeout (may be transient)
+MAX_NEGATIVE_TTL = timedelta(days=60)  # cap for exponential backoff
+CACHE_RETENTION_DAYS = 180            # entries untouched this long are dropped by a TTL index
+
+DOMAIN_MIN_ATTEMPTS = 20              # imageless pages before a host can be skipped
+DOMAIN_BLOCK_TTL = timedelta(days=14)  # re-probe skipped hosts after this long
+
+
+def get_domain(url: str) -> str:
+    """Host part of a URL (lowercased, without 'www.')."""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class ScrapeCache:
+    """Mongo-backed cache of per-URL scrape results and per-domain statistics."""
+
+    def __init__(
+        self,
+        db,
+        no_image_ttl: timedelta = NO_IMAGE_TTL,
+        error_ttl: timedelta = ERROR_TTL,
+        domain_min_attempts: int = DOMAIN_MIN_ATTEMPTS
+    ):
+        """
+        Initialize the cache and load domain statistics.
+
+        Args:
+            db: pymongo Database holding the cache collections
+            no_image_ttl: Base TTL for pages without an image
+            error_ttl: Base TTL for failed fetches
+            domain_min_attempts: Pages without an image before a zero-yield host
+                                 is skipped (fetch errors do not count)
+        """
+        self.collection = db[CACHE_COLLECTION]
+        self.domains = db[DOMAIN_COLLECTION]
+        self.no_image_ttl = no_image_ttl
+        self.error_ttl = error_ttl
+        self.domain_min_attempts = domain_min_attempts
+
+        # record() runs on the event loop while flush() runs in an executor
+        # thread; the lock keeps buffer swaps and appends from interleaving
+        self._lock = threading.Lock()
+        self._pending: List[UpdateOne] = []
+        self._domain_deltas: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+        try:
+            self.collection.create_index("domain")
+            self.collection.create_index("checked_at", expireAfterSeconds=CACHE_RETENTION_DAYS * 86400)
+        except Exception as e:
+            logger.warning(f"Error creating scrape cache indexes: {e}")
+
+        self.domain_stats: Dict[str, Dict] = {doc["_id"]: doc for doc in self.domains.find()}
+        logger.info(f"Loaded scrape cache stats for {len(self.domain_stats)} domains")
+
+    # ----- reads -----
+    def lookup(self, urls: List[str]) -> Dict[str, Dict]:
+        """Fetch cache entries for a batch of URLs in one query."""
+        if not urls:
+            return {}
+        return {doc["_id"]: doc for doc in self.collection.find({"_id": {"$in": list(urls)}})}
+
+    def domain_blocked(self, domain: str, now: Optional[datetime] = None) -> bool:
+        """
+        True if enough of the host's pages loaded without an image and none had one.
+        Fetch errors (timeouts, 5xx, DNS) are transient and do not count.
+        """
+        stats = self.domain_stats.get(domain)
+        if not stats:
+            return False
+        if stats.get("no_image", 0) < self.domain_min_attempts or stats.get("found", 0) > 0:
+            return False
+        last_checked = stats.get("last_checked")
+        now = now or datetime.utcnow()
+        return last_checked is None or now - last_checked < DOMAIN_BLOCK_TTL
+
+    def should_skip(self, url: str, entry: Optional[Dict], now: Optional[datetime] = None) -> Tuple[bool, str]:
+        """
+        Decide whether a URL can be skipped this run.
+
+        Returns:
+            (skip, reason) where reason is 'domain', 'negative' or ''
+        """
+        now = now or datetime.utcnow()
+        if self.domain_blocked(get_domain(url), now):
+            return True, "domain"
+        if entry and entry.get("status") in (STATUS_NO_IMAGE, STATUS_ERROR):
+            expires_at = entry.get("expires_at")
+            if expires_at and expires_at > now:
+                return True, "negative"
+        return False, ""
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a cached URL."""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @property
+    def pending_count(self) -> int:
+        """Number of buffered entries not yet flushed."""
+        return len(self._pending)
+
+    # ----- writes -----
+    def record(self, url: str, result: Dict, previous: Optional[Dict] = None) -> Dict:
+        """
+        Record a fetch result (buffered until flush()).
+
+        Args:
+            url: Page URL
+            result: Dict from image_scraper.fetch_best_image
+                    (status, image_url, http_status, etag, last_modified)
+            previous: Existing cache entry, if any
+
+        Returns:
+            The effective cache entry (a 304 resolves to the previous outcome)
+        """
+        now = datetime.utcnow()
+        status = result["status"]
+        entry = {
+            "domain": get_domain(url),
+            "status": status,
+            "image_url": result.get("image_url"),
+            "http_status": result.get("http_status"),
+            "etag": result.get("etag") or (previous or {}).get("etag"),
+            "last_modified": result.get("last_modified") or (previous or {}).get("last_modified"),
+            "checked_at": now,
+        }
+
+        if status == STATUS_NOT_MODIFIED and previous:
+            # Page unchanged since last fetch: keep the previous outcome
+            entry["status"] = previous.get("status", STATUS_NO_IMAGE)
+            entry["image_url"] = previous.get("image_url")
+
+        failures = 0
+        expires_at = None
+        if entry["status"] in (STATUS_NO_IMAGE, STATUS_ERROR):
+            failures = (previous or {}).get("failures", 0) + 1
+            base = self.no_image_ttl if entry["status"] == STATUS_NO_IMAGE else self.error_ttl
+            expires_at = now + min(base * (2 ** (failures - 1)), MAX_NEGATIVE_TTL)
+        entry["failures"] = failures
+        entry["expires_at"] = expires_at
+
+        with self._lock:
+            self._pending.append(UpdateOne({"_id": url}, {"$set": entry}, upsert=True))
+            self._count_domain(entry["domain"], entry["status"], now)
+        return entry
+
+    def _count_domain(self, domain: str, status: str, now: datetime):
+        """Update domain counters (caller holds the lock)."""
+        field = {STATUS_FOUND: "found", STATUS_NO_IMAGE: "no_image"}.get(status, "errors")
+        for key in ("attempts", field):
+            self._domain_deltas[domain][key] += 1
+            stats = self.domain_stats.setdefault(domain, {"_id": domain})
+            stats[key] = stats.get(key, 0) + 1
+        self.domain_stats[domain]["last_checked"] = now
+
+    def flush(self) -> int:
+        """Write buffered entries and domain counters. Returns entries written."""
+        with self._lock:
+            ops, self._pending = self._pending, []
+            deltas, self._domain_deltas = self._domain_deltas, defaultdict(lambda: defaultdict(int))
+
+        if ops:
+            try:
+                self.collection.bulk_write(ops, ordered=False)
+            except Exception as e:
+                logger.error(f"Error writing scrape cache: {e}")
+        if deltas:
+            now = datetime.utcnow()
+            domain_ops = [
+                UpdateOne({"_id": domain}, {"$inc": dict(counts), "$set": {"last_checked": now}}, upsert=True)
+                for domain, counts in deltas.items()
+            ]
+            try:
+                self.domains.bulk_write(domain_ops, ordered=False)
+            except Exception as e:
+                logger.error(f"Error writing domain stats: {e}")
+        return len(ops)
@@ -21,7 +21,10 @@ def search_by_keyword(storage: ArticleStorage, keyword: str, limit: int = 10):
     # Use MongoDB text search
     articles = storage.collection.find(
         {'$text': {'$search': keyword}},
-        {'score': {'$meta': 'textScore'}}
+        {
+            'title': 1, 'source': 1, 'categories': 1, 'url': 1,
+            'score': {'$meta': 'textScore'}
+        }
     ).sort([('score', {'$meta': 'textScore'})]).limit(limit)
     
     articles = list(articles)
@@ -48,7 +51,8 @@ def search_by_category(storage: ArticleStorage, category: str, limit: int = 10):
     articles = storage.get_articles(
         filter_dict={'categories': category},
         limit=limit,
-        sort_by='published_at'
+        sort_by='published_at',
+        projection=['title', 'source', 'categories', 'published_at']
     )
     
     if not articles:
@@ -86,7 +90,8 @@ def find_similar_articles(
     # Get all articles with embeddings
     articles = storage.get_articles(
         filter_dict={'embedding': {'$exists': True, '$ne': None}},
-        limit=1000
+        limit=1000,
+        projection=['title', 'categories', 'source', 'embedding']
     )
     
     if not articles:
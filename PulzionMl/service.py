@@ -1,10 +1,14 @@
 # embedding_service.py
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from pydantic import BaseModel
 from sentence_transformers import SentenceTransformer
 import uvicorn
 import os
+import time
+
+import metrics
 
 app = FastAPI(title="Free Embedding Service")
 
@@ -20,6 +24,24 @@ print("Loading all-MiniLM-L6-v2... (5-10 sec)")
 model = SentenceTransformer('all-MiniLM-L6-v2')
 print("Model loaded!")
 
+# Track /embed requests from arrival, so time spent waiting for a worker
+# thread shows up in both the in-flight gauge and the latency histogram
+@app.middleware("http")
+async def embed_metrics(request: Request, call_next):
+    if request.url.path != "/embed":
+        return await call_next(request)
+    started = time.perf_counter()
+    status = 500
+    metrics.EMBED_QUEUE_DEPTH.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.EMBED_QUEUE_DEPTH.dec()
+        metrics.EMBED_LATENCY.observe(time.perf_counter() - started)
+        metrics.EMBED_REQUESTS.labels(status=status).inc()
+
 class TextInput(BaseModel):
     text: str
 
@@ -27,13 +49,18 @@ class TextInput(BaseModel):
 def embed(input: TextInput):
     if not input.text.strip():
         raise HTTPException(400, "text is required")
-    vector = model.encode(input.text).tolist()
+    with metrics.EMBED_INFERENCE.time():
+        vector = model.encode(input.text).tolist()
     return {"vector": vector, "dim": len(vector)}
 
 @app.get("/")
 def root():
     return {"status": "healthy", "model": "all-MiniLM-L6-v2"}
 
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
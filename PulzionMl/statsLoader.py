@@ -49,6 +49,7 @@ def get_articles(days_back: int = 30) -> List[Dict]:
                 "published_at": 1,
                 "title": 1,
                 "sentiment": 1,
+                "sentiment_confidence": 1,
                 "keywords": 1,
                 "categories": 1,
                 "source": 1,
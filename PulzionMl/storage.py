@@ -3,16 +3,77 @@ MongoDB storage module for news articles.
 Provides efficient storage, retrieval, and update operations.
 """
 
+import base64
+import hashlib
 import logging
-from typing import Dict, List, Optional, Any
+import os
+import socket
+import uuid
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Union
 from datetime import datetime, timedelta
-from pymongo import MongoClient, UpdateOne, ASCENDING, DESCENDING
-from pymongo.errors import BulkWriteError, ConnectionFailure
+from bson import json_util
+from pymongo import MongoClient, ReturnDocument, ASCENDING, DESCENDING
+from pymongo.errors import AutoReconnect, ConnectionFailure, CursorNotFound
 
 import config
+from bulk_writer import BulkWriter, update_one
 
 logger = logging.getLogger(__name__)
 
+# Field selection accepted by the read methods: a list of field names
+# to include, or a raw MongoDB projection dict
+Projection = Optional[Union[Iterable[str], Dict[str, Any]]]
+
+# Times an iterator reopens its cursor after losing it before giving up
+ITER_MAX_RESUMES = 5
+
+# Processing stages tracked per article in `pending_stages`, with the
+# field each stage writes (used to backfill state for older articles)
+STAGE_LABEL = 'label'
+STAGE_EMBED = 'embed'
+STAGE_ANALYZE = 'analyze'
+STAGE_OUTPUT_FIELDS = {
+    STAGE_LABEL: 'categories',
+    STAGE_EMBED: 'embedding',
+    STAGE_ANALYZE: 'keywords',
+}
+PIPELINE_STAGES = tuple(STAGE_OUTPUT_FIELDS)
+
+# Fields that can change when an article is re-fetched; their hash decides
+# whether a stored article is rewritten (everything else is insert-only)
+HASHED_FIELDS = ('title', 'description', 'content')
+
+# _ids per existence lookup in save_articles
+PREFETCH_CHUNK_SIZE = 1000
+
+
+def content_hash(article: Dict) -> str:
+    """md5 of the article's mutable text fields."""
+    text = '\x1f'.join(str(article.get(field) or '') for field in HASHED_FIELDS)
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+
+def make_worker_id() -> str:
+    """Unique lease owner id for this process: host:pid:random."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def build_projection(fields: Projection) -> Optional[Dict[str, Any]]:
+    """
+    Normalize a field list into a MongoDB projection.
+
+    Args:
+        fields: None (whole document), list of field names, or projection dict
+
+    Returns:
+        Projection dict or None
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, dict):
+        return fields
+    return {field: 1 for field in fields}
+
 
 class ArticleStorage:
     """MongoDB storage handler for news articles."""
@@ -35,6 +96,7 @@ class ArticleStorage:
             self.client.server_info()
             self.db = self.client[self.db_name]
             self.collection = self.db[self.collection_name]
+            self.bulk_writer = BulkWriter(self.collection)
             
             # Create indexes for better performance
             self._create_indexes()
@@ -57,12 +119,18 @@ class ArticleStorage:
             # Index on published_at for time-based queries
             self.collection.create_index([("published_at", DESCENDING)])
             
+            # Keyset pagination on (published_at, _id) in either direction
+            self.collection.create_index([("published_at", DESCENDING), ("_id", DESCENDING)])
+            
             # Index on search_topic for filtering
             self.collection.create_index("search_topic")
             
             # Index on categories for filtering
             self.collection.create_index("categories")
             
+            # Stage work queues: {pending_stages: stage} in _id order is an index seek
+            self.collection.create_index([("pending_stages", ASCENDING), ("_id", ASCENDING)])
+            
             # Text index for search functionality
             self.collection.create_index([
                 ("title", "text"),
@@ -79,63 +147,109 @@ class ArticleStorage:
         """
         Save multiple articles with upsert (no duplicates).
         
+        Writes are kept to a minimum: new articles are inserted whole via
+        $setOnInsert, known articles are compared by content_hash and
+        only rewritten (mutable fields only) when their text changed, and
+        unchanged articles are not written at all.
+        
         Args:
             articles: List of article dicts
             
         Returns:
-            Dict with counts: {'inserted': N, 'updated': M, 'errors': K}
+            Dict with counts: {'inserted': N, 'updated': M, 'unchanged': U, 'errors': K}
         """
+        empty = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'errors': 0}
         if not articles:
             logger.warning("No articles to save")
-            return {'inserted': 0, 'updated': 0, 'errors': 0}
+            return empty
         
         logger.info(f"Saving {len(articles)} articles to database...")
         
-        operations = []
+        # Last occurrence wins for duplicate _ids within the batch
+        by_id = {}
         for article in articles:
             # Ensure _id is present (url_hash)
             if '_id' not in article:
                 logger.warning(f"Article missing _id: {article.get('url', 'unknown')}")
                 continue
-            
-            # Prepare upsert operation
-            operations.append(
-                UpdateOne(
-                    {'_id': article['_id']},
-                    {'$set': article},
-                    upsert=True
-                )
-            )
+            by_id[article['_id']] = article
         
-        if not operations:
+        if not by_id:
             logger.warning("No valid operations to execute")
-            return {'inserted': 0, 'updated': 0, 'errors': 0}
+            return empty
         
         try:
-            result = self.collection.bulk_write(operations, ordered=False)
-            
-            stats = {
-                'inserted': result.upserted_count,
-                'updated': result.modified_count,
-                'errors': 0
-            }
+            existing = self._existing_hashes(list(by_id))
+        except Exception as e:
+            logger.error(f"Error saving articles: {str(e)}")
+            return {**empty, 'errors': len(articles)}
+        
+        operations = []
+        unchanged = 0
+        for article_id, article in by_id.items():
+            digest = content_hash(article)
+            current = existing.get(article_id)
+            
+            if current is None:
+                # New article: insert whole (new articles start with every stage pending)
+                operations.append(
+                    update_one(
+                        {'_id': article_id},
+                        {'$setOnInsert': {
+                            **{k: v for k, v in article.items() if k != '_id'},
+                            'content_hash': digest,
+                            'pending_stages': list(PIPELINE_STAGES)
+                        }},
+                        upsert=True
+                    )
+                )
+                continue
             
-            logger.info(f"✓ Saved articles - New: {stats['inserted']}, Updated: {stats['updated']}")
-            return stats
+            update = {}
+            if current.get('content_hash') != digest:
+                update = {field: article.get(field) for field in HASHED_FIELDS}
+                update['content_hash'] = digest
+            image = article.get('urlToImage')
+            if image is not None and image != current.get('urlToImage'):
+                update['urlToImage'] = image
             
-        except BulkWriteError as e:
-            # Some operations succeeded, some failed
-            stats = {
-                'inserted': e.details.get('nUpserted', 0),
-                'updated': e.details.get('nModified', 0),
-                'errors': len(e.details.get('writeErrors', []))
-            }
-            logger.error(f"Bulk write errors: {stats['errors']} errors occurred")
-            return stats
+            if not update:
+                unchanged += 1
+                continue
             
-        except Exception as e:
-            logger.error(f"Error saving articles: {str(e)}")
-            return {'inserted': 0, 'updated': 0, 'errors': len(articles)}
+            ops = {'$set': update}
+            if 'content_hash' in current and 'content_hash' in update:
+                # Text changed since it was processed: run the stages again
+                ops['$addToSet'] = {'pending_stages': {'$each': list(PIPELINE_STAGES)}}
+            operations.append(update_one({'_id': article_id}, ops))
+        
+        if not operations:
+            logger.info(f"✓ Saved articles - New: 0, Updated: 0, Unchanged: {unchanged}")
+            return {**empty, 'unchanged': unchanged}
+        
+        report = self.bulk_writer.write(operations)
+        stats = {
+            'inserted': report['upserted'],
+            'updated': report['modified'],
+            'unchanged': unchanged,
+            'errors': report['errors']
+        }
+        
+        if stats['errors']:
+            logger.error(f"Bulk write errors: {stats['errors']} errors occurred "
+                         f"in {len(report['failed_chunks'])}/{report['chunks']} chunks")
+        logger.info(f"✓ Saved articles - New: {stats['inserted']}, Updated: {stats['updated']}, "
+                    f"Unchanged: {stats['unchanged']}")
+        return stats
+    
+    def _existing_hashes(self, article_ids: List[Any]) -> Dict[Any, Dict]:
+        """Fetch content_hash/urlToImage of already-stored articles, keyed by _id."""
+        existing = {}
+        for i in range(0, len(article_ids), PREFETCH_CHUNK_SIZE):
+            chunk = article_ids[i:i + PREFETCH_CHUNK_SIZE]
+            for doc in self.collection.find({'_id': {'$in': chunk}}, {'content_hash': 1, 'urlToImage': 1}):
+                existing[doc['_id']] = doc
+        return existing
     
     def get_articles(
         self, 
@@ -143,17 +257,21 @@ class ArticleStorage:
         skip: int = 0,
         filter_dict: Optional[Dict] = None,
         sort_by: str = "published_at",
-        ascending: bool = False
+        ascending: bool = False,
+        projection: Projection = None
     ) -> List[Dict]:
         """
         Retrieve articles from database.
         
+        Deep pages are slow with `skip`; prefer get_articles_page().
+        
         Args:
             limit: Maximum number of articles to retrieve
             skip: Number of articles to skip
             filter_dict: MongoDB filter query
             sort_by: Field to sort by
             ascending: Sort direction
+            projection: Fields to return (list of names or projection dict; None = all)
             
         Returns:
             List of article dicts
@@ -162,7 +280,8 @@ class ArticleStorage:
             query = filter_dict or {}
             sort_direction = ASCENDING if ascending else DESCENDING
             
-            cursor = self.collection.find(query).sort(sort_by, sort_direction).skip(skip).limit(limit)
+            cursor = self.collection.find(query, build_projection(projection)) \
+                .sort(sort_by, sort_direction).skip(skip).limit(limit)
             articles = list(cursor)
             
             logger.info(f"Retrieved {len(articles)} articles from database")
@@ -172,18 +291,206 @@ class ArticleStorage:
             logger.error(f"Error retrieving articles: {str(e)}")
             return []
     
-    def get_article_by_id(self, article_id: str) -> Optional[Dict]:
+    @staticmethod
+    def _encode_token(sort_by: str, ascending: bool, article: Dict) -> str:
+        """Opaque continuation token for the position after `article`."""
+        state = {'s': sort_by, 'a': ascending, 'v': article.get(sort_by), 'id': article['_id']}
+        return base64.urlsafe_b64encode(json_util.dumps(state).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_token(token: str, sort_by: str, ascending: bool) -> Dict:
+        """Decode a continuation token and check it matches the requested order."""
+        try:
+            state = json_util.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        except Exception as e:
+            raise ValueError(f"Invalid continuation token: {e}") from e
+        if state.get('s') != sort_by or state.get('a') != ascending:
+            raise ValueError("Continuation token was issued for a different sort order")
+        return state
+
+    @staticmethod
+    def _seek_query(sort_by: str, ascending: bool, value: Any, last_id: Any) -> Dict:
+        """Filter selecting articles strictly after (value, last_id) in sort order."""
+        op = '$gt' if ascending else '$lt'
+        tie = {sort_by: value, '_id': {op: last_id}}
+        # Missing/null values sort before everything else, and range
+        # operators never match them, so they are added explicitly
+        if value is None:
+            return {'$or': [{sort_by: {'$ne': None}}, tie]} if ascending else tie
+        if ascending:
+            return {'$or': [{sort_by: {op: value}}, tie]}
+        return {'$or': [{sort_by: {op: value}}, tie, {sort_by: None}]}
+
+    def get_articles_page(
+        self,
+        limit: int = 100,
+        filter_dict: Optional[Dict] = None,
+        sort_by: str = "published_at",
+        ascending: bool = False,
+        continuation_token: Optional[str] = None,
+        projection: Projection = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve one page of articles using keyset (seek) pagination.
+        
+        Pages are ordered by (sort_by, _id), so every page is an index seek
+        no matter how deep, and concurrent inserts do not shift pages.
+        
+        Args:
+            limit: Page size
+            filter_dict: MongoDB filter query
+            sort_by: Field to sort by
+            ascending: Sort direction
+            continuation_token: `next_token` from the previous page (None = first page)
+            projection: Fields to return (list of names or projection dict; None = all)
+            
+        Returns:
+            Dict with 'articles' (list) and 'next_token' (None on the last page)
+            
+        Raises:
+            ValueError: If the token is malformed or was issued for another sort order
+        """
+        query = filter_dict or {}
+        if continuation_token:
+            state = self._decode_token(continuation_token, sort_by, ascending)
+            seek = self._seek_query(sort_by, ascending, state['v'], state['id'])
+            query = {'$and': [filter_dict, seek]} if filter_dict else seek
+
+        # The token needs the sort key and _id: fetch them even when the
+        # projection leaves them out, and strip them again afterwards
+        projection = build_projection(projection)
+        hidden = []
+        if projection:
+            projection = dict(projection)
+            inclusive = any(value for field, value in projection.items() if field != '_id')
+            for field in (sort_by, '_id'):
+                default = 0 if inclusive and field != '_id' else 1
+                if projection.get(field, default) in (0, False):
+                    hidden.append(field)
+                    if inclusive:
+                        projection[field] = 1
+                    else:
+                        del projection[field]
+            projection = projection or None
+
+        direction = ASCENDING if ascending else DESCENDING
+        try:
+            cursor = self.collection.find(query, projection) \
+                .sort([(sort_by, direction), ('_id', direction)]).limit(limit + 1)
+            articles = list(cursor)
+        except Exception as e:
+            logger.error(f"Error retrieving articles page: {str(e)}")
+            return {'articles': [], 'next_token': None}
+
+        next_token = None
+        if len(articles) > limit:
+            articles = articles[:limit]
+            next_token = self._encode_token(sort_by, ascending, articles[-1])
+        for article in articles:
+            for field in hidden:
+                article.pop(field, None)
+
+        logger.info(f"Retrieved page of {len(articles)} articles from database")
+        return {'articles': articles, 'next_token': next_token}
+
+    def iter_articles(
+        self,
+        filter_dict: Optional[Dict] = None,
+        projection: Projection = None,
+        batch_size: Optional[int] = None,
+        start_after: Optional[Any] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        Stream articles in _id order without loading the result set.
+
+        If the server drops the cursor (idle timeout while the caller runs a
+        model, failover), a new cursor is opened after the last _id seen,
+        so no article is returned twice.
+
+        Args:
+            filter_dict: MongoDB filter query
+            projection: Fields to return (list of names or projection dict; None = all)
+            batch_size: Documents per cursor round-trip (uses config if None)
+            start_after: Resume after this _id
+            limit: Maximum number of articles (None = all)
+
+        Yields:
+            Article dicts
+        """
+        projection = build_projection(projection)
+        if projection and not projection.get('_id', 1):
+            # _id is needed to resume
+            projection = {k: v for k, v in projection.items() if k != '_id'}
+
+        last_id = start_after
+        yielded = 0
+        resumes = 0
+        while limit is None or yielded < limit:
+            query = filter_dict or {}
+            if last_id is not None:
+                after = {'_id': {'$gt': last_id}}
+                query = {'$and': [filter_dict, after]} if filter_dict else after
+
+            cursor = self.collection.find(query, projection) \
+                .sort('_id', ASCENDING).batch_size(batch_size or config.CURSOR_BATCH_SIZE)
+            if limit is not None:
+                cursor = cursor.limit(limit - yielded)
+
+            try:
+                for article in cursor:
+                    last_id = article['_id']
+                    yielded += 1
+                    yield article
+                return
+            except (CursorNotFound, AutoReconnect) as e:
+                resumes += 1
+                if resumes > ITER_MAX_RESUMES:
+                    raise
+                logger.warning(f"Cursor lost ({e.__class__.__name__}), resuming after _id {last_id}")
+            finally:
+                cursor.close()
+
+    def iter_batches(
+        self,
+        filter_dict: Optional[Dict] = None,
+        projection: Projection = None,
+        batch_size: Optional[int] = None,
+        start_after: Optional[Any] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[List[Dict]]:
+        """
+        Stream articles in _id-ordered lists of `batch_size`.
+
+        Same arguments as iter_articles(); the cursor round-trip size
+        matches the batch size.
+
+        Yields:
+            Lists of article dicts (the last one may be shorter)
+        """
+        batch_size = batch_size or config.CURSOR_BATCH_SIZE
+        batch = []
+        for article in self.iter_articles(filter_dict, projection, batch_size, start_after, limit):
+            batch.append(article)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def get_article_by_id(self, article_id: str, projection: Projection = None) -> Optional[Dict]:
         """
         Get a single article by its _id.
         
         Args:
             article_id: Article _id (url_hash)
+            projection: Fields to return (list of names or projection dict; None = all)
             
         Returns:
             Article dict or None
         """
         try:
-            article = self.collection.find_one({'_id': article_id})
+            article = self.collection.find_one({'_id': article_id}, build_projection(projection))
             return article
         except Exception as e:
             logger.error(f"Error retrieving article {article_id}: {str(e)}")
@@ -217,12 +524,14 @@ class ArticleStorage:
             logger.error(f"Error updating article {article_id}: {str(e)}")
             return False
     
-    def update_articles_batch(self, updates: List[tuple]) -> int:
+    def update_articles_batch(self, updates: List[tuple], complete_stage: Optional[str] = None) -> int:
         """
         Update multiple articles in batch.
         
         Args:
             updates: List of (article_id, update_dict) tuples
+            complete_stage: Stage to remove from each article's pending_stages
+                            (its lease is released too)
             
         Returns:
             Number of articles updated
@@ -232,28 +541,275 @@ class ArticleStorage:
         
         operations = []
         for article_id, update_dict in updates:
-            operations.append(
-                UpdateOne(
-                    {'_id': article_id},
-                    {'$set': update_dict}
-                )
-            )
+            update = {'$set': update_dict}
+            if complete_stage:
+                update['$pull'] = {'pending_stages': complete_stage}
+                update['$unset'] = {f'leases.{complete_stage}': ''}
+            operations.append(update_one({'_id': article_id}, update))
         
-        try:
-            result = self.collection.bulk_write(operations, ordered=False)
-            logger.info(f"✓ Batch updated {result.modified_count} articles")
-            return result.modified_count
+        report = self.bulk_writer.write(operations)
+        if report['errors']:
+            logger.warning(f"Batch update partial success: {report['modified']} updated, "
+                           f"{report['errors']} failed")
+        else:
+            logger.info(f"✓ Batch updated {report['modified']} articles")
+        return report['modified']
+    
+    def iter_pending(
+        self,
+        stage: str,
+        projection: Projection = None,
+        batch_size: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[List[Dict]]:
+        """
+        Stream batches of articles still pending a processing stage.
+        Served by the (pending_stages, _id) index.
+        
+        Args:
+            stage: One of PIPELINE_STAGES
+            projection: Fields to return (list of names or projection dict; None = all)
+            batch_size: Articles per batch (uses config if None)
+            limit: Maximum number of articles (None = all)
             
-        except BulkWriteError as e:
-            modified = e.details.get('nModified', 0)
-            logger.warning(f"Batch update partial success: {modified} updated")
-            return modified
+        Yields:
+            Lists of article dicts
+        """
+        self._check_stage(stage)
+        yield from self.iter_batches({'pending_stages': stage}, projection, batch_size, limit=limit)
+    
+    @staticmethod
+    def _check_stage(stage: str):
+        if stage not in STAGE_OUTPUT_FIELDS:
+            raise ValueError(f"Unknown stage: {stage} (use {', '.join(PIPELINE_STAGES)})")
+    
+    @staticmethod
+    def _claimable(stage: str, now: datetime) -> Dict:
+        """Filter for articles pending `stage` with no live lease."""
+        lease = f'leases.{stage}'
+        return {
+            'pending_stages': stage,
+            '$or': [
+                {lease: {'$exists': False}},
+                {f'{lease}.expires_at': {'$lt': now}},
+            ]
+        }
+    
+    def claim_batch(
+        self,
+        stage: str,
+        owner: str,
+        batch_size: int = 100,
+        lease_seconds: Optional[int] = None,
+        projection: Projection = None,
+        article_ids: Optional[List[Any]] = None
+    ) -> List[Dict]:
+        """
+        Atomically lease up to `batch_size` pending articles for a stage.
+        
+        Candidates are read from the (pending_stages, _id) index, then
+        leased with one update_many that only matches articles that are
+        still unleased (or whose lease expired). Each article is updated
+        atomically, so when workers race for the same candidates each
+        article goes to exactly one of them. Leases are released when the
+        stage completes (update_articles_batch(complete_stage=...)) or
+        simply expire, after which any worker can reclaim the article.
+        
+        Args:
+            stage: One of PIPELINE_STAGES
+            owner: Lease owner id (see make_worker_id)
+            batch_size: Maximum articles to claim
+            lease_seconds: Lease duration (uses config if None)
+            projection: Fields to return (list of names or projection dict; None = all)
+            article_ids: Only claim among these articles (None = whole queue)
             
+        Returns:
+            Claimed article dicts (empty when no work is left)
+            
+        Raises:
+            PyMongoError: Database errors are not swallowed, so an outage
+                          is not mistaken for an empty queue
+        """
+        self._check_stage(stage)
+        now = datetime.utcnow()
+        claimable = self._claimable(stage, now)
+        if article_ids is not None:
+            claimable['_id'] = {'$in': list(article_ids)}
+        
+        candidates = [
+            doc['_id'] for doc in
+            self.collection.find(claimable, {'_id': 1}).sort('_id', ASCENDING).limit(batch_size)
+        ]
+        if not candidates:
+            return []
+        
+        token = uuid.uuid4().hex
+        lease = {
+            'owner': owner,
+            'token': token,
+            'expires_at': now + timedelta(seconds=lease_seconds or config.CLAIM_LEASE_SECONDS)
+        }
+        self.collection.update_many(
+            {**claimable, '_id': {'$in': candidates}},
+            {'$set': {f'leases.{stage}': lease}}
+        )
+        
+        claimed = list(
+            self.collection.find(
+                {'_id': {'$in': candidates}, f'leases.{stage}.token': token},
+                build_projection(projection)
+            ).sort('_id', ASCENDING)
+        )
+        logger.info(f"Claimed {len(claimed)}/{len(candidates)} articles for '{stage}'")
+        return claimed
+    
+    def claim_one(
+        self,
+        stage: str,
+        owner: str,
+        lease_seconds: Optional[int] = None,
+        projection: Projection = None
+    ) -> Optional[Dict]:
+        """
+        Atomically lease a single pending article (find_one_and_update).
+        
+        Returns:
+            The claimed article, or None when no work is left (database
+            errors propagate, as in claim_batch)
+        """
+        self._check_stage(stage)
+        now = datetime.utcnow()
+        lease = {
+            'owner': owner,
+            'token': uuid.uuid4().hex,
+            'expires_at': now + timedelta(seconds=lease_seconds or config.CLAIM_LEASE_SECONDS)
+        }
+        return self.collection.find_one_and_update(
+            self._claimable(stage, now),
+            {'$set': {f'leases.{stage}': lease}},
+            projection=build_projection(projection),
+            sort=[('_id', ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+    
+    def renew_leases(
+        self,
+        stage: str,
+        owner: str,
+        article_ids: List[Any],
+        lease_seconds: Optional[int] = None
+    ) -> int:
+        """
+        Extend this owner's leases (for batches that outlive the lease).
+        
+        Returns:
+            Number of leases renewed
+        """
+        expires_at = datetime.utcnow() + timedelta(seconds=lease_seconds or config.CLAIM_LEASE_SECONDS)
+        result = self.collection.update_many(
+            {'_id': {'$in': list(article_ids)}, f'leases.{stage}.owner': owner},
+            {'$set': {f'leases.{stage}.expires_at': expires_at}}
+        )
+        return result.modified_count
+    
+    def release_leases(self, stage: str, owner: str, article_ids: Optional[List[Any]] = None) -> int:
+        """
+        Release this owner's leases so other workers can claim the articles.
+        
+        Args:
+            stage: One of PIPELINE_STAGES
+            owner: Lease owner id
+            article_ids: Only release these articles (None = all of the owner's leases)
+            
+        Returns:
+            Number of leases released
+        """
+        query = {f'leases.{stage}.owner': owner}
+        if article_ids is not None:
+            query['_id'] = {'$in': list(article_ids)}
+        result = self.collection.update_many(query, {'$unset': {f'leases.{stage}': ''}})
+        return result.modified_count
+    
+    def fail_leases(self, stage: str, owner: str, article_ids: List[Any]) -> int:
+        """
+        Release leases on articles the stage produced no result for.
+        
+        Each release counts as a failed attempt (`failures.<stage>`); after
+        config.MAX_STAGE_FAILURES attempts the stage is dropped from the
+        article's pending_stages, so a persistently bad article is not
+        re-claimed forever.
+        
+        Args:
+            stage: One of PIPELINE_STAGES
+            owner: Lease owner id
+            article_ids: Articles that were claimed but not completed
+            
+        Returns:
+            Number of articles given up on
+        """
+        if not article_ids:
+            return 0
+        query = {'_id': {'$in': list(article_ids)}, f'leases.{stage}.owner': owner}
+        self.collection.update_many(
+            query,
+            {'$unset': {f'leases.{stage}': ''}, '$inc': {f'failures.{stage}': 1}}
+        )
+        result = self.collection.update_many(
+            {
+                '_id': {'$in': list(article_ids)},
+                'pending_stages': stage,
+                f'failures.{stage}': {'$gte': config.MAX_STAGE_FAILURES}
+            },
+            {'$pull': {'pending_stages': stage}}
+        )
+        if result.modified_count:
+            logger.warning(f"Gave up on {result.modified_count} articles for '{stage}' "
+                           f"after {config.MAX_STAGE_FAILURES} failed attempts")
+        return result.modified_count
+    
+    def count_pending(self, stage: str) -> int:
+        """Number of articles pending a processing stage."""
+        return self.count_articles({'pending_stages': stage})
+    
+    def backfill_processing_state(self) -> int:
+        """
+        Set pending_stages on articles stored before it existed.
+        
+        A stage is pending when its output field is missing or null. Runs
+        as a single server-side pipeline update (MongoDB 4.2+). The
+        pending_stages index only narrows `$exists: false` to its null
+        range (missing and null share it), and every candidate is fetched
+        to check the field, so the first call on a legacy collection
+        visits each legacy article; once all articles have the field the
+        range is empty and the call at every startup is cheap.
+        
+        Returns:
+            Number of articles backfilled
+        """
+        pending = {
+            '$concatArrays': [
+                {'$cond': [{'$eq': [{'$ifNull': [f'${field}', None]}, None]}, [stage], []]}
+                for stage, field in STAGE_OUTPUT_FIELDS.items()
+            ]
+        }
+        try:
+            result = self.collection.update_many(
+                {'pending_stages': {'$exists': False}},
+                [{'$set': {'pending_stages': pending}}]
+            )
+            if result.modified_count:
+                logger.info(f"✓ Backfilled processing state for {result.modified_count} articles")
+            return result.modified_count
         except Exception as e:
-            logger.error(f"Error in batch update: {str(e)}")
+            logger.error(f"Error backfilling processing state: {str(e)}")
             return 0
     
-    def get_articles_without_field(self, field_name: str, limit: int = 1000) -> List[Dict]:
+    def get_articles_without_field(
+        self,
+        field_name: str,
+        limit: int = 1000,
+        projection: Projection = None
+    ) -> List[Dict]:
         """
         Get articles that are missing a specific field.
         Useful for incremental processing.
@@ -261,13 +817,14 @@ class ArticleStorage:
         Args:
             field_name: Field to check for
             limit: Maximum number of articles
+            projection: Fields to return (list of names or projection dict; None = all)
             
         Returns:
             List of articles missing the field
         """
         try:
             query = {field_name: {'$exists': False}}
-            cursor = self.collection.find(query).limit(limit)
+            cursor = self.collection.find(query, build_projection(projection)).limit(limit)
             articles = list(cursor)
             
             logger.info(f"Found {len(articles)} articles without field '{field_name}'")
@@ -356,6 +913,7 @@ class ArticleStorage:
     
     def close(self):
         """Close MongoDB connection."""
+        self.bulk_writer.close()
         if self.client:
             self.client.close()
             logger.info("MongoDB connection closed")
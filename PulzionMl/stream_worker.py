@@ -0,0 +1,296 @@
+"""
+Reactive processing mode for the news pipeline.
+Watches the articles collection with a MongoDB change stream and labels,
+embeds and analyzes new articles within seconds of insertion, and stored
+articles within seconds of being re-pended (text changed on re-fetch).
+
+Change streams require a replica set. For local development a
+single-node replica set is enough:
+
+    mongod --replSet rs0 --dbpath data/db
+    mongosh --eval "rs.initiate()"
+    MONGODB_URI=mongodb://localhost:27017/?replicaSet=rs0&directConnection=true
+
+The resume token is saved in the pipeline_state collection after each
+micro-batch, so a restarted worker continues where it stopped.
+
+Usage:
+    python stream_worker.py [--name NAME] [--batch-size N] [--max-latency SECONDS] [--metrics-port PORT]
+"""
+
+import argparse
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import OperationFailure
+
+import config
+import metrics
+from main import analyze_chunk, embed_chunk, iter_stage_chunks, label_chunk, setup_logging
+from storage import ArticleStorage, STAGE_ANALYZE, STAGE_EMBED, STAGE_LABEL, make_worker_id
+from labeling import ArticleLabeler
+from embeddings import EmbeddingGenerator
+from analyzer import ArticleAnalyzer
+from inference_pool import close_model, create_model
+
+logger = logging.getLogger(__name__)
+
+# Server errors meaning the resume token is no longer in the oplog
+# (CappedPositionLost, ChangeStreamFatalError, ChangeStreamHistoryLost)
+HISTORY_LOST_CODES = (136, 280, 286)
+
+# Inserts and updates that write pending_stages create work: re-fetched
+# articles whose text changed, backfills. Updates that also release a lease
+# are stage completions and are left out. The event is trimmed to its
+# document key.
+WATCH_PIPELINE = [
+    {'$match': {'$or': [
+        {'operationType': 'insert'},
+        {
+            'operationType': 'update',
+            'updateDescription.removedFields': {'$not': {'$regex': r'^leases\.'}},
+            # updatedFields names array writes either pending_stages or pending_stages.<i>
+            '$expr': {'$gt': [{'$size': {'$filter': {
+                'input': {'$objectToArray': {'$ifNull': ['$updateDescription.updatedFields', {}]}},
+                'cond': {'$regexMatch': {'input': '$$this.k', 'regex': r'^pending_stages(\.|$)'}},
+            }}}, 0]},
+        },
+    ]}},
+    {'$project': {'operationType': 1, 'documentKey': 1}},
+]
+
+
+class StreamWorker:
+    """Micro-batches inserted and re-pended articles from a change stream through the pipeline stages."""
+
+    def __init__(
+        self,
+        storage: ArticleStorage,
+        name: str = "default",
+        batch_size: int = config.STREAM_BATCH_SIZE,
+        max_latency: float = config.STREAM_MAX_LATENCY_SECONDS,
+        owner: Optional[str] = None
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            storage: ArticleStorage connected to a replica set
+            name: Worker name (several named workers keep separate resume tokens)
+            batch_size: Articles per micro-batch
+            max_latency: Seconds before a partial micro-batch is processed
+            owner: Lease owner id (generated if None)
+        """
+        self.storage = storage
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.owner = owner or make_worker_id()
+        self.state = storage.db[config.STATE_COLLECTION]
+        self.state_id = f"stream_worker:{name}"
+
+        self.labeler = None
+        self.generator = None
+        self.analyzer = None
+        self.stats = {'batches': 0, 'labeled': 0, 'embedded': 0, 'analyzed': 0}
+        self._running = False
+
+    def load_models(self):
+        """Load the enabled models once, before the first event arrives."""
+        if config.ENABLE_LABELING and self.labeler is None:
+            self.labeler = create_model(STAGE_LABEL)
+        if config.ENABLE_EMBEDDINGS and self.generator is None:
+            self.generator = create_model(STAGE_EMBED)
+        if (config.ENABLE_KEYWORD_EXTRACTION or config.ENABLE_SENTIMENT_ANALYSIS) and self.analyzer is None:
+            self.analyzer = create_model(STAGE_ANALYZE)
+
+    def close_models(self):
+        """Release the models (stops inference worker processes)."""
+        for attr in ('labeler', 'generator', 'analyzer'):
+            close_model(getattr(self, attr))
+            setattr(self, attr, None)
+
+    # ----- resume token -----
+    def load_resume_token(self) -> Optional[Dict]:
+        """Resume token saved by the last run, if any."""
+        doc = self.state.find_one({'_id': self.state_id})
+        return doc.get('resume_token') if doc else None
+
+    def save_resume_token(self, token: Optional[Dict]):
+        """Persist the position after the last processed event."""
+        if token is None:
+            return
+        self.state.update_one(
+            {'_id': self.state_id},
+            {'$set': {'resume_token': token, 'owner': self.owner, 'updated_at': datetime.utcnow()}},
+            upsert=True
+        )
+
+    def clear_resume_token(self):
+        self.state.update_one({'_id': self.state_id}, {'$unset': {'resume_token': ''}})
+
+    # ----- processing -----
+    def _stages(self) -> List[tuple]:
+        stages = []
+        if self.labeler is not None:
+            stages.append((STAGE_LABEL, ArticleLabeler.INPUT_FIELDS, self._label))
+        if self.generator is not None:
+            stages.append((STAGE_EMBED, EmbeddingGenerator.INPUT_FIELDS, self._embed))
+        if self.analyzer is not None:
+            stages.append((STAGE_ANALYZE, ArticleAnalyzer.INPUT_FIELDS, self._analyze))
+        return stages
+
+    def _label(self, articles: List[Dict]):
+        self.stats['labeled'] += label_chunk(self.storage, self.labeler, articles, owner=self.owner)
+
+    def _embed(self, articles: List[Dict]):
+        self.stats['embedded'] += embed_chunk(self.storage, self.generator, articles, show_progress=False, owner=self.owner)
+
+    def _analyze(self, articles: List[Dict]):
+        keywords, _ = analyze_chunk(self.storage, self.analyzer, articles, owner=self.owner)
+        self.stats['analyzed'] += keywords
+
+    def process(self, article_ids: List[Any]):
+        """
+        Run every enabled stage on a micro-batch of new or re-pended articles.
+        Articles are claimed first, so work already done or leased by
+        another worker (or a concurrent main.py run) is skipped.
+        """
+        started = time.time()
+        for stage, fields, run in self._stages():
+            articles = self.storage.claim_batch(
+                stage, self.owner, len(article_ids), projection=fields, article_ids=article_ids
+            )
+            if articles:
+                run(articles)
+        self.stats['batches'] += 1
+        logger.info(f"⚡ Processed micro-batch of {len(article_ids)} articles in {time.time() - started:.2f}s")
+
+    def catch_up(self):
+        """Process the pending backlog (first start, or when the resume token expired)."""
+        logger.info("Catching up on pending articles...")
+        for stage, fields, run in self._stages():
+            for chunk in iter_stage_chunks(self.storage, stage, fields, self.owner):
+                run(chunk)
+
+    # ----- event loop -----
+    def operation_time(self):
+        """Current cluster time, used as the stream's start point before a catch-up."""
+        return self.storage.client.admin.command('hello').get('operationTime')
+
+    def start_fresh(self):
+        """
+        Catch up without a resume token, returning the stream's start point.
+        The start point is taken before catching up, so inserts made while
+        the backlog is processed are still delivered by the stream
+        (anything the catch-up already completed is skipped when claimed).
+        """
+        start_at = self.operation_time()
+        self.catch_up()
+        return start_at
+
+    def run(self):
+        """Watch for new and re-pended articles until stop() is called."""
+        self.load_models()
+        self._running = True
+        token = self.load_resume_token()
+        start_at = self.start_fresh() if token is None else None
+
+        while self._running:
+            # Resume after the last processed event, or from the start point
+            # until the first micro-batch has saved a token
+            position = {'resume_after': token} if token is not None else {'start_at_operation_time': start_at}
+            try:
+                with self.storage.collection.watch(
+                    WATCH_PIPELINE,
+                    max_await_time_ms=max(int(self.max_latency * 500), 100),
+                    **position
+                ) as stream:
+                    logger.info(f"👀 Watching {self.storage.collection.full_name} for new and re-pended articles")
+                    self.consume(stream)
+                # Stream closed by the server: reopen from the saved position
+                token = self.load_resume_token() or token
+            except OperationFailure as e:
+                if e.code not in HISTORY_LOST_CODES:
+                    raise
+                logger.warning(f"Resume token no longer available ({e.code}), starting a new stream")
+                self.clear_resume_token()
+                token = None
+                start_at = self.start_fresh()
+
+    def consume(self, stream):
+        """
+        Micro-batch events from an open change stream.
+
+        A batch is processed when it is full or its oldest event is
+        `max_latency` seconds old; the resume token is saved afterwards,
+        so a crash replays at most the unfinished batch (already-completed
+        stages are not pending any more and are skipped).
+        """
+        pending = []
+        first_seen = None
+        saved_token = None
+
+        while self._running and stream.alive:
+            change = stream.try_next()
+            if change is not None and change['documentKey']['_id'] not in pending:
+                pending.append(change['documentKey']['_id'])
+                first_seen = first_seen or time.monotonic()
+                metrics.STREAM_QUEUE_DEPTH.set(len(pending))
+
+            due = pending and (
+                len(pending) >= self.batch_size
+                or time.monotonic() - first_seen >= self.max_latency
+            )
+            if due:
+                self.process(pending)
+                pending = []
+                first_seen = None
+                metrics.STREAM_QUEUE_DEPTH.set(0)
+
+            if not pending and stream.resume_token != saved_token:
+                saved_token = stream.resume_token
+                self.save_resume_token(saved_token)
+
+        if pending:
+            self.process(pending)
+            self.save_resume_token(stream.resume_token)
+
+    def stop(self):
+        """Ask the event loop to finish the current batch and exit."""
+        self._running = False
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Process new articles as they are inserted")
+    parser.add_argument('--name', default="default", help="Worker name (separate resume token per name)")
+    parser.add_argument('--batch-size', type=int, default=config.STREAM_BATCH_SIZE)
+    parser.add_argument('--max-latency', type=float, default=config.STREAM_MAX_LATENCY_SECONDS)
+    parser.add_argument('--metrics-port', type=int, default=config.METRICS_PORT,
+                        help="Serve Prometheus metrics on this port")
+    args = parser.parse_args()
+    setup_logging()
+
+    if args.metrics_port:
+        metrics.start_http_server(args.metrics_port)
+
+    storage = ArticleStorage()
+    worker = StreamWorker(storage, args.name, args.batch_size, args.max_latency)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        logger.warning("⚠️  Stream worker interrupted by user")
+    finally:
+        stats = worker.stats
+        logger.info(
+            f"Stream worker stopped - batches: {stats['batches']}, labeled: {stats['labeled']}, "
+            f"embedded: {stats['embedded']}, analyzed: {stats['analyzed']}"
+        )
+        worker.close_models()
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
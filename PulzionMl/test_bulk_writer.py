@@ -0,0 +1,126 @@
+"""
+Test script for chunked bulk writes (bulk_writer.py).
+Runs against an in-memory mongomock database (fixtures in conftest.py):
+
+    pip install -r requirements-dev.txt
+    python test_bulk_writer.py
+"""
+
+import sys
+import threading
+import time
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+import bulk_writer
+from bulk_writer import BulkWriter, insert_one, operation_size, update_one
+
+
+class RecordingCollection:
+    """Wraps a collection, recording chunk sizes; optionally slow or failing for some chunks."""
+
+    def __init__(self, collection, delay=0.0, fail_chunks=()):
+        self.collection = collection
+        self.name = collection.name
+        self.delay = delay
+        self.fail_chunks = set(fail_chunks)
+        self.chunk_sizes = []
+        self.lock = threading.Lock()   # mongomock is not thread-safe
+
+    def bulk_write(self, requests, ordered=True):
+        with self.lock:
+            self.chunk_sizes.append(len(requests))
+            failing = len(self.chunk_sizes) - 1 in self.fail_chunks
+        if failing:
+            raise AutoReconnect("connection lost")
+        time.sleep(self.delay)
+        with self.lock:
+            return self.collection.bulk_write(requests, ordered=ordered)
+
+
+def inserts(count, padding=0):
+    return [insert_one({'_id': i, 'body': "x" * padding}) for i in range(count)]
+
+
+def test_operations_are_sized_from_their_own_fields():
+    small = update_one({'_id': 1}, {'$set': {'title': "a"}})
+    large = update_one({'_id': 1}, {'$set': {'title': "a" * 1000}})
+    assert operation_size(large) - operation_size(small) == 999
+    pipeline = update_one({'_id': 1}, [{'$set': {'n': 1}}], upsert=True)
+    assert operation_size(pipeline) > operation_size(update_one({'_id': 1}, {}))
+    with pytest.raises(ValueError):
+        bulk_writer.to_pymongo({'op': 'replace_all'})
+
+
+def test_chunks_by_operation_count(mongo_db):
+    collection = RecordingCollection(mongo_db.docs)
+    writer = BulkWriter(collection, max_ops=10, workers=1, adaptive=False)
+    report = writer.write(inserts(35))
+    assert collection.chunk_sizes == [10, 10, 10, 5]
+    assert (report['chunks'], report['inserted'], report['errors']) == (4, 35, 0)
+    assert mongo_db.docs.count_documents({}) == 35
+
+
+def test_chunks_by_bytes(mongo_db):
+    collection = RecordingCollection(mongo_db.docs)
+    ops = inserts(20, padding=1000)
+    writer = BulkWriter(collection, max_ops=100, max_bytes=4 * operation_size(ops[0]), workers=1, adaptive=False)
+    report = writer.write(ops)
+    assert collection.chunk_sizes == [4] * 5
+    assert report['inserted'] == 20
+
+
+def test_adaptive_sizing_follows_latency(mongo_db):
+    """Slow chunks halve the chunk size down to MIN_CHUNK_OPS; fast chunks double it back up."""
+    slow = RecordingCollection(mongo_db.docs, delay=0.05)
+    writer = BulkWriter(slow, max_ops=400, workers=1, target_latency=0.01)
+    writer.write(inserts(1000))
+    assert slow.chunk_sizes[:4] == [400, 200, 100, bulk_writer.MIN_CHUNK_OPS]
+    assert set(slow.chunk_sizes[3:]) == {bulk_writer.MIN_CHUNK_OPS}
+
+    fast = RecordingCollection(mongo_db.more)
+    writer.collection = fast
+    writer.target_latency = 10.0
+    writer.write(inserts(1000))
+    assert fast.chunk_sizes[:4] == [50, 100, 200, 400]
+    assert writer.chunk_ops == 400
+
+    writer._adapt(10, latency=100.0)   # a small tail chunk says nothing about the chunk size
+    assert writer.chunk_ops == 400
+
+
+def test_failed_chunks_are_reported_and_others_committed(mongo_db):
+    """A write error or a failed chunk leaves every other chunk committed and is reported by offset."""
+    mongo_db.docs.insert_one({'_id': 12})                     # duplicate key inside the second chunk
+    collection = RecordingCollection(mongo_db.docs, fail_chunks={2})
+    writer = BulkWriter(collection, max_ops=10, workers=1, adaptive=False)
+    report = writer.write(inserts(40))
+
+    assert report['chunks'] == 4
+    assert report['inserted'] == 40 - 1 - 10
+    assert report['errors'] == 1 + 10
+    first, second = report['failed_chunks']
+    assert (first['offset'], first['size'], first['error']) == (10, 10, None)
+    assert [(error['index'], error['code']) for error in first['errors']] == [(12, 11000)]
+    assert (second['offset'], second['size'], second['errors']) == (20, 10, [])
+    assert "connection lost" in second['error']
+
+    stored = {doc['_id'] for doc in mongo_db.docs.find()}
+    assert stored == set(range(0, 20)) | set(range(30, 40))
+
+
+def test_concurrent_chunks_write_everything(mongo_db):
+    collection = RecordingCollection(mongo_db.docs, delay=0.01)
+    writer = BulkWriter(collection, max_ops=25, workers=4, adaptive=False)
+    try:
+        report = writer.write([update_one({'_id': i}, {'$set': {'n': i}}, upsert=True) for i in range(1, 501)])
+    finally:
+        writer.close()
+    assert (report['chunks'], report['upserted'], report['errors']) == (20, 500, 0)
+    assert collection.chunk_sizes == [25] * 20
+    assert mongo_db.docs.count_documents({}) == 500
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,159 @@
+"""
+Test script for run checkpoints (checkpoint.RunCheckpoint and
+main.run_pipeline --resume). Runs against an in-memory mongomock database
+with stand-in stage functions, so no MongoDB server or model is needed
+(fixtures in conftest.py):
+
+    pip install -r requirements-dev.txt
+    python test_checkpoint.py
+"""
+
+import asyncio
+import sys
+from unittest import mock
+
+import pytest
+
+import config
+import main
+from checkpoint import RunCheckpoint, STATUS_COMPLETED, STATUS_FAILED, STATUS_SKIPPED
+from storage import STAGE_EMBED
+
+
+class FakeStages:
+    """
+    Stand-in label/embed/analyze stages. Embed claims `embed_batch`
+    articles, then crashes while `crash_embed` is set.
+    """
+
+    def __init__(self, crash_embed=False, embed_batch=2):
+        self.crash_embed = crash_embed
+        self.embed_batch = embed_batch
+        self.calls = []
+
+    def label(self, storage, owner, on_persist=None):
+        self.calls.append('label')
+        on_persist(3)
+        return 3
+
+    def embed(self, storage, owner, on_persist=None):
+        self.calls.append('embed')
+        claimed = storage.claim_batch(STAGE_EMBED, owner, self.embed_batch)
+        on_persist(len(claimed))
+        if self.crash_embed:
+            raise RuntimeError("model crashed")
+        return len(claimed)
+
+    def analyze(self, storage, owner, on_persist=None):
+        self.calls.append('analyze')
+        on_persist(4)
+        return 4, 4
+
+    def patch(self, storage):
+        return mock.patch.multiple(
+            main,
+            ArticleStorage=lambda *args, **kwargs: storage,
+            setup_logging=lambda: None,
+            label_stage=self.label,
+            embed_stage=self.embed,
+            analyze_stage=self.analyze
+        )
+
+
+def seed(storage, count=5):
+    storage.save_articles([
+        {'_id': f"a{i:04d}", 'url': f"https://example.com/{i}", 'title': f"Article {i}", 'search_topic': "technology"}
+        for i in range(count)
+    ])
+
+
+def run(storage, stages, **kwargs):
+    with stages.patch(storage), mock.patch.object(storage, 'close') as close:
+        result = asyncio.run(main.run_pipeline(skip_fetch=True, **kwargs))
+    assert close.call_count == 1, "storage was not closed"
+    return result
+
+
+def run_doc(storage, run_id):
+    return storage.db[config.RUNS_COLLECTION].find_one({'_id': run_id})
+
+
+def test_failed_run_is_recorded_and_storage_closed(storage):
+    seed(storage)
+    stages = FakeStages(crash_embed=True)
+    result = run(storage, stages)
+
+    assert result['success'] is False and result['error'] == "model crashed"
+    doc = run_doc(storage, result['run_id'])
+    assert doc['status'] == STATUS_FAILED
+    assert doc['stages']['fetch']['status'] == STATUS_SKIPPED
+    assert doc['stages']['label']['status'] == STATUS_COMPLETED
+    assert doc['stages']['embed']['status'] == 'running'
+    assert doc['stages']['embed']['processed'] == 2
+
+
+def test_resume_skips_completed_stages_and_keeps_counters(storage):
+    seed(storage)
+    failed = run(storage, FakeStages(crash_embed=True))
+    run_id = failed['run_id']
+    owner = RunCheckpoint(storage.db, run_id, {}).owner
+    assert storage.count_articles({f'leases.{STAGE_EMBED}.owner': owner}) == 2
+
+    stages = FakeStages(embed_batch=5)
+    result = run(storage, stages, resume_run=run_id)
+
+    assert result['success'] is True and result['run_id'] == run_id
+    assert stages.calls == ['embed', 'analyze'], "the completed label stage ran again"
+    # The interrupted attempt's leases were released, so all 5 articles are claimable again
+    assert result['stats']['embeddings_generated'] == 5
+    doc = run_doc(storage, run_id)
+    assert doc['status'] == STATUS_COMPLETED and doc['attempts'] == 2
+    assert doc['stages']['label']['processed'] == 3
+    assert doc['stages']['embed']['processed'] == 7
+    assert doc['stages']['analyze']['processed'] == 4
+
+    checkpoint = RunCheckpoint(storage.db, run_id, doc)
+    assert checkpoint.processed('embed') == 7
+    assert all(checkpoint.is_done(stage) for stage in ('fetch', 'label', 'embed', 'analyze'))
+
+
+def test_resume_rejects_unknown_and_completed_runs(storage):
+    with pytest.raises(ValueError):
+        RunCheckpoint.resume(storage.db, "no-such-run")
+
+    done = run(storage, FakeStages())
+    assert done['success'] is True
+    with pytest.raises(ValueError):
+        RunCheckpoint.resume(storage.db, done['run_id'])
+
+    result = run(storage, FakeStages(), resume_run=done['run_id'])
+    assert result['success'] is False and 'already completed' in result['error']
+
+
+def test_resume_option_passes_run_id(storage):
+    stages = FakeStages(crash_embed=True)
+    run_id = run(storage, stages)['run_id']
+    stages.crash_embed = False
+
+    argv = ['main.py', '--resume', run_id, '--metrics-port', '0']
+    with stages.patch(storage), mock.patch.object(sys, 'argv', argv), mock.patch.object(storage, 'close'):
+        result = asyncio.run(main.main())
+    assert result['success'] is True and result['run_id'] == run_id
+    assert stages.calls == ['label', 'embed', 'embed', 'analyze']
+
+
+def test_list_runs_prints_stage_status(storage, capsys):
+    first = run(storage, FakeStages(crash_embed=True))['run_id']
+    second = run(storage, FakeStages())['run_id']
+
+    argv = ['main.py', '--list-runs']
+    with FakeStages().patch(storage), mock.patch.object(sys, 'argv', argv), mock.patch.object(storage, 'close'):
+        assert asyncio.run(main.main()) == {'success': True}
+    lines = capsys.readouterr().out.splitlines()
+    runs = {line.split()[0]: line for line in lines if line.split() and line.split()[0] in (first, second)}
+    assert STATUS_FAILED in runs[first] and "embed=running(0)" in runs[first]
+    assert STATUS_COMPLETED in runs[second] and "label=completed(3)" in runs[second]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,98 @@
+"""
+Test script for work claiming (storage.claim_batch and main.ChunkLease).
+Runs against an in-memory mongomock database, with a stand-in labeler, so
+no MongoDB server or model is needed (fixtures in conftest.py):
+
+    pip install -r requirements-dev.txt
+    python test_claims.py
+"""
+
+import sys
+import time
+from unittest import mock
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+import config
+from main import label_chunk, label_stage
+from storage import STAGE_LABEL
+
+
+class FakeLabeler:
+    """Labels every article except `skip`, in batches of `batch_size`; calls `between` after each batch."""
+
+    def __init__(self, batch_size=10, skip=(), between=None):
+        self.batch_size = batch_size
+        self.skip = set(skip)
+        self.between = between
+
+    def label_articles_batch(self, articles, multi_label=True, threshold=0.4, batch_callback=None):
+        for start in range(0, len(articles), self.batch_size):
+            batch = articles[start:start + self.batch_size]
+            for article in batch:
+                if article['_id'] not in self.skip:
+                    article['categories'] = ['Technology']
+                    article['category_scores'] = {'Technology': 0.9}
+            batch_callback(batch)
+            if self.between:
+                self.between()
+        return articles
+
+
+def seed(storage, count=20):
+    storage.save_articles([
+        {'_id': f"a{i:04d}", 'url': f"https://example.com/{i}", 'title': f"Article {i}"}
+        for i in range(count)
+    ])
+    return storage
+
+
+def test_racing_owners_get_disjoint_batches(storage):
+    """Two owners claiming the same queue never share an article."""
+    seed(storage, 20)
+    first = storage.claim_batch(STAGE_LABEL, "worker-a", 15)
+    second = storage.claim_batch(STAGE_LABEL, "worker-b", 15)
+    assert len(first) == 15 and len(second) == 5
+    assert not {a['_id'] for a in first} & {a['_id'] for a in second}
+    assert storage.claim_batch(STAGE_LABEL, "worker-c", 15) == []
+
+
+def test_lease_renewed_while_chunk_runs(storage):
+    """A chunk that outlives its original lease is not reclaimed by another owner."""
+    seed(storage, 20)
+    chunk = storage.claim_batch(STAGE_LABEL, "worker-a", 20, lease_seconds=1)
+    stolen = []
+
+    def other_worker_tries():
+        time.sleep(1.2)  # the original 1s lease has expired by now
+        stolen.extend(storage.claim_batch(STAGE_LABEL, "worker-b", 20))
+
+    labeled = label_chunk(storage, FakeLabeler(batch_size=10, between=other_worker_tries), chunk, owner="worker-a")
+    assert labeled == 20
+    assert stolen == [], f"worker-b reclaimed {len(stolen)} articles mid-chunk"
+
+
+def test_articles_without_result_are_released_then_dropped(storage):
+    """An article that never gets a result is retried MAX_STAGE_FAILURES times, then given up on."""
+    seed(storage, 5)
+    labeled = label_stage(storage, "worker-a", labeler=FakeLabeler(skip={"a0002"}))
+
+    assert labeled == 4
+    bad = storage.collection.find_one({'_id': "a0002"})
+    assert STAGE_LABEL not in bad['pending_stages']
+    assert bad['failures'][STAGE_LABEL] == config.MAX_STAGE_FAILURES
+    assert STAGE_LABEL not in bad.get('leases', {})
+    assert storage.count_pending(STAGE_LABEL) == 0
+
+
+def test_claim_errors_are_not_an_empty_queue(storage):
+    """Database errors while claiming propagate instead of ending the stage quietly."""
+    seed(storage, 5)
+    with mock.patch.object(storage.collection, 'find', side_effect=AutoReconnect("connection lost")):
+        with pytest.raises(AutoReconnect):
+            storage.claim_batch(STAGE_LABEL, "worker-a", 5)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,225 @@
+"""
+Test script for the streaming export writers, shard ranges and shard
+merging (export_data.py). Writes to pytest's tmp_path; the Parquet tests
+need pyarrow and are skipped without it:
+
+    pip install -r requirements-dev.txt
+    python test_export_data.py
+"""
+
+import csv
+import hashlib
+import json
+import sys
+from datetime import datetime
+
+import pytest
+
+from export_data import (
+    CSVWriter, JSONArrayWriter, NDJSONWriter, ParquetWriter,
+    export_articles, export_to_csv, merge_exports, shard_ranges
+)
+
+
+def article(i, dim=4):
+    return {
+        '_id': hashlib.md5(f"https://example.com/{i}".encode()).hexdigest(),
+        'url': f"https://example.com/{i}",
+        'title': f"Article {i} — café \"quoted\", with comma",
+        'source': "Example",
+        'published_at': datetime(2024, 1, 1, 12, i % 60),
+        'categories': ["Technology", "Science"],
+        'keywords': [f"kw{k}" for k in range(12)],
+        'category_scores': {"Technology": 0.9, "Science": 0.4},
+        'sentiment': "positive",
+        'sentiment_confidence': 0.8,
+        'embedding': [float(i + k) for k in range(dim)],
+    }
+
+
+def as_json(a):
+    """An article as the JSON writers export it: no embedding, ISO dates."""
+    row = {k: v for k, v in a.items() if k != 'embedding'}
+    row['published_at'] = row['published_at'].isoformat()
+    return row
+
+
+ARTICLES = [article(i) for i in range(7)]
+
+
+@pytest.fixture
+def pyarrow():
+    return pytest.importorskip("pyarrow")
+
+
+def test_ndjson_writes_one_document_per_line(tmp_path):
+    path = str(tmp_path / "out.ndjson")
+    assert export_articles(ARTICLES, path, 'ndjson', chunk_size=3) == len(ARTICLES)
+
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert [json.loads(line) for line in lines] == [as_json(a) for a in ARTICLES]
+
+
+@pytest.mark.parametrize("pretty", [True, False])
+def test_json_array_is_valid_json(tmp_path, pretty):
+    path = str(tmp_path / "out.json")
+    export_articles(ARTICLES, path, 'json', chunk_size=3, pretty=pretty)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == [as_json(a) for a in ARTICLES]
+
+    empty = str(tmp_path / "empty.json")
+    assert export_articles([], empty, 'json', pretty=pretty) == 0
+    with open(empty, encoding='utf-8') as f:
+        assert json.load(f) == []
+
+
+def test_csv_joins_lists_and_writes_header(tmp_path):
+    path = str(tmp_path / "out.csv")
+    assert export_to_csv(iter(ARTICLES), path) == len(ARTICLES)
+
+    with open(path, encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+    assert reader.fieldnames == CSVWriter(path).columns
+    assert len(rows) == len(ARTICLES)
+    first = rows[0]
+    assert first['title'] == ARTICLES[0]['title']
+    assert first['categories'] == "Technology, Science"
+    assert first['keywords'] == ", ".join(f"kw{k}" for k in range(10))
+    assert first['published_at'] == str(ARTICLES[0]['published_at'])
+
+
+def test_csv_without_articles_creates_no_file(tmp_path):
+    path = tmp_path / "none.csv"
+    assert export_to_csv([], str(path)) == 0
+    assert not path.exists()
+
+
+def test_parquet_schema_and_row_groups(tmp_path, pyarrow):
+    import pyarrow.parquet as pq
+
+    path = str(tmp_path / "out.parquet")
+    assert export_articles(ARTICLES, path, 'parquet', chunk_size=3) == len(ARTICLES)
+
+    pf = pq.ParquetFile(path)
+    assert pf.num_row_groups == 3
+    schema = pf.schema_arrow
+    assert schema.field('embedding').type == pyarrow.list_(pyarrow.float32(), 4)
+    assert schema.field('categories').type == pyarrow.list_(pyarrow.string())
+
+    table = pf.read()
+    assert table.column('_id').to_pylist() == [a['_id'] for a in ARTICLES]
+    assert table.column('embedding').to_pylist() == [a['embedding'] for a in ARTICLES]
+    assert table.column('embedding_dim').to_pylist() == [4] * len(ARTICLES)
+    assert table.column('published_at').to_pylist()[0] == ARTICLES[0]['published_at'].isoformat()
+    assert dict(table.column('category_scores').to_pylist()[0]) == ARTICLES[0]['category_scores']
+
+
+def test_parquet_empty_export_keeps_schema(tmp_path, pyarrow):
+    import pyarrow.parquet as pq
+
+    path = str(tmp_path / "empty.parquet")
+    assert export_articles([], path, 'parquet', embedding_dim=8) == 0
+    table = pq.read_table(path)
+    assert table.num_rows == 0
+    assert table.schema.field('embedding').type == pyarrow.list_(pyarrow.float32(), 8)
+
+
+def test_parquet_writer_must_be_open(tmp_path, pyarrow):
+    writer = ParquetWriter(str(tmp_path / "out.parquet"))
+    with pytest.raises(ValueError):
+        writer.write(ARTICLES[0])
+    writer.close()  # closing an unopened writer is a no-op
+
+    with writer:
+        writer.write(ARTICLES[0])
+    writer.close()  # and so is closing twice
+    with pytest.raises(ValueError):
+        writer.write(ARTICLES[1])
+
+
+@pytest.mark.parametrize("shards", [1, 2, 3, 7, 16, 100])
+def test_shard_ranges_cover_id_space_without_gaps(shards):
+    ranges = shard_ranges(shards)
+    assert len(ranges) == shards
+    assert ranges[0][0] is None and ranges[-1][1] is None
+    for (_, upper), (lower, _) in zip(ranges, ranges[1:]):
+        assert upper == lower
+    bounds = [lower for lower, _ in ranges[1:]]
+    assert bounds == sorted(set(bounds))
+    assert all(len(b) == 8 and int(b, 16) > 0 for b in bounds)
+
+    ids = ['0' * 32, 'f' * 32] + [b + '0' * 24 for b in bounds] + [a['_id'] for a in ARTICLES]
+    for _id in ids:
+        owners = [
+            (lower, upper) for lower, upper in ranges
+            if (lower is None or _id >= lower) and (upper is None or _id < upper)
+        ]
+        assert len(owners) == 1, f"{_id} falls in {len(owners)} shards"
+
+
+def write_shards(tmp_path, writer_cls, splits, **options):
+    """Write ARTICLES in _id order split at `splits`, one part file per shard."""
+    ordered = sorted(ARTICLES, key=lambda a: a['_id'])
+    edges = [0] + list(splits) + [len(ordered)]
+    parts = []
+    for i, (start, end) in enumerate(zip(edges, edges[1:])):
+        part = str(tmp_path / f"part{i}.{writer_cls.extension}")
+        with writer_cls(part, chunk_size=2, **options) as writer:
+            writer.write_all(ordered[start:end])
+        parts.append(part)
+    single = str(tmp_path / f"single.{writer_cls.extension}")
+    with writer_cls(single, chunk_size=2, **options) as writer:
+        writer.write_all(ordered)
+    return parts, single
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("pretty", [True, False])
+@pytest.mark.parametrize("splits", [(3,), (0, 3, 3), (2, 5, 7)])
+def test_merged_json_array_matches_single_process(tmp_path, pretty, splits):
+    """Sharded parts (empty ones included) merge into exactly the single-writer output."""
+    parts, single = write_shards(tmp_path, JSONArrayWriter, splits, pretty=pretty)
+    merged = str(tmp_path / "merged.json")
+    merge_exports(parts, merged, 'json', pretty=pretty)
+
+    with open(merged, encoding='utf-8') as f:
+        assert json.load(f) == json.loads(read_bytes(single))
+    assert read_bytes(merged) == read_bytes(single)
+
+
+@pytest.mark.parametrize("pretty", [True, False])
+def test_merged_json_array_of_empty_parts(tmp_path, pretty):
+    parts, _ = write_shards(tmp_path, JSONArrayWriter, (0, 0), pretty=pretty)
+    parts = parts[:2]
+    merged = str(tmp_path / "merged.json")
+    merge_exports(parts, merged, 'json', pretty=pretty)
+    with open(merged, encoding='utf-8') as f:
+        assert json.load(f) == []
+
+
+@pytest.mark.parametrize("writer_cls, format", [(NDJSONWriter, 'ndjson'), (CSVWriter, 'csv')])
+def test_merged_text_matches_single_process(tmp_path, writer_cls, format):
+    parts, single = write_shards(tmp_path, writer_cls, (2, 2, 5))
+    merged = str(tmp_path / f"merged.{format}")
+    merge_exports(parts, merged, format)
+    assert read_bytes(merged) == read_bytes(single)
+    assert not any((tmp_path / part).exists() for part in parts)
+
+
+def test_merged_parquet_keeps_every_row_group(tmp_path, pyarrow):
+    import pyarrow.parquet as pq
+
+    parts, single = write_shards(tmp_path, ParquetWriter, (3,), embedding_dim=4)
+    merged = str(tmp_path / "merged.parquet")
+    merge_exports(parts, merged, 'parquet')
+    assert pq.read_table(merged).equals(pq.read_table(single))
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
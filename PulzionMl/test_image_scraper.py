@@ -0,0 +1,210 @@
+"""
+Test script for the image scraper's streaming page scan (image_scraper.py).
+Pages are served in chosen chunks by a stand-in aiohttp session, so chunk
+boundaries (e.g. inside a multi-byte UTF-8 character) are exact and no
+network is needed:
+
+    pip install -r requirements-dev.txt
+    python test_image_scraper.py
+"""
+
+import asyncio
+import sys
+from unittest import mock
+
+import pytest
+
+import image_scraper
+from image_scraper import MetaImageParser, fetch_best_image
+from scrape_cache import STATUS_ERROR, STATUS_FOUND, STATUS_NO_IMAGE, STATUS_NOT_MODIFIED
+
+URL = "https://news.example.com/world/story.html"
+
+
+class FakeContent:
+    """Streams preset chunks; records how many bytes the scraper pulled."""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.position = 0
+        self.read = 0
+
+    async def iter_chunked(self, size):
+        while self.position < len(self.chunks):
+            chunk = self.chunks[self.position]
+            self.position += 1
+            self.read += len(chunk)
+            yield chunk
+
+    def at_eof(self):
+        return self.position >= len(self.chunks)
+
+
+class FakeResponse:
+    def __init__(self, chunks, status=200, charset="utf-8", headers=None):
+        self.status = status
+        self.charset = charset
+        self.headers = headers or {}
+        self.content = FakeContent(chunks)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append((url, kwargs))
+        return self.response
+
+
+def split(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def scrape(chunks, **response_options):
+    response = FakeResponse(chunks, **response_options)
+    result = asyncio.run(fetch_best_image(URL, FakeSession(response)))
+    return result, response.content
+
+
+def page(head: str, body: str = "") -> bytes:
+    return f"<html><head><title>Story</title>{head}</head><body>{body}</body></html>".encode("utf-8")
+
+
+# ----- MetaImageParser -----
+def test_parser_prefers_og_image_in_any_chunking():
+    html = (
+        '<html><head>'
+        '<meta itemprop="image" content="/item.jpg">'
+        '<meta name="twitter:image" content="/twitter.jpg">'
+        '<meta property="og:image" content="/og.jpg">'
+        '</head><body><img src="/body.jpg"></body></html>'
+    )
+    for cut in range(1, len(html)):
+        parser = MetaImageParser()
+        parser.feed(html[:cut])
+        parser.feed(html[cut:])
+        assert parser.best_meta() == "/og.jpg", f"split at {cut}"
+
+    parser = MetaImageParser()
+    for char in html:
+        parser.feed(char)
+    assert parser.best_meta() == "/og.jpg" and parser.first_img == "/body.jpg"
+
+
+def test_parser_is_done_at_end_of_head():
+    parser = MetaImageParser()
+    parser.feed('<html><head><meta name="twitter:image" content="/t.jpg">')
+    assert not parser.is_done()  # an og:image may still follow
+    parser.feed("</he")
+    assert not parser.is_done()
+    parser.feed("ad>")
+    assert parser.head_done and parser.is_done()
+
+    empty = MetaImageParser()
+    empty.feed("<html><head></head><body><p>text")
+    assert empty.head_done and not empty.is_done()  # keep reading for a first <img>
+    empty.feed('<img src="/first.jpg"><img src="/second.jpg">')
+    assert empty.is_done() and empty.first_img == "/first.jpg"
+
+
+# ----- fetch_best_image -----
+def test_stops_reading_at_end_of_head():
+    head = '<meta name="twitter:image" content="/img/t.jpg">'
+    body = '<img src="/img/body.jpg">' + "<p>filler</p>" * 20000
+    data = page(head, body)
+    result, content = scrape(split(data, 100))
+
+    assert result["status"] == STATUS_FOUND
+    assert result["image_url"] == "https://news.example.com/img/t.jpg"
+    head_end = data.index(b"</head>") + len(b"</head>")
+    assert content.read < head_end + 100, f"read {content.read} of {len(data)} bytes"
+
+
+def test_og_image_stops_before_end_of_head():
+    data = page('<meta property="og:image" content="https://cdn.example.com/og.jpg">' + "<link>" * 5000)
+    result, content = scrape(split(data, 64))
+    assert result["image_url"] == "https://cdn.example.com/og.jpg"
+    assert content.read < 200
+
+
+def test_multibyte_utf8_split_across_chunks():
+    image = "https://cdn.example.com/fotos/café-ñandú-東京.jpg"
+    data = page(f'<meta property="og:image" content="{image}">')
+    start = data.index("é".encode("utf-8"))
+    for cut in range(start - 2, len(data)):
+        result, _ = scrape([data[:cut], data[cut:]])
+        assert result["image_url"] == image, f"split at byte {cut}"
+
+    result, _ = scrape(split(data, 1))
+    assert result["image_url"] == image
+
+
+def test_declared_charset_is_used():
+    data = page('<meta property="og:image" content="/café.jpg">').decode("utf-8").encode("iso-8859-1")
+    result, _ = scrape(split(data, 7), charset="iso-8859-1")
+    assert result["image_url"] == "https://news.example.com/café.jpg"
+
+    result, _ = scrape(split(data.replace(b"\xe9", b"e"), 7), charset="no-such-charset")
+    assert result["image_url"] == "https://news.example.com/cafe.jpg"
+
+
+def test_head_byte_cap_falls_back_to_full_parse(monkeypatch):
+    """A scan that hits HEAD_BYTE_CAP without a result reads up to BODY_BYTE_CAP and parses it whole."""
+    monkeypatch.setattr(image_scraper, "HEAD_BYTE_CAP", 2048)
+    monkeypatch.setattr(image_scraper, "BODY_BYTE_CAP", 8192)
+    filler = "<script>var x = 1;</script>" * 200  # ~5 KB, past the head cap
+    data = page(filler + '<meta property="og:image" content="/late.jpg">', "<p>body</p>" * 5000)
+
+    with mock.patch.object(image_scraper, "_full_parse_best_image",
+                           wraps=image_scraper._full_parse_best_image) as full_parse:
+        result, content = scrape(split(data, 512))
+    assert result["image_url"] == "https://news.example.com/late.jpg"
+    assert full_parse.call_count == 1
+    assert 2048 <= content.read <= 8192 + 512
+
+    # Tags past BODY_BYTE_CAP are not found, and reading stops at the cap
+    far = page("<script></script>" * 1000 + '<meta property="og:image" content="/far.jpg">')
+    result, content = scrape(split(far, 512))
+    assert result["status"] == STATUS_NO_IMAGE and result["image_url"] is None
+    assert content.read <= 8192 + 512
+
+
+def test_no_fallback_for_short_pages():
+    with mock.patch.object(image_scraper, "_full_parse_best_image") as full_parse:
+        result, content = scrape(split(page("", "<p>no images here</p>"), 16))
+    assert result["status"] == STATUS_NO_IMAGE
+    assert full_parse.call_count == 0
+    assert content.at_eof()
+
+
+def test_http_outcomes():
+    result, _ = scrape([], status=304)
+    assert result["status"] == STATUS_NOT_MODIFIED and result["http_status"] == 304
+
+    result, _ = scrape([], status=404)
+    assert result["status"] == STATUS_ERROR and result["http_status"] == 404
+
+    headers = {"ETag": '"v2"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    result, _ = scrape([page('<meta property="og:image" content="/a.jpg">')], headers=headers)
+    assert result["etag"] == '"v2"' and result["last_modified"] == headers["Last-Modified"]
+
+
+def test_connection_error_is_an_error_result():
+    class BrokenSession:
+        def get(self, url, **kwargs):
+            raise OSError("connection reset")
+
+    result = asyncio.run(fetch_best_image(URL, BrokenSession()))
+    assert result["status"] == STATUS_ERROR and result["image_url"] is None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
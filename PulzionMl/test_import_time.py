@@ -0,0 +1,85 @@
+"""
+Test script to verify lightweight commands start quickly.
+Each module is imported in a fresh interpreter; the import must stay under
+the time budget and must not pull in the heavy ML libraries, which are
+only loaded when a model is actually created.
+"""
+
+import os
+import subprocess
+import sys
+
+IMPORT_BUDGET_SECONDS = 1.0
+
+MODULES = [
+    "config",
+    "storage",
+    "export_data",
+    "search_articles",
+    "labeling",
+    "embeddings",
+    "analyzer",
+    "main",
+    "stream_worker",
+    "scheduler",
+]
+
+HEAVY_MODULES = ["torch", "transformers", "sentence_transformers", "keybert"]
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(f"{{elapsed:.3f}} {{','.join(heavy)}}")
+"""
+
+
+def measure_import(module: str):
+    """Import `module` in a fresh interpreter. Returns (seconds, heavy modules loaded)."""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip()}")
+    seconds, _, heavy = result.stdout.strip().splitlines()[-1].partition(" ")
+    return float(seconds), [name for name in heavy.split(",") if name]
+
+
+def test_import_time():
+    """Every module imports within budget and without heavy ML libraries."""
+    print(f"Import budget: {IMPORT_BUDGET_SECONDS:.1f}s per module")
+    print()
+
+    failures = []
+    for module in MODULES:
+        seconds, heavy = measure_import(module)
+        ok = seconds < IMPORT_BUDGET_SECONDS and not heavy
+        print(f"   {'✓' if ok else '✗'} {module:<18} {seconds:>6.3f}s" + (f"  (loaded {', '.join(heavy)})" if heavy else ""))
+        if not ok:
+            failures.append(module)
+
+    print()
+    assert not failures, f"Slow or heavy imports: {', '.join(failures)}"
+    print("✅ All modules import quickly without loading ML libraries!")
+
+
+def test_main_import_leaves_logging_alone():
+    """Importing main (as scheduler and stream_worker do) adds no log handlers."""
+    result = subprocess.run(
+        [sys.executable, "-c", "import logging, main; print(len(logging.getLogger().handlers))"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "0"
+
+
+if __name__ == "__main__":
+    test_import_time()
+    test_main_import_leaves_logging_alone()
@@ -0,0 +1,62 @@
+"""
+Test script for multi-process inference (inference_pool.py), with a
+trivial stand-in model so no real model is loaded:
+
+    python test_inference_pool.py
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+from inference_pool import InferenceExecutor
+from storage import STAGE_EMBED
+
+
+class EchoEmbedder:
+    """Embeds each article as [its number, worker pid]."""
+
+    def generate_embeddings_batch(self, articles, batch_size=32, show_progress=False, batch_callback=None):
+        for article in articles:
+            article['embedding'] = [int(article['title'].split()[-1]), os.getpid()]
+            article['embedding_dim'] = 2
+        return articles
+
+
+def echo_factory(stage, load_seconds=0.0):
+    time.sleep(load_seconds)
+    return EchoEmbedder()
+
+
+def test_map_returns_results_in_input_order_and_warm_up_sees_every_worker():
+    articles = [{'_id': f"a{i}", 'title': f"Article {i}", 'content': "text", 'extra': i} for i in range(50)]
+    batches = []
+    with InferenceExecutor(STAGE_EMBED, workers=3, threads_per_worker=1, factory=echo_factory) as executor:
+        pids = executor.warm_up(timeout=60)
+        assert len(pids) == 3 and os.getpid() not in pids
+
+        processed = executor.map(articles, task_size=4, batch_callback=lambda batch: batches.append(batch))
+
+    assert [article['embedding'][0] for article in processed] == list(range(50))
+    assert {article['embedding'][1] for article in processed} <= pids
+    assert all(article['extra'] == i and article['embedding_dim'] == 2 for i, article in enumerate(processed))
+    assert 'embedding' not in articles[0]                       # inputs are not modified
+    assert [[article['_id'] for article in batch] for batch in batches] == [
+        [f"a{i}" for i in range(start, min(start + 4, 50))] for start in range(0, 50, 4)
+    ]
+
+
+def test_warm_up_times_out_while_models_load():
+    with InferenceExecutor(
+        STAGE_EMBED, workers=2, threads_per_worker=1, factory=echo_factory, load_seconds=3
+    ) as executor:
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            executor.warm_up(timeout=0.5)
+        assert time.monotonic() - started < 2
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
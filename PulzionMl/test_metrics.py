@@ -0,0 +1,84 @@
+"""
+Test script for the metrics module (metrics.py): exact text exposition
+output for each metric type, on a private registry.
+
+    python test_metrics.py
+"""
+
+import sys
+
+import pytest
+
+import metrics
+from metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_renders_total_and_escapes_labels():
+    registry = Registry()
+    counter = Counter("jobs", 'Jobs run, by "kind"\nper worker \\ host', ["kind"], registry=registry)
+    counter.labels(kind='say "hi"\\now\n').inc(2)
+    counter.labels("plain").inc()
+    assert registry.render() == (
+        '# HELP jobs Jobs run, by "kind"\\nper worker \\\\ host\n'
+        '# TYPE jobs counter\n'
+        'jobs_total{kind="say \\"hi\\"\\\\now\\n"} 2.0\n'
+        'jobs_total{kind="plain"} 1.0\n'
+    )
+
+
+def test_gauge_renders_current_value():
+    registry = Registry()
+    gauge = Gauge("queue_depth", "Items waiting", registry=registry)
+    gauge.set(5)
+    gauge.dec(2)
+    with gauge.track_inprogress():
+        assert "queue_depth 4.0\n" in registry.render()
+    assert registry.render() == (
+        "# HELP queue_depth Items waiting\n"
+        "# TYPE queue_depth gauge\n"
+        "queue_depth 3.0\n"
+    )
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = Registry()
+    histogram = Histogram("latency", "Request latency", ["endpoint"], buckets=(2.5, 1, float("inf")), registry=registry)
+    child = histogram.labels(endpoint="search")
+    for value in (0.5, 1, 2, 10):
+        child.observe(value)
+    assert registry.render() == (
+        "# HELP latency Request latency\n"
+        "# TYPE latency histogram\n"
+        'latency_bucket{endpoint="search",le="1.0"} 2.0\n'
+        'latency_bucket{endpoint="search",le="2.5"} 3.0\n'
+        'latency_bucket{endpoint="search",le="+Inf"} 4.0\n'
+        'latency_sum{endpoint="search"} 13.5\n'
+        'latency_count{endpoint="search"} 4.0\n'
+    )
+
+
+def test_labels_are_checked():
+    counter = Counter("checked", "Checked labels", ["stage"], registry=None)
+    with pytest.raises(ValueError):
+        counter.inc()
+    with pytest.raises(ValueError):
+        counter.labels(other="x")
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+    with pytest.raises(ValueError):
+        counter.labels("a").inc(-1)
+
+
+def test_metric_types_must_define_children():
+    with pytest.raises(TypeError):
+        metrics._Metric("base", "Abstract base", registry=None)
+
+    class Untyped(metrics._Metric):
+        pass
+
+    with pytest.raises(TypeError):
+        Untyped("untyped", "No child type", registry=None)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
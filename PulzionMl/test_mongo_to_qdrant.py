@@ -0,0 +1,200 @@
+"""
+Test script for the MongoDB → Qdrant migration helpers (mongo_to_qdrant.py).
+Uploads go to an in-memory fake store and lazy fields are read from a
+mongomock collection, so no Qdrant or MongoDB server is needed (fixtures
+in conftest.py):
+
+    pip install -r requirements-dev.txt
+    python test_mongo_to_qdrant.py
+"""
+
+import hashlib
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+
+import mongo_to_qdrant
+from mongo_to_qdrant import (
+    LAZY_FIELDS, SLIM_PAYLOAD_FIELDS, PipelinedUploader,
+    build_payload, build_projection, fetch_lazy_fields, get_payload_fields, to_mongo_id
+)
+from vector_store import VectorStore
+
+
+class FakeStore(VectorStore):
+    """
+    Records upserted batches. Batches whose first point id is in `fail`
+    raise that error; each upsert holds for `delay` seconds.
+    """
+
+    def __init__(self, fail=None, delay=0.0):
+        self.fail = fail or {}
+        self.delay = delay
+        self.batches = []
+        self.attempts = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def recreate_collection(self, vector_size, payload_indexes=None):
+        pass
+
+    def upsert(self, points, wait=True):
+        with self._lock:
+            self.attempts += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            error = self.fail.get(points[0]["id"])
+            if error is not None:
+                raise error
+            with self._lock:
+                self.batches.append(points)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def search(self, vector, limit=10, filters=None):
+        return []
+
+    def count(self):
+        return sum(len(batch) for batch in self.batches)
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(mongo_to_qdrant, "RETRY_DELAY", 0)
+
+
+def batches(count, size=3):
+    return [[{"id": f"b{i}-{j}", "vector": [0.0], "payload": {}} for j in range(size)] for i in range(count)]
+
+
+def test_uploader_uploads_every_batch_concurrently():
+    store = FakeStore(delay=0.02)
+    reported = []
+    with PipelinedUploader(store, parallelism=4, queue_size=2, on_uploaded=reported.append) as uploader:
+        for batch in batches(12):
+            uploader.submit(batch)
+
+    assert uploader.uploaded == 36 and store.count() == 36
+    assert sum(reported) == 36
+    assert 1 < store.peak <= 4
+    assert not any(worker.is_alive() for worker in uploader._workers)
+
+
+def test_uploader_raises_first_error_and_skips_the_rest():
+    first, later = RuntimeError("first"), RuntimeError("later")
+    store = FakeStore(fail={"b1-0": first, "b3-0": later})
+    uploader = PipelinedUploader(store, parallelism=1, queue_size=10)
+    with pytest.raises(RuntimeError) as raised:
+        with uploader:
+            for batch in batches(5):
+                uploader.submit(batch)
+
+    assert raised.value is first
+    # Batch 1 was retried three times; nothing after it was uploaded
+    assert store.attempts == 1 + 3
+    assert [batch[0]["id"] for batch in store.batches] == ["b0-0"]
+    assert uploader.uploaded == 3
+
+
+def test_uploader_drains_queue_after_failure():
+    """A failed upload never leaves the producer blocked on a full queue."""
+    error = RuntimeError("qdrant down")
+    store = FakeStore(fail={f"b{i}-0": error for i in range(100)})
+    uploader = PipelinedUploader(store, parallelism=2, queue_size=1)
+    outcome = []
+
+    def produce():
+        try:
+            with uploader:
+                for batch in batches(100):
+                    uploader.submit(batch)
+        except RuntimeError as e:
+            outcome.append(e)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    producer.join(timeout=10)
+    assert not producer.is_alive(), "producer blocked after an upload failure"
+    assert outcome == [error]
+    assert store.batches == [] and uploader.uploaded == 0
+    assert not any(worker.is_alive() for worker in uploader._workers)
+
+
+def test_projection_for_each_schema(monkeypatch):
+    assert get_payload_fields("full") is None
+    assert build_projection(get_payload_fields("full")) is None
+
+    slim = build_projection(get_payload_fields("slim"))
+    assert slim == {**{field: 1 for field in SLIM_PAYLOAD_FIELDS}, "embedding": 1}
+    assert not set(LAZY_FIELDS) & set(slim)
+
+    monkeypatch.setattr(mongo_to_qdrant, "PAYLOAD_FIELDS_OVERRIDE", ["title", "url"])
+    assert get_payload_fields("slim") == ["title", "url"]
+    assert build_projection(get_payload_fields("slim")) == {"title": 1, "url": 1, "embedding": 1}
+    assert get_payload_fields("full") is None  # the override only applies to slim payloads
+
+    with pytest.raises(ValueError):
+        get_payload_fields("tiny")
+
+
+def test_payload_for_each_schema():
+    article = {
+        "_id": "abc123",
+        "title": "Title",
+        "content": "Long body",
+        "published_at": datetime(2024, 1, 2, 3, 4, 5),
+        "embedding": [0.1, 0.2],
+    }
+    full = build_payload(article)
+    assert full == {
+        "_id": "abc123",
+        "title": "Title",
+        "content": "Long body",
+        "published_at": "2024-01-02T03:04:05",
+    }
+
+    slim = build_payload(article, ["title", "published_at", "author", "embedding"])
+    assert slim == {"_id": "abc123", "title": "Title", "published_at": "2024-01-02T03:04:05"}
+
+
+def url_hash(url):
+    return hashlib.md5(url.encode()).hexdigest()
+
+
+def test_fetch_lazy_fields_by_point_id(mongo_db):
+    collection = mongo_db["articles"]
+    ids = [url_hash(f"https://example.com/{i}") for i in range(3)]
+    collection.insert_many([
+        {"_id": _id, "title": f"Article {i}", "content": f"Body {i}", "sentiment_scores": {"positive": 0.9}}
+        for i, _id in enumerate(ids)
+    ])
+    point_ids = [str(uuid.UUID(ids[0])), ids[1], str(uuid.UUID(url_hash("https://example.com/missing")))]
+
+    lazy = fetch_lazy_fields(collection, point_ids)
+    assert set(lazy) == set(point_ids[:2])  # keyed by the ids as given; unknown ids are left out
+    assert lazy[point_ids[0]] == {"content": "Body 0", "sentiment_scores": {"positive": 0.9}}
+    assert lazy[point_ids[1]]["content"] == "Body 1"
+
+    assert fetch_lazy_fields(collection, point_ids[:1], ["title"]) == {point_ids[0]: {"title": "Article 0"}}
+    assert fetch_lazy_fields(collection, []) == {}
+
+
+def test_to_mongo_id():
+    hex_id = url_hash("https://example.com/a")
+    assert to_mongo_id(str(uuid.UUID(hex_id))) == hex_id
+    assert to_mongo_id(uuid.UUID(hex_id)) == hex_id
+    assert to_mongo_id(hex_id) == hex_id
+    assert to_mongo_id("p1") == "p1"
+    assert to_mongo_id(42) == "42"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
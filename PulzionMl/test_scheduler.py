@@ -0,0 +1,160 @@
+"""
+Test script for the adaptive topic schedule (scheduler.TopicScheduler)
+and the daemon's polling (scheduler.PipelineDaemon.poll).
+Runs against an in-memory mongomock database (fixtures in conftest.py):
+
+    pip install -r requirements-dev.txt
+    python test_scheduler.py
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+import config
+from scheduler import PipelineDaemon, TopicScheduler
+
+# New topics are due from their creation time (utcnow), so simulated polls
+# start from the time the module is loaded
+START = datetime.utcnow().replace(microsecond=0)
+
+
+def make_scheduler(db, topics=("hot", "cold")):
+    return TopicScheduler(db, list(topics), min_interval=10, max_interval=1440, target_new=20, smoothing=0.3)
+
+
+def poll(scheduler, topic, minutes, fetched, new):
+    """Record a poll `minutes` after START."""
+    return scheduler.record(topic, fetched, new, now=START + timedelta(minutes=minutes))
+
+
+def test_new_topics_are_due_immediately(mongo_db):
+    scheduler = make_scheduler(mongo_db)
+    assert set(scheduler.due()) == {"hot", "cold"}
+
+
+def test_interval_follows_arrival_rate(mongo_db):
+    """A busy topic is polled often, a topic with no news backs off towards the cap."""
+    scheduler = make_scheduler(mongo_db)
+    poll(scheduler, "hot", 0, 20, 20)
+    poll(scheduler, "cold", 0, 5, 5)
+
+    # One hour later: 60 new/h for hot, nothing for cold
+    hot = poll(scheduler, "hot", 60, 60, 60)
+    cold = poll(scheduler, "cold", 60, 5, 0)
+    assert hot['rate'] == pytest.approx(60)
+    assert hot['interval_minutes'] == pytest.approx(20)   # 20 articles / 60 per hour
+    assert cold['rate'] == 0
+    assert cold['interval_minutes'] == 1440
+
+
+def test_quiet_poll_doubles_and_saturated_poll_halves(mongo_db):
+    scheduler = make_scheduler(mongo_db)
+    poll(scheduler, "hot", 0, 10, 10)
+    first = poll(scheduler, "hot", 60, 60, 60)          # 60/h -> 20 min
+    quiet = poll(scheduler, "hot", 80, 0, 0)            # nothing new: at least double
+    assert quiet['interval_minutes'] >= 2 * first['interval_minutes']
+
+    full_page = config.MAX_ARTICLES_PER_TOPIC
+    saturated = poll(scheduler, "hot", 80 + quiet['interval_minutes'], full_page, full_page)
+    assert saturated['interval_minutes'] <= quiet['interval_minutes'] / 2
+
+
+def test_failed_fetch_keeps_rate_and_interval(mongo_db):
+    """Outages and quota exhaustion do not push healthy topics towards the cap."""
+    scheduler = make_scheduler(mongo_db)
+    poll(scheduler, "hot", 0, 10, 10)
+    healthy = poll(scheduler, "hot", 60, 60, 60)
+
+    now = START + timedelta(minutes=60)
+    for _ in range(6):
+        now += timedelta(minutes=healthy['interval_minutes'])
+        failed = scheduler.record_failure("hot", now=now)
+        assert failed['interval_minutes'] == healthy['interval_minutes']
+        assert failed['rate'] == healthy['rate']
+        assert failed['next_poll'] == now + timedelta(minutes=healthy['interval_minutes'])
+    assert failed['failures'] == 6
+    assert failed['last_polled'] == healthy['last_polled']
+
+
+def test_due_ranks_by_expected_new_articles(mongo_db):
+    scheduler = make_scheduler(mongo_db, ("hot", "warm", "cold", "fresh"))
+    for topic in ("hot", "warm", "cold"):
+        poll(scheduler, topic, 0, 1, 1)
+    poll(scheduler, "hot", 60, 120, 120)
+    poll(scheduler, "warm", 60, 10, 10)
+    poll(scheduler, "cold", 60, 1, 1)
+
+    later = START + timedelta(days=2)
+    assert scheduler.due(now=later) == ["fresh", "hot", "warm", "cold"]
+    assert scheduler.due(now=later, limit=2) == ["fresh", "hot"]
+    assert scheduler.due(now=START + timedelta(minutes=61)) == ["fresh"]
+    assert scheduler.next_wakeup() == scheduler.get("fresh")['next_poll']   # never polled
+
+
+def test_hot_topic_interval_shrinks_on_full_pages(mongo_db):
+    """Every poll returning a full page of unseen URLs halves the interval until the minimum."""
+    scheduler = make_scheduler(mongo_db)
+    poll(scheduler, "hot", 0, 5, 5)
+    minutes = 0
+    for _ in range(8):                                   # quiet start: backs off to the cap
+        minutes += scheduler.get("hot")['interval_minutes']
+        poll(scheduler, "hot", minutes, 0, 0)
+    assert scheduler.get("hot")['interval_minutes'] == 1440
+
+    full_page = config.MAX_ARTICLES_PER_TOPIC
+    intervals = [1440]
+    while intervals[-1] > scheduler.min_interval:
+        minutes += intervals[-1]
+        doc = poll(scheduler, "hot", minutes, full_page, full_page)
+        assert doc['interval_minutes'] <= intervals[-1] / 2 or doc['interval_minutes'] == scheduler.min_interval
+        intervals.append(doc['interval_minutes'])
+        assert len(intervals) < 12, f"interval not shrinking: {intervals}"
+
+
+class FakeFetcher:
+    """Returns a full page of never-seen URLs per topic and records how it was called."""
+
+    def __init__(self):
+        self.calls = []
+        self.resets = 0
+        self.served = 0
+
+    def reset_deduplication(self):
+        self.resets += 1
+
+    async def fetch_by_topic(self, topics, sort_by="relevancy", since=None):
+        self.calls.append({'topics': list(topics), 'sort_by': sort_by, 'since': dict(since or {})})
+        by_topic = {}
+        for topic in topics:
+            by_topic[topic] = [
+                {'_id': f"{topic}{self.served + i:06d}", 'url': f"https://example.com/{topic}/{self.served + i}",
+                 'title': f"{topic} {self.served + i}"}
+                for i in range(config.MAX_ARTICLES_PER_TOPIC)
+            ]
+            self.served += config.MAX_ARTICLES_PER_TOPIC
+        return by_topic
+
+
+def test_daemon_polls_newest_since_last_poll_with_one_fetcher(storage):
+    """Polls reuse the fetcher (dedup reset per cycle) and ask for articles published since the last poll."""
+    fetcher = FakeFetcher()
+    daemon = PipelineDaemon(
+        storage, topics=["hot"], skip_labeling=True, skip_embeddings=True, skip_analysis=True, fetcher=fetcher
+    )
+
+    assert asyncio.run(daemon.poll(["hot"])) == config.MAX_ARTICLES_PER_TOPIC
+    first_polled = daemon.scheduler.get("hot")['last_polled']
+    assert asyncio.run(daemon.poll(["hot"])) == config.MAX_ARTICLES_PER_TOPIC
+
+    assert daemon.fetcher is fetcher and fetcher.resets == 2
+    assert [call['sort_by'] for call in fetcher.calls] == ["publishedAt", "publishedAt"]
+    assert fetcher.calls[0]['since'] == {"hot": None}
+    assert fetcher.calls[1]['since'] == {"hot": first_polled}
+    assert daemon.stats['new'] == 2 * config.MAX_ARTICLES_PER_TOPIC
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,119 @@
+"""
+Test script for the image scraper's result cache (scrape_cache.py).
+Runs against an in-memory mongomock database (fixtures in conftest.py):
+
+    pip install -r requirements-dev.txt
+    python test_scrape_cache.py
+"""
+
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from scrape_cache import (
+    DOMAIN_BLOCK_TTL, MAX_NEGATIVE_TTL, NO_IMAGE_TTL, ERROR_TTL,
+    ScrapeCache, STATUS_ERROR, STATUS_FOUND, STATUS_NO_IMAGE, STATUS_NOT_MODIFIED
+)
+
+
+def test_negative_ttl_backs_off_and_is_capped(mongo_db):
+    cache = ScrapeCache(mongo_db)
+    url = "https://example.com/a"
+    entry = None
+    ttls = []
+    for _ in range(6):
+        entry = cache.record(url, {"status": STATUS_NO_IMAGE}, previous=entry)
+        ttls.append(entry["expires_at"] - entry["checked_at"])
+    assert ttls[:3] == [NO_IMAGE_TTL, NO_IMAGE_TTL * 2, NO_IMAGE_TTL * 4]
+    assert ttls[-1] == MAX_NEGATIVE_TTL
+    assert entry["failures"] == 6
+
+    error = cache.record("https://example.com/b", {"status": STATUS_ERROR})
+    assert error["expires_at"] - error["checked_at"] == ERROR_TTL
+
+    found = cache.record(url, {"status": STATUS_FOUND, "image_url": "https://example.com/a.jpg"}, previous=entry)
+    assert found["failures"] == 0 and found["expires_at"] is None
+
+
+def test_should_skip_until_negative_entry_expires(mongo_db):
+    cache = ScrapeCache(mongo_db)
+    url = "https://example.com/a"
+    entry = cache.record(url, {"status": STATUS_ERROR})
+    assert cache.should_skip(url, entry) == (True, "negative")
+    assert cache.should_skip(url, entry, now=entry["expires_at"] + timedelta(seconds=1)) == (False, "")
+
+    found = cache.record(url, {"status": STATUS_FOUND, "image_url": "https://example.com/a.jpg"})
+    assert cache.should_skip(url, found) == (False, "")
+
+
+def test_not_modified_keeps_previous_outcome(mongo_db):
+    cache = ScrapeCache(mongo_db)
+    url = "https://example.com/a"
+    previous = cache.record(url, {"status": STATUS_FOUND, "image_url": "https://example.com/a.jpg", "etag": '"v1"'})
+    entry = cache.record(url, {"status": STATUS_NOT_MODIFIED}, previous=previous)
+    assert entry["status"] == STATUS_FOUND
+    assert entry["image_url"] == "https://example.com/a.jpg"
+    assert ScrapeCache.conditional_headers(entry) == {"If-None-Match": '"v1"'}
+
+
+def test_domain_blocked_only_by_pages_without_images(mongo_db):
+    """Transient errors never block a host; imageless pages do, until the block expires."""
+    cache = ScrapeCache(mongo_db, domain_min_attempts=5)
+    for i in range(20):
+        cache.record(f"https://flaky.com/{i}", {"status": STATUS_ERROR})
+    assert not cache.domain_blocked("flaky.com")
+
+    for i in range(5):
+        cache.record(f"https://www.noimages.com/{i}", {"status": STATUS_NO_IMAGE})
+    assert cache.domain_blocked("noimages.com")
+    assert cache.should_skip("https://noimages.com/new", None) == (True, "domain")
+    later = datetime.utcnow() + DOMAIN_BLOCK_TTL + timedelta(minutes=1)
+    assert not cache.domain_blocked("noimages.com", now=later)
+
+    cache.record("https://noimages.com/6", {"status": STATUS_FOUND, "image_url": "https://noimages.com/6.jpg"})
+    assert not cache.domain_blocked("noimages.com")
+
+
+def test_flush_persists_entries_and_domain_counts(mongo_db):
+    db = mongo_db
+    cache = ScrapeCache(db)
+    cache.record("https://example.com/a", {"status": STATUS_FOUND, "image_url": "https://example.com/a.jpg"})
+    cache.record("https://example.com/b", {"status": STATUS_NO_IMAGE})
+    assert cache.flush() == 2
+    assert cache.pending_count == 0
+
+    reloaded = ScrapeCache(db)
+    assert set(reloaded.lookup(["https://example.com/a", "https://example.com/b"])) == {
+        "https://example.com/a", "https://example.com/b"
+    }
+    stats = reloaded.domain_stats["example.com"]
+    assert (stats["attempts"], stats["found"], stats["no_image"]) == (2, 1, 1)
+
+
+def test_concurrent_record_and_flush_lose_nothing(mongo_db):
+    """flush() in another thread (as image_scraper runs it) must not drop records."""
+    db = mongo_db
+    cache = ScrapeCache(db)
+    total = 500
+    done = threading.Event()
+
+    def flusher():
+        while not done.is_set():
+            cache.flush()
+
+    thread = threading.Thread(target=flusher)
+    thread.start()
+    for i in range(total):
+        cache.record(f"https://example.com/{i}", {"status": STATUS_NO_IMAGE})
+    done.set()
+    thread.join()
+    cache.flush()
+
+    assert db["image_scrape_cache"].count_documents({}) == total
+    assert db["image_scrape_domains"].find_one({"_id": "example.com"})["attempts"] == total
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
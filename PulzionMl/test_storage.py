@@ -0,0 +1,226 @@
+"""
+Test script for ArticleStorage (storage.py): change detection in
+save_articles, keyset pagination in get_articles_page and the
+processing-state backfill. Runs against an in-memory mongomock database (fixtures in
+conftest.py):
+
+    pip install -r requirements-dev.txt
+    python test_storage.py
+"""
+
+import sys
+from unittest import mock
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+from storage import PIPELINE_STAGES, STAGE_ANALYZE, STAGE_EMBED, STAGE_LABEL, content_hash
+
+
+def article(article_id="a1", **fields):
+    return {
+        '_id': article_id,
+        'url': f"https://example.com/{article_id}",
+        'title': "Original title",
+        'description': "Original description",
+        'content': "Original content",
+        'urlToImage': None,
+        **fields
+    }
+
+
+def mark_processed(storage, article_id="a1"):
+    """Simulate every stage having run on the article."""
+    storage.collection.update_one({'_id': article_id}, {'$set': {'pending_stages': [], 'categories': ['Technology']}})
+
+
+def test_new_article_is_inserted_with_every_stage_pending(storage):
+    result = storage.save_articles([article()])
+    assert result == {'inserted': 1, 'updated': 0, 'unchanged': 0, 'errors': 0}
+    doc = storage.collection.find_one({'_id': "a1"})
+    assert doc['title'] == "Original title"
+    assert doc['content_hash'] == content_hash(article())
+    assert doc['pending_stages'] == list(PIPELINE_STAGES)
+
+
+def test_unchanged_article_is_not_written(storage):
+    storage.save_articles([article()])
+    mark_processed(storage)
+    with mock.patch.object(storage.bulk_writer, 'write') as write:
+        result = storage.save_articles([article(fetched_at="later")])
+    write.assert_not_called()
+    assert result == {'inserted': 0, 'updated': 0, 'unchanged': 1, 'errors': 0}
+    assert storage.collection.find_one({'_id': "a1"})['pending_stages'] == []
+
+
+def test_changed_title_is_rewritten_and_repended_for_every_stage(storage):
+    storage.save_articles([article()])
+    mark_processed(storage)
+    changed = article(title="Corrected title", source="Other source")
+    result = storage.save_articles([changed])
+    assert result['updated'] == 1
+    doc = storage.collection.find_one({'_id': "a1"})
+    assert doc['title'] == "Corrected title"
+    assert doc['content_hash'] == content_hash(changed)
+    assert sorted(doc['pending_stages']) == sorted(PIPELINE_STAGES)
+    assert 'source' not in doc               # only the hashed text fields are rewritten
+    assert doc['categories'] == ['Technology']
+
+
+def test_legacy_article_gets_a_hash_without_being_repended(storage):
+    """Articles stored before content hashing are hashed in place, not reprocessed."""
+    storage.collection.insert_one({**article(), 'pending_stages': []})
+    result = storage.save_articles([article()])
+    assert result['updated'] == 1
+    doc = storage.collection.find_one({'_id': "a1"})
+    assert doc['content_hash'] == content_hash(article())
+    assert doc['pending_stages'] == []
+
+    # Even when the legacy text differs from the fetched one
+    storage.collection.insert_one({**article("a2", title="Old title"), 'pending_stages': []})
+    storage.save_articles([article("a2", title="New title")])
+    doc = storage.collection.find_one({'_id': "a2"})
+    assert doc['title'] == "New title"
+    assert doc['pending_stages'] == []
+
+
+def test_new_image_is_stored_without_repending(storage):
+    storage.save_articles([article()])
+    mark_processed(storage)
+    result = storage.save_articles([article(urlToImage="https://example.com/a1.jpg")])
+    assert result['updated'] == 1
+    doc = storage.collection.find_one({'_id': "a1"})
+    assert doc['urlToImage'] == "https://example.com/a1.jpg"
+    assert doc['pending_stages'] == []
+
+    # A fetch without an image does not erase the stored one
+    assert storage.save_articles([article()])['unchanged'] == 1
+    assert storage.collection.find_one({'_id': "a1"})['urlToImage'] == "https://example.com/a1.jpg"
+
+
+def test_batch_duplicates_and_missing_ids(storage):
+    """The last copy of an _id in a batch wins; articles without an _id are skipped."""
+    no_id = article()
+    del no_id['_id']
+    result = storage.save_articles([article(title="First"), no_id, article(title="Second")])
+    assert result == {'inserted': 1, 'updated': 0, 'unchanged': 0, 'errors': 0}
+    assert storage.collection.find_one({'_id': "a1"})['title'] == "Second"
+    assert storage.collection.count_documents({}) == 1
+
+
+def test_lookup_error_counts_every_article_as_failed(storage):
+    with mock.patch.object(storage.collection, 'find', side_effect=AutoReconnect("connection lost")):
+        result = storage.save_articles([article("a1"), article("a2")])
+    assert result == {'inserted': 0, 'updated': 0, 'unchanged': 0, 'errors': 2}
+    assert storage.save_articles([]) == {'inserted': 0, 'updated': 0, 'unchanged': 0, 'errors': 0}
+
+
+def seed_dated(storage):
+    """12 articles: 3 share each of 2 dates, 3 more have distinct dates, 3 have no date (null or missing)."""
+    docs = []
+    for i in range(12):
+        doc = {'_id': f"p{i:02d}", 'url': f"https://example.com/p/{i}", 'title': f"Article {i}", 'content': "text"}
+        if i < 6:
+            doc['published_at'] = "2024-01-01T00:00:00Z" if i < 3 else "2024-01-02T00:00:00Z"
+        elif i < 9:
+            doc['published_at'] = f"2024-01-0{i - 3}T00:00:00Z"
+        elif i < 11:
+            doc['published_at'] = None
+        docs.append(doc)
+    storage.collection.insert_many(docs)
+
+
+def all_pages(storage, limit, **kwargs):
+    pages, token = [], None
+    while True:
+        page = storage.get_articles_page(limit=limit, continuation_token=token, **kwargs)
+        pages.append(page['articles'])
+        token = page['next_token']
+        if token is None:
+            return pages
+
+
+def expected_order(storage, ascending):
+    """(published_at, _id) order with null/missing dates lowest, as MongoDB sorts."""
+    docs = list(storage.collection.find())
+    key = lambda doc: (doc.get('published_at') is not None, doc.get('published_at') or "", doc['_id'])
+    return [doc['_id'] for doc in sorted(docs, key=key, reverse=not ascending)]
+
+
+@pytest.mark.parametrize("ascending", [False, True])
+@pytest.mark.parametrize("limit", [1, 2, 4, 5, 12, 20])
+def test_keyset_pages_cover_ties_and_null_dates(storage, ascending, limit):
+    """Every article appears once, in (published_at, _id) order, whatever the page size.
+
+    Page sizes 2, 4 and 5 put page boundaries inside a block of tied
+    dates and inside the null block."""
+    seed_dated(storage)
+    pages = all_pages(storage, limit, ascending=ascending)
+    ids = [article['_id'] for page in pages for article in page]
+    assert ids == expected_order(storage, ascending)
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_keyset_pages_with_filter(storage):
+    seed_dated(storage)
+    pages = all_pages(storage, 2, filter_dict={'published_at': {'$ne': None}})
+    ids = [article['_id'] for page in pages for article in page]
+    assert ids == [i for i in expected_order(storage, False) if i not in ("p09", "p10", "p11")]
+
+
+def test_projection_without_sort_key_or_id_still_pages(storage):
+    """Sort key and _id are fetched for the token and stripped when the caller left them out."""
+    seed_dated(storage)
+    expected = expected_order(storage, False)
+    titles = {doc['_id']: doc['title'] for doc in storage.collection.find()}
+
+    for projection in (['title'], {'title': 1, '_id': 0}, {'published_at': 0, '_id': 0, 'content': 0}):
+        pages = all_pages(storage, 5, projection=projection)
+        articles = [article for page in pages for article in page]
+        assert [article['title'] for article in articles] == [titles[i] for i in expected]
+        assert all('published_at' not in article for article in articles)
+        assert all('content' not in article for article in articles)
+        assert all(('_id' in article) == (projection == ['title']) for article in articles)
+
+
+def test_continuation_token_round_trip(storage):
+    """Tokens carry the sort order and position (including a null sort value) and are checked on use."""
+    for value in ("2024-01-01T00:00:00Z", None):
+        token = storage._encode_token("published_at", False, {'_id': "p01", 'published_at': value})
+        assert storage._decode_token(token, "published_at", False) == {
+            's': "published_at", 'a': False, 'v': value, 'id': "p01"
+        }
+
+    seed_dated(storage)
+    token = storage.get_articles_page(limit=2)['next_token']
+    with pytest.raises(ValueError):
+        storage.get_articles_page(limit=2, continuation_token=token, ascending=True)
+    with pytest.raises(ValueError):
+        storage.get_articles_page(limit=2, continuation_token=token, sort_by="fetched_at")
+    with pytest.raises(ValueError):
+        storage.get_articles_page(limit=2, continuation_token="not a token")
+
+
+def test_backfill_pends_the_stages_whose_output_is_missing(storage):
+    storage.collection.insert_many([
+        {**article("none")},
+        {**article("labeled"), 'categories': ['Technology']},
+        {**article("embedded"), 'categories': [], 'embedding': [0.1, 0.2], 'keywords': None},
+        {**article("done"), 'categories': ['Science'], 'embedding': [0.1], 'keywords': ['space']},
+        {**article("tracked"), 'pending_stages': [STAGE_EMBED]},
+    ])
+    assert storage.backfill_processing_state() == 4
+
+    pending = {doc['_id']: doc['pending_stages'] for doc in storage.collection.find()}
+    assert pending == {
+        "none": [STAGE_LABEL, STAGE_EMBED, STAGE_ANALYZE],
+        "labeled": [STAGE_EMBED, STAGE_ANALYZE],
+        "embedded": [STAGE_ANALYZE],          # empty categories count as labeled, null keywords do not
+        "done": [],
+        "tracked": [STAGE_EMBED],             # already tracked: left alone
+    }
+    assert storage.backfill_processing_state() == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,200 @@
+"""
+Test script for the change-stream worker (stream_worker.py).
+The end-to-end tests need a local single-node replica set (see
+stream_worker.py) and are skipped without one; they use a throwaway
+database and lightweight stand-ins for the models. The event filter is
+checked on mongomock (fixtures in conftest.py).
+
+    python test_stream_worker.py
+"""
+
+import functools
+import sys
+import threading
+import time
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+import config
+from storage import ArticleStorage
+from stream_worker import StreamWorker, WATCH_PIPELINE
+
+TEST_DB = "news_pipeline_stream_test"
+
+
+class FakeLabeler:
+    def label_articles_batch(self, articles, multi_label=True, threshold=0.4, batch_callback=None):
+        for article in articles:
+            article['categories'] = ['Technology']
+            article['category_scores'] = {'Technology': 0.9}
+        if batch_callback:
+            batch_callback(articles)
+        return articles
+
+
+class FakeEmbedder:
+    def generate_embeddings_batch(self, articles, show_progress=False, batch_callback=None):
+        for article in articles:
+            article['embedding'] = [0.1, 0.2, 0.3]
+            article['embedding_dim'] = 3
+        if batch_callback:
+            batch_callback(articles)
+        return articles
+
+
+class FakeAnalyzer:
+    def analyze_articles_batch(self, articles, extract_kw=True, analyze_sent=True, batch_callback=None):
+        for article in articles:
+            article['keywords'] = ['test']
+            article['sentiment'] = 'neutral'
+        if batch_callback:
+            batch_callback(articles)
+        return articles
+
+
+def make_articles(prefix, count):
+    return [
+        {'_id': f"{prefix}{i:04d}", 'url': f"https://example.com/{prefix}/{i}", 'title': f"Article {i}"}
+        for i in range(count)
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def replica_set_available() -> bool:
+    """True when MongoDB is reachable and running as a replica set."""
+    client = MongoClient(config.MONGODB_URI, serverSelectionTimeoutMS=3000)
+    try:
+        return bool(client.admin.command('hello').get('setName'))
+    except PyMongoError:
+        return False
+    finally:
+        client.close()
+
+
+def start_worker(storage, after_catch_up=None, **kwargs):
+    worker = StreamWorker(storage, name="test", **kwargs)
+    worker.labeler, worker.generator, worker.analyzer = FakeLabeler(), FakeEmbedder(), FakeAnalyzer()
+    if after_catch_up:
+        catch_up = worker.catch_up
+        worker.catch_up = lambda: (catch_up(), after_catch_up())
+    thread = threading.Thread(target=worker.run, daemon=True)
+    thread.start()
+    time.sleep(1.0)  # let the stream open
+    return worker, thread
+
+
+def wait_until_processed(storage, count, timeout=15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if storage.count_articles({'pending_stages.0': {'$exists': False}}) >= count:
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def change(event_id, operation, updated=None, removed=()):
+    """Change event as the server reports it (before WATCH_PIPELINE trims it)."""
+    event = {'_id': event_id, 'operationType': operation, 'documentKey': {'_id': event_id}}
+    if operation == 'update':
+        event['updateDescription'] = {'updatedFields': updated or {}, 'removedFields': list(removed)}
+    return event
+
+
+def test_watch_pipeline_selects_inserts_and_repends(mongo_db):
+    """Inserts and re-pends are delivered; stage completions, other updates and deletes are not."""
+    mongo_db.events.insert_many([
+        change("insert", 'insert'),
+        change("repend-array", 'update', {'title': "New title", 'pending_stages': ['label', 'embed', 'analyze']}),
+        change("repend-element", 'update', {'content_hash': "abc", 'pending_stages.0': 'label'}),
+        change("backfill", 'update', {'pending_stages': ['embed']}),
+        change("completed", 'update', {'categories': ['Technology'], 'pending_stages': ['embed']}, ['leases.label']),
+        change("image", 'update', {'urlToImage': "https://example.com/a.jpg"}),
+        change("claimed", 'update', {'leases.label': {'owner': "worker-a"}}),
+        change("deleted", 'delete'),
+    ])
+    delivered = [event['documentKey']['_id'] for event in mongo_db.events.aggregate(WATCH_PIPELINE)]
+    assert delivered == ["insert", "repend-array", "repend-element", "backfill"]
+
+
+def require_replica_set():
+    if not replica_set_available():
+        pytest.skip("MongoDB is not running as a replica set")
+
+
+def test_stream_worker():
+    """Inserts are processed within seconds and not replayed after a restart."""
+    require_replica_set()
+    client = MongoClient(config.MONGODB_URI, serverSelectionTimeoutMS=3000)
+    client.drop_database(TEST_DB)
+
+    storage = ArticleStorage(db_name=TEST_DB)
+    try:
+        # Inserted after the first catch-up but before the stream opens
+        worker, thread = start_worker(
+            storage, batch_size=8, max_latency=0.5,
+            after_catch_up=lambda: storage.save_articles(make_articles("g", 3))
+        )
+        assert wait_until_processed(storage, 3), "articles inserted during catch-up were missed"
+        print("✓ Inserts made during the initial catch-up were picked up")
+
+        started = time.time()
+        storage.save_articles(make_articles("a", 20))
+        assert wait_until_processed(storage, 23), "articles were not processed"
+        print(f"✓ 20 inserts processed in {time.time() - started:.2f}s "
+              f"({worker.stats['batches']} micro-batches)")
+
+        worker.stop()
+        thread.join(timeout=10)
+        assert worker.load_resume_token() is not None, "resume token was not saved"
+        print("✓ Resume token saved")
+
+        # Inserted while the worker is down: picked up from the resume token
+        storage.save_articles(make_articles("b", 5))
+        worker, thread = start_worker(storage, batch_size=8, max_latency=0.5)
+        assert wait_until_processed(storage, 28), "articles inserted during downtime were missed"
+        assert worker.stats['labeled'] == 5, f"expected 5 articles after restart, got {worker.stats['labeled']}"
+        print("✓ Restart resumed without replaying processed inserts")
+
+        worker.stop()
+        thread.join(timeout=10)
+    finally:
+        storage.close()
+        client.drop_database(TEST_DB)
+        client.close()
+
+
+def test_repended_article_is_reprocessed():
+    """A stored article whose text changes on re-fetch is processed again from the stream."""
+    require_replica_set()
+    client = MongoClient(config.MONGODB_URI, serverSelectionTimeoutMS=3000)
+    client.drop_database(TEST_DB)
+
+    storage = ArticleStorage(db_name=TEST_DB)
+    try:
+        worker, thread = start_worker(storage, batch_size=8, max_latency=0.5)
+        articles = make_articles("r", 4)
+        storage.save_articles(articles)
+        assert wait_until_processed(storage, 4), "articles were not processed"
+        labeled = worker.stats['labeled']
+
+        articles[0]['title'] = "Corrected title"
+        storage.save_articles(articles)
+        deadline = time.time() + 15
+        while time.time() < deadline and worker.stats['labeled'] == labeled:
+            time.sleep(0.2)
+        assert worker.stats['labeled'] == labeled + 1, "re-pended article was not reprocessed"
+        assert wait_until_processed(storage, 4)
+        print("✓ Re-pended article reprocessed")
+
+        worker.stop()
+        thread.join(timeout=10)
+    finally:
+        storage.close()
+        client.drop_database(TEST_DB)
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q", "-rs"]))
@@ -0,0 +1,120 @@
+"""
+Test script for the image URL refresher (update_image_urls.py).
+Runs ImageUpdater.process_all against the local NewsAPI stand-in
+(fake_newsapi.py) with a per-key quota, on an in-memory mongomock
+database (fixtures in conftest.py):
+
+    pip install -r requirements-dev.txt
+    python test_update_image_urls.py
+"""
+
+import asyncio
+import sys
+import time
+from unittest import mock
+
+import pytest
+
+import update_image_urls
+from fake_newsapi import ARTICLE_HOST, FakeNewsAPI, serve
+from update_image_urls import ImageUpdater, NewsAPIClient
+
+KEYS = ["key-first-00000001", "key-second-0000002", "key-third-00000003"]
+TOPICS = [f"topic {i}" for i in range(6)]
+ARTICLES_PER_TOPIC = 5
+QUOTA = 2
+RATE = 20.0
+
+
+def seed(collection):
+    """ARTICLES_PER_TOPIC stored articles per topic, without images; topic i's newest is on day 10 + i."""
+    for t, topic in enumerate(TOPICS):
+        collection.insert_many([
+            {
+                "_id": f"{t}-{i}",
+                "url": f"{ARTICLE_HOST}/{topic.replace(' ', '-')}/{i}",
+                "search_topic": topic,
+                "publishedAt": f"2024-01-{10 + t - i:02d}T08:00:00",
+                "urlToImage": None,
+            }
+            for i in range(ARTICLES_PER_TOPIC)
+        ])
+
+
+def test_process_all_rotates_keys_and_paces_requests(mongo_client):
+    api = FakeNewsAPI(latency=0.1, total_results=ARTICLES_PER_TOPIC, quota=QUOTA, retry_after=0)
+    with mock.patch("update_image_urls.MongoClient", lambda *args, **kwargs: mongo_client):
+        updater = ImageUpdater()
+    updater.api_client = NewsAPIClient(KEYS, requests_per_second=RATE)
+    seed(updater.collection)
+
+    calls, in_flight, peak = {}, 0, 0
+    fetch_articles = updater.api_client.fetch_articles
+
+    async def tracked_fetch(query, from_date=None, page_size=100):
+        nonlocal in_flight, peak
+        calls[query] = from_date
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            return await fetch_articles(query, from_date=from_date, page_size=page_size)
+        finally:
+            in_flight -= 1
+
+    updater.api_client.fetch_articles = tracked_fetch
+
+    async def run():
+        async with serve(api) as root:
+            with mock.patch.object(update_image_urls, "NEWS_API_BASE_URL", f"{root}/everything"):
+                await updater.initialize()
+                try:
+                    started = time.perf_counter()
+                    await updater.process_all(concurrency=3)
+                    return time.perf_counter() - started
+                finally:
+                    await updater.api_client.close()
+
+    elapsed = asyncio.run(run())
+
+    # Every topic was fetched once, from its newest stored article ($group / $max)
+    assert {topic: date.day for topic, date in calls.items()} == {topic: 10 + t for t, topic in enumerate(TOPICS)}
+    assert 2 <= peak <= 3
+
+    # Each key served its quota, then 429'd and was rotated out
+    stats = api.stats()
+    assert stats["statuses"]["200"] == len(TOPICS)
+    assert stats["statuses"]["429"] >= len(KEYS) - 1
+    assert all(stats["per_key"][f"...{key[-4:]}"] > QUOTA for key in KEYS[:-1])
+    assert updater.api_client.keys.failed_keys == set(KEYS[:-1])
+
+    # Request starts were spaced 1/RATE apart
+    assert elapsed >= (stats["requests"] - 1) / RATE * 0.9
+
+    for t, topic in enumerate(TOPICS):
+        for i in range(ARTICLES_PER_TOPIC):
+            expected = api._article(topic, i)["urlToImage"]
+            assert updater.collection.find_one({"_id": f"{t}-{i}"})["urlToImage"] == expected
+
+
+def test_fetch_articles_gives_up_when_every_key_fails():
+    api = FakeNewsAPI(invalid_keys=KEYS)
+    client = NewsAPIClient(KEYS, requests_per_second=0)
+
+    async def run():
+        async with serve(api) as root:
+            with mock.patch.object(update_image_urls, "NEWS_API_BASE_URL", f"{root}/everything"):
+                await client.initialize()
+                try:
+                    first = await client.fetch_articles("ai")
+                    second = await client.fetch_articles("ai")
+                    return first, second
+                finally:
+                    await client.close()
+
+    assert asyncio.run(run()) == ([], [])
+    assert client.keys.failed_keys == set(KEYS)
+    assert api.stats()["statuses"] == {"401": len(KEYS)}   # no requests once every key is out
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,166 @@
+"""
+Test script for the embedded vector store (vector_store.LocalVectorStore).
+Writes to pytest's tmp_path; no Qdrant server is needed:
+
+    pip install -r requirements-dev.txt
+    python test_vector_store.py
+"""
+
+import sys
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from vector_store import LocalVectorStore
+
+DIM = 8
+
+
+def make_store(tmp_path, points=()):
+    store = LocalVectorStore(str(tmp_path), "test")
+    store.recreate_collection(DIM)
+    store.upsert(list(points))
+    return store
+
+
+def random_points(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {"id": f"p{i}", "vector": rng.standard_normal(DIM).tolist(), "payload": {"n": i}}
+        for i in range(count)
+    ]
+
+
+def exact_ranking(points, query):
+    vectors = np.asarray([p["vector"] for p in points])
+    scores = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    order = np.argsort(-scores)
+    return [points[i]["id"] for i in order], scores[order]
+
+
+def ids(results):
+    return [r["id"] for r in results]
+
+
+@pytest.mark.parametrize("chunk_rows", [7, LocalVectorStore.SEARCH_CHUNK_ROWS])
+def test_search_ranks_by_cosine_similarity(tmp_path, monkeypatch, chunk_rows):
+    """Top-k matches exact cosine ranking, also when rows are scanned in several chunks."""
+    monkeypatch.setattr(LocalVectorStore, "SEARCH_CHUNK_ROWS", chunk_rows)
+    points = random_points(50)
+    store = make_store(tmp_path, points)
+    query = np.random.default_rng(1).standard_normal(DIM)
+
+    expected_ids, expected_scores = exact_ranking(points, query)
+    results = store.search(query, limit=10)
+    assert ids(results) == expected_ids[:10]
+    assert np.allclose([r["score"] for r in results], expected_scores[:10], atol=1e-5)
+    assert ids(store.search(query, limit=100)) == expected_ids
+    assert store.search(query, limit=0) == []
+
+
+def test_zero_vector_query_returns_points(tmp_path):
+    store = make_store(tmp_path, random_points(5))
+    assert len(store.search(np.zeros(DIM), limit=3)) == 3
+
+
+def point(point_id, **payload):
+    vector = np.zeros(DIM)
+    vector[0] = 1.0
+    return {"id": point_id, "vector": vector.tolist(), "payload": payload}
+
+
+def test_published_at_compares_dates_not_strings(tmp_path):
+    """Mixed ISO formats, offsets and datetimes are compared as instants."""
+    store = make_store(tmp_path, [
+        point("z", published_at="2024-01-02T10:00:00Z"),
+        point("space", published_at="2024-01-02 11:00:00"),            # str(datetime) form
+        point("offset", published_at="2024-01-03T01:00:00+02:00"),     # 2024-01-02 23:00 UTC
+        point("dt", published_at=datetime(2024, 1, 1, 8, 0)),
+        point("early", published_at="2023-12-31T23:59:59Z"),
+        point("missing"),
+        point("garbage", published_at="yesterday"),
+    ])
+    query = np.ones(DIM)
+
+    def found(**bounds):
+        return set(ids(store.search(query, limit=10, filters={"published_at": bounds})))
+
+    assert found(gte="2024-01-02T10:30:00Z") == {"space", "offset"}
+    assert found(gt="2024-01-02T10:00:00+00:00") == {"space", "offset"}
+    assert found(gte="2024-01-02T10:00:00Z", lt="2024-01-02T23:00:00Z") == {"z", "space"}
+    assert found(lte="2024-01-01") == {"early"}
+    assert found(gte=datetime(2024, 1, 1), lt="2024-01-02") == {"dt"}
+    assert found() == {"z", "space", "offset", "dt", "early"}
+
+    with pytest.raises(ValueError):
+        found(gte="not a date")
+
+
+def test_keyword_filters(tmp_path):
+    store = make_store(tmp_path, [
+        point("a", categories=["Technology", "Science"], source="Reuters", sentiment="positive"),
+        point("b", categories=["Sports"], source="BBC News", sentiment="negative"),
+        point("c", categories=["Science"], source="Reuters", sentiment="neutral"),
+        point("d", source="Wired"),
+    ])
+    query = np.ones(DIM)
+
+    def found(**filters):
+        return set(ids(store.search(query, limit=10, filters=filters)))
+
+    assert found(categories="Science") == {"a", "c"}
+    assert found(categories=["Sports", "Technology"]) == {"a", "b"}
+    assert found(source="Reuters") == {"a", "c"}
+    assert found(source=["Wired", "BBC News"]) == {"b", "d"}
+    assert found(sentiment="negative") == {"b"}
+    assert found(source="Reuters", sentiment="neutral") == {"c"}
+    assert found(categories="Politics") == set()
+
+    with pytest.raises(ValueError):
+        found(keywords="market")
+
+
+def test_filtered_search_keeps_ranking(tmp_path, monkeypatch):
+    monkeypatch.setattr(LocalVectorStore, "SEARCH_CHUNK_ROWS", 7)
+    points = random_points(60)
+    for p in points:
+        p["payload"]["sentiment"] = "positive" if p["payload"]["n"] % 3 == 0 else "neutral"
+    store = make_store(tmp_path, points)
+    query = np.random.default_rng(2).standard_normal(DIM)
+
+    positive = [p for p in points if p["payload"]["sentiment"] == "positive"]
+    expected_ids, _ = exact_ranking(positive, query)
+    assert ids(store.search(query, limit=5, filters={"sentiment": "positive"})) == expected_ids[:5]
+
+
+def test_upsert_overwrites_point(tmp_path):
+    points = random_points(10)
+    store = make_store(tmp_path, points)
+    new_vector = np.random.default_rng(3).standard_normal(DIM)
+    store.upsert([{"id": "p4", "vector": new_vector.tolist(), "payload": {"n": 40, "sentiment": "positive"}}])
+
+    assert store.count() == 10
+    top = store.search(new_vector, limit=1)[0]
+    assert top["id"] == "p4" and top["score"] == pytest.approx(1.0, abs=1e-5)
+    assert top["payload"] == {"n": 40, "sentiment": "positive"}
+    assert ids(store.search(new_vector, filters={"sentiment": "positive"})) == ["p4"]
+
+    # The payload log is replayed on open: last entry wins, no duplicate rows
+    reopened = LocalVectorStore(str(tmp_path), "test")
+    assert reopened.count() == 10
+    assert reopened.search(new_vector, limit=1)[0] == top
+
+
+def test_upsert_checks_dimension(tmp_path):
+    store = make_store(tmp_path)
+    with pytest.raises(ValueError):
+        store.upsert([{"id": "x", "vector": [1.0, 2.0], "payload": {}}])
+
+    unopened = LocalVectorStore(str(tmp_path), "other")
+    with pytest.raises(ValueError):
+        unopened.upsert(random_points(1))
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -6,6 +6,7 @@ from pymongo import MongoClient, UpdateOne
 import aiohttp
 import config
 from dotenv import load_dotenv
+from fetcher import ApiKeyPool, KEY_ERROR_STATUSES
 
 load_dotenv()
 
@@ -17,14 +18,45 @@ DATABASE_NAME = "news_pipeline"
 COLLECTION_NAME = "articles"
 
 API_KEYS = config.NEWS_API_KEYS
-NEWS_API_BASE_URL = "https://newsapi.org/v2/everything"
+NEWS_API_BASE_URL = config.NEWS_API_BASE_URL
 PAGE_SIZE = 100
+MAX_CONCURRENT_TOPICS = int(os.getenv("IMAGE_UPDATER_CONCURRENCY", str(config.MAX_CONCURRENT_REQUESTS)))
+REQUESTS_PER_SECOND = float(os.getenv("NEWS_API_REQUESTS_PER_SECOND", "2"))
+
+
+class RatePacer:
+    """
+    Spaces request starts at least 1/rate seconds apart across all workers.
+    A 429 pushes the next slot back (Retry-After if the API sent one).
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def penalize(self, seconds: float):
+        now = asyncio.get_running_loop().time()
+        self.next_slot = max(self.next_slot, now + seconds)
+
 
 class NewsAPIClient:
-    def __init__(self, api_keys):
-        self.api_keys = api_keys
-        self.index = 0
+    def __init__(self, api_keys, requests_per_second: float = REQUESTS_PER_SECOND):
+        # Same key scheduling as the pipeline's fetcher: failed keys are
+        # skipped until their cooldown ends
+        self.keys = ApiKeyPool(api_keys)
         self.session = None
+        self.requests_per_second = requests_per_second
+        self.pacer = RatePacer(requests_per_second)
 
     async def initialize(self):
         self.session = aiohttp.ClientSession()
@@ -33,17 +65,12 @@ class NewsAPIClient:
         if self.session and not self.session.closed:
             await self.session.close()
 
-    def _get_key(self):
-        return self.api_keys[self.index]
-
-    def _rotate_key(self):
-        self.index = (self.index + 1) % len(self.api_keys)
-        return self._get_key()
-
     async def fetch_articles(self, query, from_date=None, page_size=100):
         """Fetch articles from News API with optional from_date filter."""
-        for _ in range(len(self.api_keys)):
-            key = self._get_key()
+        for _ in range(len(self.keys.api_keys)):
+            key = self.keys.current()
+            if not key:
+                return []
             params = {
                 "apiKey": key,
                 "q": query,
@@ -54,17 +81,21 @@ class NewsAPIClient:
             if from_date:
                 params["from"] = from_date.isoformat()
 
+            await self.pacer.wait()
             try:
                 async with self.session.get(NEWS_API_BASE_URL, params=params) as resp:
                     data = await resp.json()
                     if resp.status == 200:
                         return data.get("articles", [])
-                    else:
-                        logger.warning(f"API error {resp.status}: {data.get('message')}")
-                        self._rotate_key()
+                    logger.warning(f"API error {resp.status}: {data.get('message')}")
+                    if resp.status == 429:
+                        retry_after = resp.headers.get("Retry-After", "")
+                        self.pacer.penalize(float(retry_after) if retry_after.isdigit() else 1.0)
+                    if resp.status not in KEY_ERROR_STATUSES:
+                        return []
+                    self.keys.rotate(key)
             except Exception as e:
                 logger.error(f"Request failed: {e}")
-                self._rotate_key()
         return []
 
 class ImageUpdater:
@@ -81,15 +112,25 @@ class ImageUpdater:
         await self.api_client.close()
         self.client.close()
 
-    async def update_topic(self, topic):
-        # Get last published date for this topic in DB
-        last_article = self.collection.find(
-            {"search_topic": topic, "publishedAt": {"$exists": True}}
-        ).sort("publishedAt", -1).limit(1)
-        last_date = None
-        for a in last_article:
-            last_date = a["publishedAt"]
-
+    async def _run_blocking(self, func, *args):
+        """Run a blocking pymongo call in the default executor."""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _last_dates(self, topics):
+        """Latest publishedAt for every topic, in a single aggregation."""
+        cursor = self.collection.aggregate([
+            {"$match": {"search_topic": {"$in": topics}, "publishedAt": {"$exists": True}}},
+            {"$group": {"_id": "$search_topic", "last_date": {"$max": "$publishedAt"}}}
+        ])
+        return {doc["_id"]: doc["last_date"] for doc in cursor}
+
+    def _url_ids(self, topic, urls):
+        return {
+            a["url"]: a["_id"]
+            for a in self.collection.find({"search_topic": topic, "url": {"$in": urls}}, {"url": 1, "_id": 1})
+        }
+
+    async def update_topic(self, topic, last_date=None):
         if last_date:
             # Convert to datetime if it's string
             if isinstance(last_date, str):
@@ -104,8 +145,7 @@ class ImageUpdater:
             return
 
         # Map urls to DB ids
-        db_articles = list(self.collection.find({"search_topic": topic, "url": {"$in": [a["url"] for a in articles]}}, {"url": 1, "_id": 1}))
-        url_to_id = {a["url"]: a["_id"] for a in db_articles}
+        url_to_id = await self._run_blocking(self._url_ids, topic, [a["url"] for a in articles])
 
         updates = []
         for a in articles:
@@ -115,22 +155,29 @@ class ImageUpdater:
                 updates.append(UpdateOne({"_id": url_to_id[url]}, {"$set": {"urlToImage": img}}))
 
         if updates:
-            result = await asyncio.get_event_loop().run_in_executor(
-                None,
+            result = await self._run_blocking(
                 lambda: self.collection.bulk_write(updates, ordered=False)
             )
             logger.info(f"Updated {result.modified_count} articles for topic: {topic}")
 
-    async def process_all(self):
-        topics = list(self.collection.distinct(
-            "search_topic",
-            {"url": {"$exists": True}}
+    async def process_all(self, concurrency: int = MAX_CONCURRENT_TOPICS):
+        topics = list(await self._run_blocking(
+            lambda: self.collection.distinct("search_topic", {"url": {"$exists": True}})
         ))
+        last_dates = await self._run_blocking(self._last_dates, topics)
+
+        logger.info(f"Processing {len(topics)} topics (concurrency: {concurrency}, "
+                    f"pacing: {self.api_client.requests_per_second} req/s)")
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(topic):
+            async with semaphore:
+                try:
+                    await self.update_topic(topic, last_dates.get(topic))
+                except Exception as e:
+                    logger.error(f"Failed to update topic '{topic}': {e}")
 
-        logger.info(f"Processing {len(topics)} topics")
-        for topic in topics:
-            await self.update_topic(topic)
-            await asyncio.sleep(1)  # minimal delay
+        await asyncio.gather(*(run(topic) for topic in topics))
 
 async def main():
     if not API_KEYS:
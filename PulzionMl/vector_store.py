@@ -0,0 +1,433 @@
+"""
+Pluggable vector store for article embeddings.
+Provides a Qdrant Cloud backend and an embedded local backend
+(memory-mapped flat index + payload filters) for development and CI.
+"""
+
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COLLECTION = "articles_collection"
+
+# Payload fields indexed for filtering (field, Qdrant schema type)
+PAYLOAD_INDEXES: List[Tuple[str, str]] = [
+    ("published_at", "datetime"),
+    ("source", "keyword"),
+    ("categories", "keyword"),
+    ("sentiment", "keyword"),
+    ("keywords", "keyword"),
+    ("_id", "keyword"),
+]
+
+# Fields the local backend can filter on
+FILTER_FIELDS = ("published_at", "categories", "source", "sentiment")
+
+# published_at range operators (Qdrant DatetimeRange names)
+RANGE_OPERATORS = {
+    "gte": np.greater_equal,
+    "gt": np.greater,
+    "lte": np.less_equal,
+    "lt": np.less,
+}
+
+
+def _timestamp(value: Any) -> float:
+    """
+    Epoch seconds of a datetime/date or ISO 8601 string (naive values are UTC).
+
+    Returns:
+        Timestamp, or NaN if the value is missing or not a date
+    """
+    if isinstance(value, str) and value:
+        try:
+            value = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+        except ValueError:
+            return float("nan")
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if not isinstance(value, datetime):
+        return float("nan")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class VectorStore(ABC):
+    """
+    Common API for vector stores.
+
+    Points are dicts: {"id": str, "vector": List[float], "payload": Dict}.
+    Search results are dicts: {"id": str, "score": float, "payload": Dict}.
+
+    Filters are plain dicts using the payload field names, e.g.
+        {"published_at": {"gte": "2024-01-01T00:00:00Z"},
+         "categories": ["Technology", "Science"],   # any of
+         "source": "Reuters",
+         "sentiment": "positive"}
+    """
+
+    @abstractmethod
+    def recreate_collection(
+        self,
+        vector_size: int,
+        payload_indexes: Optional[List[Tuple[str, str]]] = None
+    ):
+        """Drop and create the collection for vectors of `vector_size`."""
+
+    @abstractmethod
+    def upsert(self, points: List[Dict[str, Any]], wait: bool = True):
+        """Insert or replace points by id."""
+
+    @abstractmethod
+    def search(
+        self,
+        vector: List[float],
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the `limit` nearest points (cosine similarity)."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored points."""
+
+    def close(self):
+        """Release resources."""
+
+
+# --------------------- Qdrant ---------------------
+class QdrantVectorStore(VectorStore):
+    """Vector store backed by a Qdrant server (Qdrant Cloud in production)."""
+
+    def __init__(
+        self,
+        url: Optional[str],
+        api_key: Optional[str] = None,
+        collection_name: str = DEFAULT_COLLECTION,
+        timeout: int = 60
+    ):
+        from qdrant_client import QdrantClient
+        from qdrant_client.http import models
+
+        if not url:
+            raise ValueError("QDRANT_URL must be set to use the Qdrant vector store")
+
+        self.models = models
+        self.collection_name = collection_name
+        self.client = QdrantClient(url=url, api_key=api_key, timeout=timeout)
+        logger.info(f"Connected to Qdrant: {collection_name}")
+
+    def recreate_collection(self, vector_size, payload_indexes=None):
+        models = self.models
+        try:
+            self.client.delete_collection(collection_name=self.collection_name)
+            logger.info(f"Deleted existing collection: {self.collection_name}")
+        except Exception:
+            logger.info("No existing collection to delete")
+
+        self.client.create_collection(
+            collection_name=self.collection_name,
+            vectors_config=models.VectorParams(size=vector_size, distance=models.Distance.COSINE),
+        )
+        logger.info(f"Created Qdrant collection: {self.collection_name} (dim={vector_size})")
+
+        schema_types = {
+            "datetime": models.PayloadSchemaType.DATETIME,
+            "keyword": models.PayloadSchemaType.KEYWORD,
+        }
+        for field_name, schema_type in payload_indexes or []:
+            try:
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=schema_types[schema_type]
+                )
+                logger.info(f"Indexed payload field: {field_name} → {schema_type}")
+            except Exception as e:
+                logger.warning(f"Failed to index {field_name}: {e}")
+
+    def upsert(self, points, wait=True):
+        self.client.upsert(
+            collection_name=self.collection_name,
+            points=[
+                self.models.PointStruct(id=p["id"], vector=p["vector"], payload=p["payload"])
+                for p in points
+            ],
+            wait=wait
+        )
+
+    def _build_filter(self, filters: Optional[Dict[str, Any]]):
+        if not filters:
+            return None
+        models = self.models
+        must = []
+        for key, value in filters.items():
+            if key == "published_at":
+                must.append(models.FieldCondition(key=key, range=models.DatetimeRange(**value)))
+            elif isinstance(value, (list, tuple, set)):
+                must.append(models.FieldCondition(key=key, match=models.MatchAny(any=list(value))))
+            else:
+                must.append(models.FieldCondition(key=key, match=models.MatchValue(value=value)))
+        return models.Filter(must=must)
+
+    def search(self, vector, limit=10, filters=None):
+        hits = self.client.search(
+            collection_name=self.collection_name,
+            query_vector=list(vector),
+            limit=limit,
+            query_filter=self._build_filter(filters),
+            with_payload=True
+        )
+        return [{"id": str(hit.id), "score": float(hit.score), "payload": hit.payload or {}} for hit in hits]
+
+    def count(self):
+        return self.client.count(collection_name=self.collection_name, exact=True).count
+
+    def close(self):
+        self.client.close()
+
+
+# --------------------- Local (embedded) ---------------------
+class LocalVectorStore(VectorStore):
+    """
+    Embedded flat index for offline development, CI and benchmarks.
+
+    Layout under `path/<collection>/`:
+        meta.json       dimension and point count
+        vectors.f32     raw float32 rows (L2-normalized), memory-mapped for search
+        payloads.jsonl  append-only {"row", "id", "payload"} log (last entry wins)
+
+    Search is exact (brute-force cosine), so it also serves as the
+    ground truth for recall measurements against approximate indexes.
+    """
+
+    SEARCH_CHUNK_ROWS = 65536
+
+    def __init__(self, path: str, collection_name: str = DEFAULT_COLLECTION):
+        self.dir = os.path.join(path, collection_name)
+        self.collection_name = collection_name
+        self._lock = threading.Lock()
+        self._reset_state()
+
+        if os.path.exists(self._meta_path):
+            self._load()
+        logger.info(f"Opened local vector store: {self.dir} ({len(self.ids):,} points)")
+
+    # ----- files -----
+    @property
+    def _meta_path(self):
+        return os.path.join(self.dir, "meta.json")
+
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.dir, "vectors.f32")
+
+    @property
+    def _payloads_path(self):
+        return os.path.join(self.dir, "payloads.jsonl")
+
+    def _reset_state(self):
+        self.dim: Optional[int] = None
+        self.ids: List[str] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self.row_by_id: Dict[str, int] = {}
+        self._matrix = None
+        self._columns = None
+
+    def _load(self):
+        with open(self._meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+
+        if os.path.exists(self._payloads_path):
+            with open(self._payloads_path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    self._set_row(entry["row"], entry["id"], entry["payload"])
+
+        # Drop a torn trailing row (crash between vector and payload write)
+        row_bytes = self.dim * 4
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        if size // row_bytes > len(self.ids):
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(len(self.ids) * row_bytes)
+
+    def _write_meta(self):
+        with open(self._meta_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "count": len(self.ids), "distance": "cosine"}, f)
+
+    def _set_row(self, row: int, point_id: str, payload: Dict[str, Any]):
+        if row == len(self.ids):
+            self.ids.append(point_id)
+            self.payloads.append(payload)
+        else:
+            self.ids[row] = point_id
+            self.payloads[row] = payload
+        self.row_by_id[point_id] = row
+
+    # ----- API -----
+    def recreate_collection(self, vector_size, payload_indexes=None):
+        with self._lock:
+            os.makedirs(self.dir, exist_ok=True)
+            for path in (self._vectors_path, self._payloads_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._reset_state()
+            self.dim = vector_size
+            self._write_meta()
+        logger.info(f"Created local collection: {self.dir} (dim={vector_size})")
+
+    def upsert(self, points, wait=True):
+        if not points:
+            return
+        with self._lock:
+            if self.dim is None:
+                raise ValueError("Collection not created; call recreate_collection() first")
+
+            vectors = np.asarray([p["vector"] for p in points], dtype=np.float32)
+            if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape}")
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+
+            row_bytes = self.dim * 4
+            mode = "r+b" if os.path.exists(self._vectors_path) else "w+b"
+            with open(self._vectors_path, mode) as vf, \
+                    open(self._payloads_path, "a", encoding="utf-8") as pf:
+                for point, vector in zip(points, vectors):
+                    point_id = str(point["id"])
+                    row = self.row_by_id.get(point_id, len(self.ids))
+                    vf.seek(row * row_bytes)
+                    vf.write(vector.tobytes())
+                    pf.write(json.dumps({"row": row, "id": point_id, "payload": point["payload"]}, default=str) + "\n")
+                    self._set_row(row, point_id, point["payload"])
+                if wait:
+                    vf.flush()
+                    pf.flush()
+                    os.fsync(vf.fileno())
+                    os.fsync(pf.fileno())
+
+            self._write_meta()
+            self._matrix = None
+            self._columns = None
+
+    def _get_matrix(self):
+        if self._matrix is None and self.ids:
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(len(self.ids), self.dim))
+        return self._matrix
+
+    def _get_columns(self):
+        """Build filter columns: published_at timestamps (NaN if missing) + inverted indexes."""
+        if self._columns is None:
+            published = np.array([_timestamp(p.get("published_at")) for p in self.payloads], dtype=np.float64)
+            inverted: Dict[str, Dict[str, List[int]]] = {"categories": {}, "source": {}, "sentiment": {}}
+            for row, payload in enumerate(self.payloads):
+                for field, index in inverted.items():
+                    values = payload.get(field)
+                    if values is None:
+                        continue
+                    for value in values if isinstance(values, list) else [values]:
+                        index.setdefault(value, []).append(row)
+            self._columns = {"published_at": published, **inverted}
+        return self._columns
+
+    def _filter_mask(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not filters:
+            return None
+        columns = self._get_columns()
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, value in filters.items():
+            if key not in FILTER_FIELDS:
+                raise ValueError(f"Unsupported filter field: {key} (supported: {', '.join(FILTER_FIELDS)})")
+            if key == "published_at":
+                published = columns["published_at"]
+                mask &= ~np.isnan(published)
+                for op, compare in RANGE_OPERATORS.items():
+                    if value.get(op) is None:
+                        continue
+                    bound = _timestamp(value[op])
+                    if np.isnan(bound):
+                        raise ValueError(f"Invalid published_at bound: {op}={value[op]!r}")
+                    mask &= compare(published, bound)
+            else:
+                wanted = value if isinstance(value, (list, tuple, set)) else [value]
+                field_mask = np.zeros(len(self.ids), dtype=bool)
+                for item in wanted:
+                    field_mask[columns[key].get(item, [])] = True
+                mask &= field_mask
+        return mask
+
+    def search(self, vector, limit=10, filters=None):
+        with self._lock:
+            matrix = self._get_matrix()
+            if matrix is None or limit <= 0:
+                return []
+            query = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            if norm > 0:
+                query = query / norm
+            mask = self._filter_mask(filters)
+
+            best_rows = np.empty(0, dtype=np.int64)
+            best_scores = np.empty(0, dtype=np.float32)
+            for start in range(0, matrix.shape[0], self.SEARCH_CHUNK_ROWS):
+                scores = np.asarray(matrix[start:start + self.SEARCH_CHUNK_ROWS] @ query)
+                rows = np.arange(start, start + len(scores))
+                if mask is not None:
+                    chunk_mask = mask[start:start + len(scores)]
+                    scores, rows = scores[chunk_mask], rows[chunk_mask]
+                if len(scores) > limit:
+                    top = np.argpartition(-scores, limit)[:limit]
+                    scores, rows = scores[top], rows[top]
+                best_scores = np.concatenate([best_scores, scores])
+                best_rows = np.concatenate([best_rows, rows])
+                if len(best_scores) > limit:
+                    top = np.argpartition(-best_scores, limit)[:limit]
+                    best_scores, best_rows = best_scores[top], best_rows[top]
+
+            order = np.argsort(-best_scores)
+            return [
+                {"id": self.ids[row], "score": float(score), "payload": self.payloads[row]}
+                for row, score in zip(best_rows[order], best_scores[order])
+            ]
+
+    def count(self):
+        return len(self.ids)
+
+    def close(self):
+        self._matrix = None
+
+
+def get_vector_store(
+    backend: str = "qdrant",
+    collection_name: str = DEFAULT_COLLECTION,
+    **options
+) -> VectorStore:
+    """
+    Create a vector store.
+
+    Args:
+        backend: "qdrant" or "local"
+        collection_name: Collection name
+        **options: Backend options (qdrant: url, api_key, timeout; local: path)
+
+    Returns:
+        VectorStore instance
+    """
+    backend = (backend or "qdrant").lower()
+    if backend == "qdrant":
+        return QdrantVectorStore(collection_name=collection_name, **options)
+    if backend == "local":
+        return LocalVectorStore(options.get("path") or os.path.join("data", "vector_store"), collection_name)
+    raise ValueError(f"Unknown vector store backend: {backend} (use 'qdrant' or 'local')")